@@ -9,11 +9,27 @@ from alembic import context
 
 from app.core.config import settings
 from app.core.database import Base
-
-# from app.domain.entities.user import User
-# from app.domain.entities.product import Product
-# from app.domain.entities.cart_item import CartItem
-# from app.domain.entities.order import Order
+from app.infrastructure.search.product_search import is_search_table
+
+from app.domain.entities.user import User  # noqa: F401
+from app.domain.entities.product import Product  # noqa: F401
+from app.domain.entities.cart_item import CartItem  # noqa: F401
+from app.domain.entities.order import Order  # noqa: F401
+from app.domain.entities.order_item import OrderItem  # noqa: F401
+from app.domain.entities.payment import Payment  # noqa: F401
+from app.domain.entities.category_facet import CategoryFacet  # noqa: F401
+from app.domain.entities.inventory_bucket import InventoryBucket  # noqa: F401
+from app.domain.entities.inventory_hold import InventoryHold  # noqa: F401
+from app.domain.entities.idempotency_key import IdempotencyKey  # noqa: F401
+from app.domain.entities.outbox_event import OutboxEvent  # noqa: F401
+from app.domain.entities.daily_sales import DailySales  # noqa: F401
+from app.domain.entities.category_daily_sales import (  # noqa: F401
+    CategoryDailySales,
+)
+from app.domain.entities.product_daily_sales import (  # noqa: F401
+    ProductDailySales,
+)
+from app.domain.entities.rolled_up_order import RolledUpOrder  # noqa: F401
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
@@ -24,8 +40,14 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Search tables are created by raw DDL, not the ORM metadata
+    return not (type_ == "table" and is_search_table(name))
+
+
 def get_url() -> str:
-    return settings.database_url
+    # Tests point migrations at a scratch database through the Config
+    return config.attributes.get("database_url", settings.database_url)
 
 
 def run_migrations_offline() -> None:
@@ -46,6 +68,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -71,6 +94,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
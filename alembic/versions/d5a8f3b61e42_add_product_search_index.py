@@ -0,0 +1,45 @@
+"""add product search index
+
+Revision ID: d5a8f3b61e42
+Revises: c27d9a4e5b10
+Create Date: 2026-10-18 09:52:10.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.infrastructure.search.product_search import (
+    FTS_TABLE,
+    POSTGRESQL_DDL,
+    SQLITE_DDL,
+    SQLITE_REBUILD,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8f3b61e42'
+down_revision = 'c27d9a4e5b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # Index the rows that already exist
+        op.execute(SQLITE_REBUILD)
+    elif dialect == "postgresql":
+        for statement in POSTGRESQL_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_products_search")
@@ -0,0 +1,27 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class _SalesTotals(BaseModel):
+    orders: int
+    units: int
+    revenue: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DailySalesSchema(_SalesTotals):
+    day: date
+
+
+class CategorySalesSchema(_SalesTotals):
+    # None for products without a category
+    category: Optional[str] = None
+
+
+class ProductSalesSchema(_SalesTotals):
+    product_id: int
+    # None once the product is deleted
+    name: Optional[str] = None
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+MAX_INVENTORY_BUCKETS = 64
+
+
+class InventoryUpdateSchema(BaseModel):
+    # Units free to reserve, not counting open holds
+    stock: int = Field(ge=0)
+    # 0 keeps the stock on the product row; omitted keeps the current
+    # count, or INVENTORY_BUCKETS for a product without buckets
+    buckets: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=MAX_INVENTORY_BUCKETS,
+    )
+
+
+class InventorySchema(BaseModel):
+    product_id: int
+    available: int
+    held: int
+    # Free units per bucket, empty when the product has no buckets
+    buckets: list[int]
@@ -44,6 +44,10 @@ class OrderSchema(OrderInDBSchema):
     order_items: List[OrderItemSchema]
 
 
+class OrderSummarySchema(OrderInDBSchema):
+    item_count: int
+
+
 class _PaymentBase(BaseModel):
     payment_method: str
     status: str = "pending"
@@ -5,6 +5,7 @@ from pydantic import BaseModel, ConfigDict
 
 
 class _ProductBase(BaseModel):
+    sku: Optional[str] = None
     name: str
     description: Optional[str] = None
     price: float
@@ -18,6 +19,7 @@ class ProductCreateSchema(_ProductBase):
 
 
 class ProductUpdateSchema(BaseModel):
+    sku: Optional[str] = None
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[float] = None
@@ -29,9 +31,63 @@ class ProductUpdateSchema(BaseModel):
 class ProductInDBSchema(_ProductBase):
     id: int
     created_at: datetime
+    updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class ProductSchema(ProductInDBSchema):
     pass
+
+
+class ProductFilterSchema(BaseModel):
+    category: Optional[str] = None
+    search: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    in_stock: bool = False
+
+
+class ProductPageSchema(BaseModel):
+    items: list[ProductSchema]
+    # None when the count was not requested
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+class CategoryFacetSchema(BaseModel):
+    category: str
+    product_count: int
+    in_stock_count: int
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProductSuggestionSchema(BaseModel):
+    id: int
+    name: str
+
+
+class ProductBatchSchema(BaseModel):
+    # Found products in request order; unknown ids are listed in missing
+    products: list[ProductSchema]
+    missing: list[int]
+
+
+class ProductImportErrorSchema(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class ProductImportReportSchema(BaseModel):
+    processed: int
+    upserted: int
+    failed: int
+    errors: list[ProductImportErrorSchema]
+    # More rows failed than are listed in `errors`
+    errors_truncated: bool
+    elapsed_seconds: float
+    rows_per_second: float
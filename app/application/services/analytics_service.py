@@ -0,0 +1,120 @@
+import logging
+from datetime import date
+from typing import Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.repositories.analytics_repository import (
+    AnalyticsRepository,
+)
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from app.application.schemas.analytics import (
+    CategorySalesSchema,
+    DailySalesSchema,
+    ProductSalesSchema,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsService:
+    """
+    Sales reports answered from daily rollup tables. Confirmed orders
+    are added to the rollups by the outbox consumer as they happen,
+    and from history by `backfill`; both claim each order first, so an
+    order is counted once however often either runs.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.analytics_repo = AnalyticsRepository(db)
+        self.product_repo = ProductRepository(db)
+
+    async def roll_up(self, order_ids: Sequence[int]) -> int:
+        """Add the orders not counted yet; returns how many were added."""
+        claimed = await self.analytics_repo.claim(order_ids)
+        if claimed:
+            await self.analytics_repo.add(claimed)
+        await self.db.commit()
+        return len(claimed)
+
+    async def backfill(self, chunk_size: int) -> int:
+        """
+        Roll up every confirmed order, `chunk_size` orders per
+        transaction; returns how many had not been counted yet.
+        """
+        added = 0
+        after = 0
+        while order_ids := await self.analytics_repo.confirmed_after(
+            after, chunk_size
+        ):
+            added += await self.roll_up(order_ids)
+            after = order_ids[-1]
+            logger.info(
+                "Sales backfill: up to order %s, %s added", after, added
+            )
+        return added
+
+    async def get_daily(
+        self,
+        start: date,
+        end: date,
+    ) -> list[DailySalesSchema]:
+        self._check_range(start, end)
+        return [
+            DailySalesSchema.model_validate(row)
+            for row in await self.analytics_repo.get_daily(start, end)
+        ]
+
+    async def get_by_category(
+        self,
+        start: date,
+        end: date,
+    ) -> list[CategorySalesSchema]:
+        self._check_range(start, end)
+        return [
+            CategorySalesSchema(
+                category=row.category or None,
+                orders=row.orders,
+                units=row.units,
+                revenue=row.revenue,
+            )
+            for row in await self.analytics_repo.get_by_category(start, end)
+        ]
+
+    async def get_by_product(
+        self,
+        start: date,
+        end: date,
+        limit: int,
+    ) -> list[ProductSalesSchema]:
+        self._check_range(start, end)
+        rows = await self.analytics_repo.get_by_product(start, end, limit)
+        products = await self.product_repo.get_many(
+            [row.product_id for row in rows]
+        )
+        return [
+            ProductSalesSchema(
+                product_id=row.product_id,
+                name=(
+                    products[row.product_id].name
+                    if row.product_id in products
+                    else None
+                ),
+                orders=row.orders,
+                units=row.units,
+                revenue=row.revenue,
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _check_range(start: date, end: date) -> None:
+        if end < start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end must not be before start",
+            )
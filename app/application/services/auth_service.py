@@ -1,5 +1,5 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.entities.user import User
 from app.infrastructure.repositories.user_repository import UserRepository
@@ -14,21 +14,21 @@ from app.core.security import (
 
 
 class AuthService:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.user_repo = UserRepository(db)
 
-    def register_user(self, user_create: UserCreateSchema) -> User:
-        existing_user = self.user_repo.get_by_email(user_create.email)
+    async def register_user(self, user_create: UserCreateSchema) -> User:
+        existing_user = await self.user_repo.get_by_email(user_create.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
 
-        return self.user_repo.create(user_create)
+        return await self.user_repo.create(user_create)
 
-    def authenticate_user(self, user_login: UserLoginSchema) -> dict:
-        user = self.user_repo.get_by_email(user_login.email)
+    async def authenticate_user(self, user_login: UserLoginSchema) -> dict:
+        user = await self.user_repo.get_by_email(user_login.email)
         if not user or not verify_password(
             user_login.password,
             str(user.hashed_password),
@@ -52,7 +52,7 @@ class AuthService:
             "token_type": "bearer",
         }
 
-    def refresh_token(self, refresh_token: str) -> dict:
+    async def refresh_token(self, refresh_token: str) -> dict:
         user_id = verify_token(refresh_token)
         if not user_id:
             raise HTTPException(
@@ -60,7 +60,7 @@ class AuthService:
                 detail="Invalid refresh token",
             )
 
-        user = self.user_repo.get_by_id(int(user_id))
+        user = await self.user_repo.get_by_id(int(user_id))
         if not user or not bool(user.is_active):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,7 +76,7 @@ class AuthService:
             "token_type": "bearer",
         }
 
-    def get_current_user(self, token: str) -> User:
+    async def get_current_user(self, token: str) -> User:
         user_id = verify_token(token)
         if not user_id:
             raise HTTPException(
@@ -84,7 +84,7 @@ class AuthService:
                 detail="Could not validate credentials",
             )
 
-        user = self.user_repo.get_by_id(int(user_id))
+        user = await self.user_repo.get_by_id(int(user_id))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,28 @@
+import asyncio
+import logging
+
+from app.core.database import ReadSessionLocal, replica_router
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_autocomplete() -> None:
+    async with ReadSessionLocal(bind=replica_router.get_engine()) as db:
+        await ProductRepository(db).rebuild_autocomplete()
+
+
+async def refresh_autocomplete(interval_seconds: float) -> None:
+    """
+    Rebuild the autocomplete index every `interval_seconds`. Writes in
+    this process update the index immediately; the rebuild picks up
+    writes and sales from other workers.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await rebuild_autocomplete()
+        except Exception:
+            logger.exception("Autocomplete refresh failed")
@@ -1,5 +1,5 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.entities.cart_item import CartItem
 from app.infrastructure.repositories.cart_repository import CartRepository
@@ -15,12 +15,12 @@ from app.application.schemas.cart import (
 
 
 class CartService:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.cart_repo = CartRepository(db)
         self.product_repo = ProductRepository(db)
 
-    def get_user_cart(self, user: User) -> CartSchema:
-        cart_items = self.cart_repo.get_user_cart(user.id)
+    async def get_user_cart(self, user: User) -> CartSchema:
+        cart_items = await self.cart_repo.get_user_cart(user.id)
 
         total_price = 0
         total_items = 0
@@ -35,13 +35,16 @@ class CartService:
             total_items=total_items,
         )
 
-    def add_to_cart(
+    async def add_to_cart(
         self,
         user: User,
         cart_item_create: CartItemCreateSchema,
     ) -> CartItem:
-        # Verify product exists and has sufficient stock
-        product = self.product_repo.get_by_id(cart_item_create.product_id)
+        # Verify product exists and has sufficient stock. Read from the
+        # database, not the product cache: its stock may be a TTL old
+        product = await self.product_repo.get_by_id(
+            cart_item_create.product_id,
+        )
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -56,7 +59,7 @@ class CartService:
             )
 
         # Check existing cart item to verify total quantity
-        existing_item = self.cart_repo.get_cart_item(
+        existing_item = await self.cart_repo.get_cart_item(
             user.id,
             product_id,
         )
@@ -70,15 +73,15 @@ class CartService:
                 detail="Insufficient stock",
             )
 
-        return self.cart_repo.add_item(user.id, cart_item_create)
+        return await self.cart_repo.add_item(user.id, cart_item_create)
 
-    def update_cart_item(
+    async def update_cart_item(
         self,
         user: User,
         product_id: int,
         quantity: int,
     ) -> CartItem | None:
-        cart_item = self.cart_repo.get_cart_item(user.id, product_id)
+        cart_item = await self.cart_repo.get_cart_item(user.id, product_id)
         if not cart_item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -93,20 +96,20 @@ class CartService:
             )
 
         if quantity <= 0:
-            self.cart_repo.remove_item(cart_item)
+            await self.cart_repo.remove_item(cart_item)
             return None
 
-        return self.cart_repo.update_item(cart_item, quantity)
+        return await self.cart_repo.update_item(cart_item, quantity)
 
-    def remove_from_cart(self, user: User, product_id: int) -> None:
-        cart_item = self.cart_repo.get_cart_item(user.id, product_id)
+    async def remove_from_cart(self, user: User, product_id: int) -> None:
+        cart_item = await self.cart_repo.get_cart_item(user.id, product_id)
         if not cart_item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cart item not found",
             )
 
-        self.cart_repo.remove_item(cart_item)
+        await self.cart_repo.remove_item(cart_item)
 
-    def clear_cart(self, user: User) -> None:
-        self.cart_repo.clear_cart(user.id)
+    async def clear_cart(self, user: User) -> None:
+        await self.cart_repo.clear_cart(user.id)
@@ -0,0 +1,105 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.domain.entities.product import Product
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from app.application.schemas.product import (
+    ProductFilterSchema,
+    ProductPageSchema,
+    ProductSchema,
+)
+
+
+class CatalogService:
+    """
+    Filtered, sorted and paginated catalog listings. Every combination
+    of filters becomes one query; column sorts page by keyset cursor,
+    relevance (the default when searching) by offset.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.product_repo = ProductRepository(db)
+
+    @staticmethod
+    def resolve_sort(filters: ProductFilterSchema, sort: Optional[str]) -> str:
+        if sort is None:
+            return "relevance" if filters.search else "id"
+        if sort == "relevance" and not filters.search:
+            return "id"
+        return sort
+
+    def page_query(
+        self,
+        filters: ProductFilterSchema,
+        sort: str,
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Select:
+        after = None
+        if cursor:
+            if sort == "relevance":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Relevance order pages by skip, not cursor",
+                )
+            try:
+                after = decode_cursor(cursor, sort, descending)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+                )
+
+        return self.product_repo.catalog_query(
+            filters,
+            sort=sort,
+            descending=descending,
+            after=after,
+            skip=skip,
+            limit=limit,
+        )
+
+    @staticmethod
+    def next_cursor(
+        products: list[Product],
+        sort: str,
+        descending: bool,
+        limit: int,
+    ) -> Optional[str]:
+        # Only a full page may have a successor
+        if sort == "relevance" or len(products) < limit:
+            return None
+        last = products[-1]
+        return encode_cursor(sort, descending, getattr(last, sort), last.id)
+
+    async def get_page(
+        self,
+        filters: ProductFilterSchema,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        total: str = "estimated",
+    ) -> ProductPageSchema:
+        sort = self.resolve_sort(filters, sort)
+        stmt = self.page_query(filters, sort, descending, cursor, skip, limit)
+        products = await self.product_repo.fetch_all(stmt)
+
+        page = ProductPageSchema(
+            items=[ProductSchema.model_validate(p) for p in products],
+            next_cursor=self.next_cursor(products, sort, descending, limit),
+        )
+        if total != "none":
+            page.total, page.total_is_estimate = await self.product_repo.count(
+                filters,
+                estimate=total == "estimated",
+            )
+        return page
@@ -1,99 +1,376 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.domain.entities.user import User
 from app.domain.entities.order import Order
+from app.domain.entities.payment import Payment
+from app.domain.entities.product import Product
+from app.application.services.inventory_service import InventoryService
+from app.application.services.order_service import OrderService
+from app.application.services.outbox_service import (
+    ORDER_CANCELLED,
+    ORDER_CONFIRMED,
+    outbox_worker,
+)
 from app.application.services.payment_service import PaymentService
+from app.infrastructure.gateways.payment_gateway import (
+    CircuitOpen,
+    PaymentUnavailable,
+)
 from app.infrastructure.repositories.cart_repository import CartRepository
+from app.infrastructure.repositories.facet_repository import (
+    FacetRepository,
+    facet_state,
+)
 from app.infrastructure.repositories.order_repository import OrderRepository
+from app.infrastructure.repositories.outbox_repository import (
+    OutboxRepository,
+)
 from app.infrastructure.repositories.product_repository import (
     ProductRepository,
 )
 from app.application.schemas.order import OrderCreateSchema
 
+logger = logging.getLogger(__name__)
+
+PAYMENT_UNAVAILABLE = "Payment gateway unavailable, please retry later"
+RESERVATION_EXPIRED = "Inventory reservation expired, please retry"
+# Stale pending orders settled per sweep
+SWEEP_BATCH_SIZE = 100
+
+# (product, quantity) per line of a cart or an order
+Lines = list[tuple[Product, int]]
+
 
 class CheckoutService:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
         self.cart_repo = CartRepository(db)
         self.order_repo = OrderRepository(db)
         self.product_repo = ProductRepository(db)
+        self.facet_repo = FacetRepository(db)
+        self.outbox_repo = OutboxRepository(db)
+        self.inventory_service = InventoryService(db)
         self.payment_service = PaymentService(db)
 
-    def create_order_from_cart(
+    async def create_order_from_cart(
         self, user: User, order_create: OrderCreateSchema
     ) -> Order:
+        """
+        Checkout in two short transactions, with the payment gateway
+        awaited in between while no database connection is held:
+
+        1. Take stock and record the order and its payment as pending.
+           Stock is taken with a conditional UPDATE per product, in
+           product id order so concurrent checkouts lock rows in the
+           same order; if any product is short nothing is written.
+           Products with inventory buckets are reserved beforehand, in
+           a transaction of their own.
+        2. Confirm the order, consume the holds and clear the cart, or
+           give the stock back and cancel the order if payment failed.
+           Either way the order's snapshot and an outbox event are
+           committed with it; whatever else follows from the outcome
+           runs in the outbox worker, off the request path.
+
+        A charge that timed out may still have gone through, so it is
+        voided before the order is cancelled. If the void cannot be
+        made either, the order stays pending and settle_stale voids
+        and cancels it later, as it does for a request that died
+        between the two transactions.
+        """
+        if not self.payment_service.available():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=PAYMENT_UNAVAILABLE,
+            )
+
         # Get user's cart items
-        cart_items = self.cart_repo.get_user_cart(user.id)
+        cart_items = await self.cart_repo.get_user_cart(user.id)
         if not cart_items:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Cart is empty"
             )
+        cart_items = sorted(cart_items, key=lambda item: item.product_id)
 
-        # Verify stock availability and calculate total
+        bucketed = await self.inventory_service.bucketed(
+            cart_item.product_id for cart_item in cart_items
+        )
+        reserved = [
+            (cart_item.product, cart_item.quantity)
+            for cart_item in cart_items
+            if cart_item.product_id in bucketed
+        ]
+        reservation = await self.inventory_service.reserve(user.id, reserved)
+
+        # Take stock and calculate total
         total_price = 0
         order_items_data = []
+        facet_changes = []
 
         for cart_item in cart_items:
             product = cart_item.product
-
-            # Check stock availability
-            if cart_item.quantity > product.stock:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for product: {product.name}",
+            if product.id not in bucketed:
+                remaining = await self.product_repo.decrement_stock(
+                    product,
+                    cart_item.quantity,
                 )
+                if remaining is None:
+                    # Read before the rollback expires the product
+                    detail = f"Insufficient stock for product: {product.name}"
+                    await self._abort(reservation)
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST, detail=detail
+                    )
 
-            item_total = product.price * cart_item.quantity
-            total_price += item_total
+                after = facet_state(product)
+                if after is not None:
+                    category, price, _ = after
+                    before = (
+                        category,
+                        price,
+                        remaining + cart_item.quantity > 0,
+                    )
+                    facet_changes.append((before, after))
 
+            total_price += product.price * cart_item.quantity
             order_items_data.append(
                 {
                     "product_id": product.id,
                     "quantity": cart_item.quantity,
                     "price": product.price,
+                    "category": product.category,
                 }
             )
 
-        # Create order
-        order = self.order_repo.create(user.id, total_price)
+        # Create order, its items and the payment record
+        order, payment = await self.order_repo.create(
+            user.id,
+            total_price,
+            order_items_data,
+            order_create.payment_method,
+        )
+        await self.facet_repo.apply(facet_changes)
+        await self.db.commit()
 
-        # Add order items
-        self.order_repo.add_order_items(order, order_items_data)
+        lines = [
+            (cart_item.product, cart_item.quantity) for cart_item in cart_items
+        ]
 
-        # Create payment record
-        payment = self.order_repo.create_payment(
-            order.id,
-            order_create.payment_method,
+        async def cancel() -> None:
+            await self._cancel(order, payment, lines, bucketed, reservation)
+
+        # The commit above handed the connection back to the pool
+        try:
+            payment_result = await self.payment_service.process_payment(
+                order.id, total_price, order_create.payment_method
+            )
+        except CircuitOpen:
+            # Never sent, so there is nothing to void
+            await cancel()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=PAYMENT_UNAVAILABLE,
+            )
+        except PaymentUnavailable:
+            if await self._void(order.id):
+                await cancel()
+            else:
+                await self._abort(reservation)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=PAYMENT_UNAVAILABLE,
+            )
+
+        if payment_result["status"] != "completed":
+            await cancel()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payment processing failed",
+            )
+
+        if reservation and not await self.inventory_service.consume(
+            reservation,
+            sum(quantity for _, quantity in reserved),
+        ):
+            # Payment took longer than the hold; its units may be sold
+            await cancel()
+            await self._refund(payment_result, total_price)
+            raise self._reservation_expired()
+
+        if not await self.order_repo.settle(order, "confirmed"):
+            # Swept as stale meanwhile: its stock was given back
+            await self._abort(reservation)
+            await self._refund(payment_result, total_price)
+            raise self._reservation_expired()
+
+        await self.order_repo.update_payment_status(payment, "completed")
+        await self.cart_repo.clear_cart(user.id, commit=False)
+        await self._add_event(ORDER_CONFIRMED, order, lines)
+        order = await self._freeze(order)
+        await self.db.commit()
+        outbox_worker.wake()
+
+        # Kept inline so the buyer's next read shows the new stock
+        product_ids = [cart_item.product_id for cart_item in cart_items]
+        await self.product_repo.invalidate_cached(*product_ids)
+
+        return order
+
+    async def _abort(self, reservation: Optional[str]) -> None:
+        """Undo the checkout so far, including a committed reservation."""
+        await self.db.rollback()
+        if reservation:
+            await self.inventory_service.release(reservation)
+            await self.db.commit()
+
+    async def _cancel(
+        self,
+        order: Order,
+        payment: Payment,
+        lines: Lines,
+        bucketed: set[int],
+        reservation: Optional[str],
+    ) -> bool:
+        """
+        Give the stock back but keep the cancelled order on record.
+        False if the order was settled elsewhere; a reservation is
+        released either way.
+        """
+        if reservation:
+            await self.inventory_service.release(reservation)
+        if not await self.order_repo.settle(order, "cancelled"):
+            await self.db.commit()
+            return False
+
+        facet_changes = []
+        for product, quantity in lines:
+            if product.id in bucketed:
+                continue
+            stock = await self.product_repo.increment_stock(product, quantity)
+            after = facet_state(product)
+            if after is not None:
+                category, price, _ = after
+                before = (category, price, stock - quantity > 0)
+                facet_changes.append((before, after))
+
+        await self.order_repo.update_payment_status(payment, "failed")
+        await self.facet_repo.apply(facet_changes)
+        await self._add_event(ORDER_CANCELLED, order, lines)
+        await self._freeze(order)
+        await self.db.commit()
+        outbox_worker.wake()
+        await self.product_repo.invalidate_cached(
+            *(product.id for product, _ in lines)
         )
+        return True
+
+    async def settle_stale(self) -> int:
+        """
+        Void and cancel orders left pending past
+        checkout_pending_timeout_seconds: their request died between
+        the two checkout transactions, or their charge timed out and
+        could not be voided. One the gateway cannot void now is tried
+        again on the next sweep. Returns how many were cancelled.
 
-        # Process payment (simulated)
-        payment_result = self.payment_service.process_payment(
-            order.id, total_price, order_create.payment_method
+        Stock of bucketed products is not touched here; their holds
+        expire and are given back by inventory maintenance.
+        """
+        before = utcnow() - timedelta(
+            seconds=settings.checkout_pending_timeout_seconds
+        )
+        orders = await self.order_repo.get_stale_pending(
+            before, SWEEP_BATCH_SIZE
         )
+        # Do not hold a transaction open across the gateway calls
+        await self.db.commit()
 
-        if payment_result["status"] == "completed":
-            # Update payment status
-            self.order_repo.update_payment_status(payment, "completed")
+        cancelled = 0
+        for order in orders:
+            if not await self._void(order.id):
+                continue
+            lines = [
+                (item.product, item.quantity) for item in order.order_items
+            ]
+            bucketed = await self.inventory_service.bucketed(
+                product.id for product, _ in lines
+            )
+            if await self._cancel(order, order.payment, lines, bucketed, None):
+                cancelled += 1
+        return cancelled
 
-            # Update order status
-            self.order_repo.update_order_status(order, "confirmed")
+    async def _freeze(self, order: Order) -> Order:
+        """
+        Store the order as it reads now that it is final; order detail
+        serves this instead of joining to the live product rows.
+        Returns the order loaded with its items and products.
+        """
+        order = await self.order_repo.get_by_id(order.id)
+        await self.order_repo.set_snapshot(order, OrderService.render(order))
+        return order
 
-            # Update product stock
-            for cart_item in cart_items:
-                product = cart_item.product
-                product.stock -= cart_item.quantity
+    async def _add_event(
+        self,
+        topic: str,
+        order: Order,
+        lines: Lines,
+    ) -> None:
+        await self.outbox_repo.add(
+            topic,
+            {
+                "order_id": order.id,
+                "user_id": order.user_id,
+                "total_price": order.total_price,
+                "items": [
+                    {"product_id": product.id, "quantity": quantity}
+                    for product, quantity in lines
+                ],
+            },
+        )
 
-            # Clear user's cart
-            self.cart_repo.clear_cart(user.id)
-        else:
-            # Handle payment failure
-            self.order_repo.update_payment_status(payment, "failed")
-            self.order_repo.update_order_status(order, "cancelled")
+    async def _void(self, order_id: int) -> bool:
+        """Void the order's charge; False if the gateway is unavailable."""
+        try:
+            await self.payment_service.void_payment(order_id)
+        except PaymentUnavailable:
+            logger.warning("Void of order %s failed", order_id)
+            return False
+        return True
 
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Payment processing failed",
+    @staticmethod
+    def _reservation_expired() -> HTTPException:
+        # Retry-After: the idempotency layer must not store this answer
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=RESERVATION_EXPIRED,
+            headers={"Retry-After": "1"},
+        )
+
+    async def _refund(self, payment_result: dict, amount: float) -> None:
+        try:
+            await self.payment_service.refund_payment(
+                payment_result["transaction_id"],
+                amount,
+            )
+        except PaymentUnavailable:
+            logger.exception(
+                "Refund of %s failed", payment_result["transaction_id"]
             )
 
-        # Return updated order with items
-        return self.order_repo.get_by_id(order.id)
+
+async def settle_stale_checkouts(interval_seconds: float) -> None:
+    """Every `interval_seconds`, void and cancel stale pending orders."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with SessionLocal() as db:
+                await CheckoutService(db).settle_stale()
+        except Exception:
+            logger.exception("Settling stale checkouts failed")
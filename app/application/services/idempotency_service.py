@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.infrastructure.cache.idempotency_cache import (
+    Scope,
+    StoredResponse,
+    idempotency_cache,
+)
+from app.infrastructure.repositories.idempotency_repository import (
+    IdempotencyRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+# Between reads of a key whose original runs in another process
+POLL_SECONDS = 0.05
+PURGE_INTERVAL_SECONDS = 60 * 60
+
+# Runs the request; returns its status code and JSON body
+Handler = Callable[[], Awaitable[tuple[int, Optional[str]]]]
+
+
+class IdempotencyService:
+    """
+    Runs a request at most once per (user, Idempotency-Key). The first
+    request claims the key in the database and stores its response;
+    a duplicate arriving meanwhile waits for it, a later one gets the
+    stored response replayed without running anything.
+
+    Client errors are stored like successes, unless they carry
+    Retry-After: those and server errors release the key so that a
+    retry runs again.
+
+    An in-flight claim is a short lease (idempotency_lease_seconds), so
+    a key whose request died with its worker frees up quickly; only a
+    stored response is kept for idempotency_ttl_seconds.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.idempotency_repo = IdempotencyRepository(db)
+
+    async def run(
+        self,
+        user_id: int,
+        key: str,
+        fingerprint: str,
+        handler: Handler,
+    ) -> tuple[StoredResponse, bool]:
+        """Returns the response and whether it was replayed."""
+        scope = (user_id, key)
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+        while True:
+            stored = idempotency_cache.get(scope)
+            if stored is not None:
+                return self._replay(stored, fingerprint), True
+
+            event = idempotency_cache.in_flight.get(scope)
+            if event is None:
+                break
+            try:
+                await asyncio.wait_for(
+                    event.wait(), max(deadline - time.monotonic(), 0)
+                )
+            except asyncio.TimeoutError:
+                raise self._in_progress()
+
+        event = idempotency_cache.in_flight[scope] = asyncio.Event()
+        try:
+            stored = await self._await_other(scope, fingerprint, deadline)
+            if stored is not None:
+                idempotency_cache.set(scope, stored)
+                return self._replay(stored, fingerprint), True
+            return await self._execute(scope, fingerprint, handler), False
+        finally:
+            del idempotency_cache.in_flight[scope]
+            event.set()
+
+    async def _await_other(
+        self,
+        scope: Scope,
+        fingerprint: str,
+        deadline: float,
+    ) -> Optional[StoredResponse]:
+        """
+        Claim the key, or wait for the request that holds it to finish
+        and return its response. None once this request owns the key.
+        """
+        user_id, key = scope
+        while True:
+            now = utcnow()
+            lease_until = now + timedelta(
+                seconds=settings.idempotency_lease_seconds
+            )
+            if await self.idempotency_repo.claim(
+                user_id, key, fingerprint, now, lease_until
+            ):
+                return None
+
+            record = await self.idempotency_repo.get(user_id, key)
+            # Do not hold a connection between polls
+            await self.db.rollback()
+            if record is not None and record.status_code is not None:
+                return StoredResponse(*record)
+            if time.monotonic() >= deadline:
+                raise self._in_progress()
+            if record is not None:
+                await asyncio.sleep(POLL_SECONDS)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        fingerprint: str,
+        handler: Handler,
+    ) -> StoredResponse:
+        user_id, key = scope
+        try:
+            status_code, body = await handler()
+        except HTTPException as e:
+            if e.status_code >= 500 or self._retryable(e):
+                await self._release(scope)
+                raise
+            status_code, body = e.status_code, json.dumps({"detail": e.detail})
+        except BaseException:
+            await self._release(scope)
+            raise
+
+        stored = StoredResponse(fingerprint, status_code, body)
+        expires_at = utcnow() + timedelta(
+            seconds=settings.idempotency_ttl_seconds
+        )
+        await self.idempotency_repo.complete(
+            user_id, key, status_code, body, expires_at
+        )
+        idempotency_cache.set(scope, stored)
+        return stored
+
+    async def _release(self, scope: Scope) -> None:
+        try:
+            await self.db.rollback()
+            await self.idempotency_repo.release(*scope)
+        except Exception:
+            # It then stays in flight until it expires
+            logger.exception("Releasing idempotency key %s failed", scope)
+
+    @staticmethod
+    def _retryable(error: HTTPException) -> bool:
+        # e.g. a reservation that ran out: the same request may succeed
+        return "Retry-After" in (error.headers or {})
+
+    @staticmethod
+    def _replay(stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for another request",
+            )
+        return stored
+
+    @staticmethod
+    def _in_progress() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is in progress",
+        )
+
+
+async def purge_idempotency_keys(interval_seconds: float) -> None:
+    """Delete expired idempotency keys every `interval_seconds`."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with SessionLocal() as db:
+                await IdempotencyRepository(db).purge_expired(utcnow())
+        except Exception:
+            logger.exception("Idempotency key purge failed")
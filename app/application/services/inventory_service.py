@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.domain.entities.product import Product
+from app.infrastructure.repositories.facet_repository import (
+    FacetRepository,
+    facet_state,
+)
+from app.infrastructure.repositories.inventory_repository import (
+    InventoryRepository,
+)
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from app.application.schemas.inventory import (
+    InventorySchema,
+    InventoryUpdateSchema,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryService:
+    """
+    Time-limited stock reservations for products whose stock is split
+    into buckets. Checkout reserves in a short transaction of its own,
+    each unit taken from one of several bucket rows, so concurrent
+    checkouts of the same product rarely wait on each other. Holds are
+    consumed with the order, given back on payment failure and expire
+    on their own; reconciliation copies the bucket totals back into
+    Product.stock.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.inventory_repo = InventoryRepository(db)
+        self.product_repo = ProductRepository(db)
+        self.facet_repo = FacetRepository(db)
+
+    async def bucketed(self, product_ids: Iterable[int]) -> set[int]:
+        return await self.inventory_repo.bucketed(product_ids)
+
+    async def get_inventory(self, product: Product) -> InventorySchema:
+        buckets = await self.inventory_repo.get_buckets(product.id)
+        return InventorySchema(
+            product_id=product.id,
+            available=(
+                sum(b.available for b in buckets) if buckets else product.stock
+            ),
+            held=await self.inventory_repo.held(product.id),
+            buckets=[b.available for b in buckets],
+        )
+
+    async def set_inventory(
+        self,
+        product: Product,
+        inventory_update: InventoryUpdateSchema,
+    ) -> InventorySchema:
+        """
+        Set a product's free stock and how many buckets it is split
+        over; zero buckets moves it back to the product row.
+        """
+        current = len(await self.inventory_repo.get_buckets(product.id))
+        buckets = inventory_update.buckets
+        if buckets is None:
+            buckets = current or settings.inventory_buckets
+        # Holds go back to the bucket they came from
+        if buckets != current and await self.inventory_repo.held(product.id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Bucket count cannot change while holds are open",
+            )
+
+        before = facet_state(product)
+        await self.inventory_repo.set_buckets(
+            product.id,
+            inventory_update.stock,
+            buckets,
+        )
+        product.stock = inventory_update.stock
+        await self.facet_repo.apply([(before, facet_state(product))])
+        await self.db.commit()
+        await self.product_repo.invalidate_cached(product.id)
+        return await self.get_inventory(product)
+
+    async def reserve(
+        self,
+        user_id: int,
+        items: list[tuple[Product, int]],
+    ) -> Optional[str]:
+        """
+        Hold stock of bucketed products for a checkout and commit, so
+        the holds outlive the caller's transaction. Returns the
+        reservation id, or None when there is nothing to hold.
+        """
+        if not items:
+            return None
+
+        reservation = uuid.uuid4().hex
+        expires_at = utcnow() + timedelta(
+            seconds=settings.inventory_hold_seconds
+        )
+        for product, quantity in sorted(items, key=lambda item: item[0].id):
+            portions = await self.inventory_repo.take(product.id, quantity)
+            if portions is None:
+                # Read before the rollback expires the product
+                detail = f"Insufficient stock for product: {product.name}"
+                await self.db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=detail
+                )
+            await self.inventory_repo.add_holds(
+                reservation,
+                user_id,
+                product.id,
+                portions,
+                expires_at,
+            )
+
+        await self.db.commit()
+        return reservation
+
+    async def consume(self, reservation: str, quantity: int) -> bool:
+        """
+        Turn a reservation's holds into sold units, inside the caller's
+        transaction. False, with any holds left given back, if some of
+        them expired first.
+        """
+        claimed = await self.inventory_repo.claim_holds(reservation)
+        if sum(units for _, _, units in claimed) == quantity:
+            return True
+        await self.inventory_repo.give_back(claimed)
+        return False
+
+    async def release(self, reservation: str) -> None:
+        """Give a reservation's units back in the caller's transaction."""
+        claimed = await self.inventory_repo.claim_holds(reservation)
+        await self.inventory_repo.give_back(claimed)
+
+    async def release_expired(self) -> int:
+        released = 0
+        while True:
+            claimed = await self.inventory_repo.claim_expired(utcnow())
+            if not claimed:
+                return released
+            await self.inventory_repo.give_back(claimed)
+            await self.db.commit()
+            released += len(claimed)
+
+    async def reconcile(self) -> int:
+        """
+        Copy bucket totals into Product.stock, which listings, facets
+        and the cache read. Returns how many products changed.
+        """
+        drifted = await self.inventory_repo.get_drifted()
+        if not drifted:
+            return 0
+
+        changes = []
+        for product, available in drifted:
+            before = facet_state(product)
+            product.stock = available
+            changes.append((before, facet_state(product)))
+        await self.facet_repo.apply(changes)
+        await self.db.commit()
+        await self.product_repo.invalidate_cached(
+            *(product.id for product, _ in drifted)
+        )
+        return len(drifted)
+
+
+async def maintain_inventory(interval_seconds: float) -> None:
+    """
+    Every `interval_seconds`, give back expired holds and reconcile
+    bucket totals into product stock.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with SessionLocal() as db:
+                inventory_service = InventoryService(db)
+                await inventory_service.release_expired()
+                await inventory_service.reconcile()
+        except Exception:
+            logger.exception("Inventory maintenance failed")
@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.domain.entities.order import Order
+from app.infrastructure.cache.order_cache import order_snapshots
+from app.infrastructure.repositories.order_repository import OrderRepository
+from app.application.schemas.order import OrderSchema
+
+# Order history is always newest first
+HISTORY_SORT = "created_at"
+
+
+class OrderService:
+    """
+    A user's order history, newest first, paged by keyset cursor:
+    full orders with their items and products, or summaries that stop
+    at the order row and an item count.
+
+    Order detail is served from the snapshot frozen when the order was
+    confirmed or cancelled, so it shows products as they were bought.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.order_repo = OrderRepository(db)
+
+    @staticmethod
+    def decode(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+        if not cursor:
+            return None
+        try:
+            return decode_cursor(cursor, HISTORY_SORT, True)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+            )
+
+    @staticmethod
+    def next_cursor(
+        orders: Sequence[Union[Order, Row]],
+        limit: int,
+    ) -> Optional[str]:
+        # Only a full page may have a successor
+        if len(orders) < limit:
+            return None
+        last = orders[-1]
+        return encode_cursor(HISTORY_SORT, True, last.created_at, last.id)
+
+    async def get_orders(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> list[Order]:
+        return await self.order_repo.get_user_orders(
+            user_id, self.decode(cursor), limit
+        )
+
+    @staticmethod
+    def render(order: Order) -> str:
+        """The order as OrderSchema JSON; needs items and products."""
+        return OrderSchema.model_validate(order).model_dump_json()
+
+    async def get_order_json(self, user_id: int, order_id: int) -> str:
+        """
+        The user's order as JSON: a cached snapshot, else one primary
+        key lookup that also checks ownership. Another user's order is
+        not found rather than forbidden, so ids reveal nothing.
+        """
+        cached = order_snapshots.get(order_id)
+        if cached is not None:
+            owner_id, snapshot = cached
+            if owner_id != user_id:
+                raise self._not_found()
+            return snapshot
+
+        row = await self.order_repo.get_snapshot(order_id, user_id)
+        if row is None:
+            raise self._not_found()
+        if row.snapshot is not None:
+            order_snapshots.set(order_id, (user_id, row.snapshot))
+            return row.snapshot
+
+        # Payment still in flight: render the live rows, uncached
+        order = await self.order_repo.get_by_id(order_id, user_id)
+        if order is None:
+            raise self._not_found()
+        return self.render(order)
+
+    @staticmethod
+    def _not_found() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
+        )
+
+    async def get_summaries(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> list[Row]:
+        return await self.order_repo.get_user_order_summaries(
+            user_id, self.decode(cursor), limit
+        )
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.infrastructure.repositories.outbox_repository import (
+    OutboxRepository,
+)
+from app.infrastructure.search.autocomplete import autocomplete_index
+from app.application.services.analytics_service import AnalyticsService
+
+logger = logging.getLogger(__name__)
+
+ORDER_CONFIRMED = "order.confirmed"
+ORDER_CANCELLED = "order.cancelled"
+
+# Delivery is at least once: a handler may see an event again after a
+# crash or a lease running out, so it must tolerate repeats. It gets
+# the worker's session and commits its own writes
+Handler = Callable[[AsyncSession, dict[str, Any]], Awaitable[None]]
+
+
+async def on_order_confirmed(
+    db: AsyncSession,
+    payload: dict[str, Any],
+) -> None:
+    # First: a failure here must not repeat the non-idempotent steps
+    await AnalyticsService(db).roll_up([payload["order_id"]])
+    for item in payload["items"]:
+        autocomplete_index.add_popularity(
+            item["product_id"],
+            item["quantity"],
+        )
+    logger.info(
+        "Order %s confirmed for user %s",
+        payload["order_id"],
+        payload["user_id"],
+    )
+
+
+async def on_order_cancelled(
+    db: AsyncSession,
+    payload: dict[str, Any],
+) -> None:
+    logger.info(
+        "Order %s cancelled for user %s",
+        payload["order_id"],
+        payload["user_id"],
+    )
+
+
+HANDLERS: dict[str, Handler] = {
+    ORDER_CONFIRMED: on_order_confirmed,
+    ORDER_CANCELLED: on_order_cancelled,
+}
+
+
+class OutboxService:
+    """
+    Delivers outbox events to their handlers. Events are written by
+    the transaction that causes them, so a side effect runs only for
+    changes that were committed, and is retried with exponential
+    backoff until it succeeds or its attempts are used up.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        handlers: Optional[dict[str, Handler]] = None,
+    ) -> None:
+        self.db = db
+        self.outbox_repo = OutboxRepository(db)
+        self.handlers = HANDLERS if handlers is None else handlers
+
+    async def drain(self, limit: int) -> int:
+        """Deliver up to `limit` due events; returns how many were due."""
+        now = utcnow()
+        events = await self.outbox_repo.claim(
+            now,
+            now + timedelta(seconds=settings.outbox_lease_seconds),
+            limit,
+        )
+        delivered = []
+        for event in events:
+            try:
+                handler = self.handlers.get(event.topic)
+                if handler is None:
+                    raise LookupError(f"No handler for {event.topic}")
+                await handler(self.db, json.loads(event.payload))
+            except Exception as e:
+                await self.db.rollback()
+                await self._failed(event, e)
+            else:
+                delivered.append(event.id)
+        if delivered:
+            await self.outbox_repo.delete(delivered)
+        return len(events)
+
+    async def _failed(self, event: Row, error: Exception) -> None:
+        attempts = event.attempts + 1
+        reason = f"{type(error).__name__}: {error}"
+        if attempts >= settings.outbox_max_attempts:
+            logger.error(
+                "Outbox event %s (%s) dead-lettered after %s attempts",
+                event.id,
+                event.topic,
+                attempts,
+                exc_info=error,
+            )
+            await self.outbox_repo.dead_letter(
+                event.id, attempts, utcnow(), reason
+            )
+            return
+
+        delay = settings.outbox_retry_base_seconds * 2 ** (attempts - 1)
+        logger.warning(
+            "Outbox event %s (%s) failed, retrying in %ss",
+            event.id,
+            event.topic,
+            delay,
+            exc_info=error,
+        )
+        await self.outbox_repo.retry(
+            event.id,
+            attempts,
+            utcnow() + timedelta(seconds=delay),
+            reason,
+        )
+
+    async def stats(self) -> dict[str, int]:
+        return await self.outbox_repo.stats(utcnow())
+
+
+class OutboxWorker:
+    """
+    Drains the outbox in the background: as soon as a request commits
+    events and calls `wake`, and every `poll_seconds` otherwise, which
+    also picks up retries and events committed by other processes.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def wake(self) -> None:
+        if self._loop is not None and self._wake is not None:
+            # Safe from any thread, and a no-op while the worker is down
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self, poll_seconds: float, batch_size: int) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                self._wake.clear()
+                try:
+                    async with SessionLocal() as db:
+                        outbox_service = OutboxService(db)
+                        # A full batch means more may be due
+                        while (
+                            await outbox_service.drain(batch_size)
+                            == batch_size
+                        ):
+                            pass
+                except Exception:
+                    logger.exception("Outbox drain failed")
+                try:
+                    await asyncio.wait_for(self._wake.wait(), poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = self._wake = None
+
+
+outbox_worker = OutboxWorker()
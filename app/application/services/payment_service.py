@@ -1,53 +1,50 @@
-import random
+from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.gateways.payment_gateway import (
+    PaymentGateway,
+    payment_gateway,
+)
 
 
 class PaymentService:
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: AsyncSession,
+        gateway: Optional[PaymentGateway] = None,
+    ) -> None:
         self.db = db
+        self.gateway = gateway or payment_gateway
 
-    def process_payment(
+    def available(self) -> bool:
+        """False while the gateway's circuit is open."""
+        check = getattr(self.gateway, "available", None)
+        return check() if check is not None else True
+
+    async def process_payment(
         self,
         order_id: int,
         amount: float,
         payment_method: str,
     ) -> dict:
         """
-        Simulated payment processing
-        In a real application, this would integrate with
-        payment processors like Stripe, PayPal, etc.
+        Charge through the payment gateway. Touches no database state,
+        so callers should not hold a transaction open across it. Raises
+        PaymentUnavailable when the gateway cannot be reached.
         """
+        return await self.gateway.charge(order_id, amount, payment_method)
 
-        # Simulate payment processing delay and random success/failure
-        success_rate = 0.9  # 90% success rate for simulation
-        transaction_id = f"txn_{order_id}_{random.randint(1000, 9999)}"
-
-        if random.random() < success_rate:
-            return {
-                "status": "completed",
-                "transaction_id": transaction_id,
-                "amount": amount,
-                "payment_method": payment_method,
-            }
-        else:
-            return {
-                "status": "failed",
-                "error": "Payment processing failed",
-                "amount": amount,
-                "payment_method": payment_method,
-            }
-
-    def refund_payment(
+    async def refund_payment(
         self,
         transaction_id: str,
         amount: float,
     ) -> dict:
+        return await self.gateway.refund(transaction_id, amount)
+
+    async def void_payment(self, order_id: int) -> dict:
         """
-        Simulated refund processing
+        Cancel whatever the gateway charged for the order, including a
+        charge whose answer never arrived. Safe to repeat.
         """
-        return {
-            "status": "refunded",
-            "refund_id": f"ref_{transaction_id}_{random.randint(1000, 9999)}",
-            "amount": amount,
-        }
+        return await self.gateway.void(order_id)
@@ -0,0 +1,72 @@
+import csv
+import io
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from app.application.schemas.product import ProductSchema
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_FIELDS = list(ProductSchema.model_fields)
+
+# Rows fetched per server-side cursor round trip
+EXPORT_BATCH_SIZE = 1000
+# Bytes buffered before a chunk is handed to the response
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class ProductExportService:
+    """
+    Serializes the catalog as NDJSON or CSV while it is read from a
+    server-side cursor, so the export is never held in memory as a
+    whole.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.product_repo = ProductRepository(db)
+
+    async def export(
+        self,
+        export_format: str,
+        category: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        if updated_since is not None and updated_since.tzinfo is not None:
+            # Timestamps are stored as naive UTC
+            updated_since = updated_since.astimezone(timezone.utc).replace(
+                tzinfo=None
+            )
+        stmt = self.product_repo.export_query(category, updated_since)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(EXPORT_FIELDS)
+
+        async for product in self.product_repo.stream(
+            stmt,
+            batch_size=EXPORT_BATCH_SIZE,
+        ):
+            schema = ProductSchema.model_validate(product)
+            if export_format == "csv":
+                row = schema.model_dump(mode="json")
+                writer.writerow(row[field] for field in EXPORT_FIELDS)
+            else:
+                buffer.write(schema.model_dump_json())
+                buffer.write("\n")
+
+            if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
@@ -0,0 +1,218 @@
+import csv
+import json
+import time
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.infrastructure.repositories.facet_repository import (
+    FacetRepository,
+)
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from app.application.schemas.product import (
+    ProductCreateSchema,
+    ProductImportErrorSchema,
+    ProductImportReportSchema,
+)
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+class RowError(ValueError):
+    def __init__(self, *errors: str) -> None:
+        super().__init__(*errors)
+        self.errors = list(errors)
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, str]]:
+    """
+    Yield (line number, text) from a byte stream, holding at most one
+    partial line in memory. A UTF-8 BOM on the first line is dropped.
+    """
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, _decode(line, first=number == 1)
+    if buffer:
+        number += 1
+        yield number, _decode(buffer, first=number == 1)
+
+
+def _decode(line: bytes, first: bool) -> str:
+    try:
+        text = line.decode("utf-8-sig" if first else "utf-8")
+    except UnicodeDecodeError:
+        # Keep going; the row is then most likely rejected by validation
+        text = line.decode("utf-8", errors="replace")
+    return text.rstrip("\r")
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[tuple[int, str]],
+) -> AsyncIterator[tuple[int, Any]]:
+    """
+    Yield (line number, dict) per CSV record keyed by the header row.
+    A quoted field may span lines: a record is complete once it holds
+    an even number of quote characters.
+    """
+    header: list[str] | None = None
+    pending: list[str] = []
+    start = 0
+    async for number, line in lines:
+        if not pending:
+            start = number
+            if not line.strip():
+                continue
+        pending.append(line)
+        text = "\n".join(pending)
+        if text.count('"') % 2:
+            continue
+        pending = []
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, RowError(
+                f"expected {len(header)} fields, got {len(values)}"
+            )
+            continue
+        # Empty cells fall back to the schema defaults
+        yield start, {
+            name: value for name, value in zip(header, values) if value != ""
+        }
+
+    if pending:
+        yield start, RowError("unterminated quoted field")
+
+
+async def iter_ndjson_records(
+    lines: AsyncIterator[tuple[int, str]],
+) -> AsyncIterator[tuple[int, Any]]:
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, RowError(f"invalid JSON: {e.msg}")
+            continue
+        if not isinstance(record, dict):
+            yield number, RowError("expected a JSON object")
+            continue
+        yield number, record
+
+
+def format_errors(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in error.errors()
+    ]
+
+
+class ProductImportService:
+    """
+    Streams a CSV or NDJSON product feed into the catalog. Rows are
+    validated one at a time and upserted on sku in fixed-size batches,
+    each committed on its own, so memory stays flat regardless of the
+    feed size and a bad row only costs itself.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.product_repo = ProductRepository(db)
+        self.facet_repo = FacetRepository(db)
+
+    @staticmethod
+    def get_format(content_type: str | None) -> str:
+        media_type = (content_type or "").split(";")[0].strip().lower()
+        if media_type not in IMPORT_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Import expects text/csv or application/x-ndjson",
+            )
+        return IMPORT_FORMATS[media_type]
+
+    async def import_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        content_type: str | None,
+    ) -> ProductImportReportSchema:
+        import_format = self.get_format(content_type)
+        parse = (
+            iter_csv_records if import_format == "csv" else iter_ndjson_records
+        )
+
+        started = time.perf_counter()
+        processed = upserted = failed = 0
+        errors: list[ProductImportErrorSchema] = []
+        batch: dict[Any, dict[str, Any]] = {}
+
+        async for number, record in parse(iter_lines(chunks)):
+            processed += 1
+            try:
+                row = self._validate(record)
+            except RowError as e:
+                failed += 1
+                if len(errors) < settings.product_import_max_errors:
+                    errors.append(
+                        ProductImportErrorSchema(line=number, errors=e.errors)
+                    )
+                continue
+
+            # The last occurrence of a sku within a batch wins; a batch
+            # may not hit the same conflict target twice on PostgreSQL
+            key = row["sku"] if row["sku"] is not None else ("line", number)
+            batch[key] = row
+            if len(batch) >= settings.product_import_batch_size:
+                upserted += await self._flush(batch)
+
+        upserted += await self._flush(batch)
+        # An upsert does not say what it replaced, so recount once at
+        # the end instead of folding per-row deltas; likewise reindex
+        # names once, ranked off the event loop
+        if upserted:
+            await self.facet_repo.rebuild()
+            await self.product_repo.rebuild_autocomplete()
+
+        elapsed = time.perf_counter() - started
+        return ProductImportReportSchema(
+            processed=processed,
+            upserted=upserted,
+            failed=failed,
+            errors=errors,
+            errors_truncated=failed > len(errors),
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(processed / elapsed, 1) if elapsed else 0.0,
+        )
+
+    @staticmethod
+    def _validate(record: Any) -> dict[str, Any]:
+        if isinstance(record, RowError):
+            raise record
+        try:
+            return ProductCreateSchema.model_validate(record).model_dump()
+        except ValidationError as e:
+            raise RowError(*format_errors(e))
+
+    async def _flush(self, batch: dict[Any, dict[str, Any]]) -> int:
+        rows = list(batch.values())
+        batch.clear()
+        return len(await self.product_repo.upsert_many(rows))
+
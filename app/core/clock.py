@@ -0,0 +1,9 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """
+    The current UTC time, naive. Every DateTime column stores naive
+    UTC: asyncpg rejects aware values for TIMESTAMP WITHOUT TIME ZONE.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,9 +1,90 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Sync driver -> asyncio driver used by the application engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
 
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./ecommerce.db"
+    async_database_url: str | None = None
+
+    # Read replicas
+    database_replica_urls: list[str] = []
+    replica_ejection_seconds: float = 30.0
+
+    # Connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_pool_use_lifo: bool = False
+
+    # SQLite performance profile
+    sqlite_performance_profile: bool = False
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Product cache
+    product_cache_enabled: bool = True
+    product_cache_ttl_seconds: float = 60.0
+    product_cache_max_entries: int = 10_000
+    product_cache_local_ttl_seconds: float = 1.0
+    cache_backend_url: str | None = None
+
+    # Autocomplete
+    autocomplete_refresh_seconds: float = 600.0
+
+    # Inventory reservations
+    inventory_buckets: int = 8
+    inventory_hold_seconds: float = 600.0
+    inventory_maintenance_seconds: float = 5.0
+
+    # Payment gateway
+    payment_gateway_latency_seconds: float = 0.1
+    payment_gateway_failure_rate: float = 0.1
+    payment_gateway_timeout_seconds: float = 5.0
+    payment_gateway_max_concurrency: int = 50
+    payment_breaker_failure_threshold: int = 5
+    payment_breaker_reset_seconds: float = 30.0
+
+    # Stale checkouts
+    checkout_pending_timeout_seconds: float = 300.0
+    checkout_sweep_seconds: float = 60.0
+
+    # Idempotency keys
+    idempotency_ttl_seconds: float = 24 * 60 * 60
+    idempotency_lease_seconds: float = 60.0
+    idempotency_cache_max_entries: int = 10_000
+    idempotency_wait_seconds: float = 10.0
+
+    # Outbox worker
+    outbox_batch_size: int = 100
+    outbox_poll_seconds: float = 1.0
+    outbox_lease_seconds: float = 60.0
+    outbox_max_attempts: int = 5
+    outbox_retry_base_seconds: float = 1.0
+
+    # Order snapshots
+    order_snapshot_cache_max_entries: int = 10_000
+
+    # Sales analytics
+    sales_backfill_chunk_size: int = 1000
+
+    # Bulk product import
+    product_import_batch_size: int = 1000
+    product_import_max_errors: int = 100
 
     # Security
     secret_key: str = "lorem-ipsum-dolor-sit-amet"
@@ -16,5 +97,16 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file=".env")
 
+    def get_async_database_url(self) -> str:
+        """
+        URL for the application's AsyncEngine. An explicit
+        ASYNC_DATABASE_URL wins, otherwise the asyncio driver is
+        derived from DATABASE_URL (which alembic keeps using).
+        """
+        if self.async_database_url:
+            return self.async_database_url
+
+        return to_async_url(self.database_url)
+
 
 settings = Settings()
@@ -1,24 +1,117 @@
-from typing import Generator
+from typing import Any, AsyncGenerator
 
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.orm import sessionmaker
 
-from app.core.config import settings
+from app.core.config import settings, to_async_url
+from app.core.pool_metrics import InstrumentedQueuePool, PoolMetrics
+from app.core.replicas import ReplicaRouter
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_engine_options(url: str) -> dict:
+    # In-memory SQLite lives on a single connection, keep the default pool
+    database = make_url(url).database
+    if url.startswith("sqlite") and database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+    }
+
+
+def get_sqlite_pragmas() -> list[str]:
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in get_sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def enable_sqlite_profile(engine: AsyncEngine) -> None:
+    """
+    Apply the SQLite performance profile to every new connection: WAL
+    so readers are not blocked behind a writer, NORMAL fsync, mmap
+    reads, a larger page cache and a busy timeout for lock waits.
+    """
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+
+
+def create_engine_from_url(url: str) -> AsyncEngine:
+    new_engine = create_async_engine(url, **get_engine_options(url))
+    if settings.sqlite_performance_profile and url.startswith("sqlite"):
+        enable_sqlite_profile(new_engine)
+    return new_engine
+
+
+database_url = settings.get_async_database_url()
+engine = create_engine_from_url(database_url)
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Read-only traffic; bound per session to a replica picked by the router
+replica_router = ReplicaRouter(
+    primary=engine,
+    replicas=[
+        create_engine_from_url(to_async_url(url))
+        for url in settings.database_replica_urls
+    ],
+    ejection_seconds=settings.replica_ejection_seconds,
+)
+ReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+pool_metrics = PoolMetrics()
+pool_metrics.attach(engine)
 
 Base = declarative_base()
 
 
-def get_db() -> Generator:
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator:
+    async with SessionLocal() as db:
+        yield db
+
+
+async def get_read_db() -> AsyncGenerator:
+    """
+    Session for read-only endpoints, routed to a healthy replica. Paths
+    that must read their own writes (checkout, order detail) keep using
+    get_db.
+    """
+    async with ReadSessionLocal(bind=replica_router.get_engine()) as db:
         yield db
-    finally:
-        db.close()
 
 
-def create_tables() -> None:
-    Base.metadata.create_all(bind=engine)
+async def create_tables() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
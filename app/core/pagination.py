@@ -0,0 +1,66 @@
+import base64
+import json
+import math
+from datetime import datetime, timezone
+from typing import Any
+
+
+def encode_cursor(sort: str, descending: bool, key: Any, last_id: int) -> str:
+    """
+    Opaque keyset cursor: the sort it belongs to and the (sort key, id)
+    of the last row on the page, as url-safe base64 JSON.
+    """
+    if isinstance(key, datetime):
+        key = key.isoformat()
+
+    payload = {"s": sort, "d": descending, "k": key, "i": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _parse_key(sort: str, key: Any) -> Any:
+    """The sort key as the type of its column, or ValueError."""
+    if sort == "created_at":
+        if isinstance(key, str):
+            value = datetime.fromisoformat(key)
+            # The column holds naive UTC
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value
+    elif sort == "price":
+        if _is_number(key) and math.isfinite(key):
+            return key
+    elif isinstance(key, int) and not isinstance(key, bool):
+        return key
+    raise ValueError("Invalid cursor")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> tuple:
+    """
+    Return the (sort key, id) stored in `cursor`. Raises ValueError if
+    the cursor is malformed, its key is not of the sort column's type,
+    or it was issued for a different sort order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        cursor_sort = payload["s"]
+        cursor_descending = payload["d"]
+        key = payload["k"]
+        last_id = payload["i"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError("Cursor does not match the requested sort")
+
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("Invalid cursor")
+    try:
+        return _parse_key(sort, key), last_id
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
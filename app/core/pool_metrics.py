@@ -0,0 +1,143 @@
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    Pool,
+    PoolProxiedConnection,
+)
+
+
+class PoolMetrics:
+    """
+    Connection pool instrumentation. Checkout, checkin, connect and
+    invalidate counters come from pool events; the time callers spend
+    waiting for a connection is reported by InstrumentedQueuePool.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._engine: Optional[AsyncEngine] = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics = self
+
+        # Listening on the engine keeps the hooks across pool.recreate()
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "checkin", self._on_checkin)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data: dict[str, Any] = {
+                "checked_out": self.checkouts - self.checkins,
+                "idle": None,
+                "overflow": None,
+                "size": None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_avg_ms": (
+                    self.wait_total / self.wait_count * 1000
+                    if self.wait_count
+                    else 0.0
+                ),
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+        pool = self._engine.pool if self._engine is not None else None
+        data["pool"] = type(pool).__name__ if pool is not None else None
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data["idle"] = pool.checkedin()
+            data["overflow"] = max(pool.overflow(), 0)
+            data["size"] = pool.size()
+
+        return data
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def _on_connect(self, dbapi_connection: Any, record: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(
+        self,
+        dbapi_connection: Any,
+        record: Any,
+        proxy: Any,
+    ) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection: Any, record: Any) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(
+        self,
+        dbapi_connection: Any,
+        record: Any,
+        exception: Optional[BaseException],
+    ) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long each checkout waits."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(
+                    time.perf_counter() - start,
+                    timed_out=timed_out,
+                )
+
+    def recreate(self) -> Pool:
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
@@ -0,0 +1,78 @@
+import itertools
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class ReplicaRouter:
+    """
+    Round-robin over read replica engines. A replica whose connection
+    fails is ejected for `ejection_seconds` and then retried; when no
+    replica is available reads fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        ejection_seconds: float = 30.0,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.ejection_seconds = ejection_seconds
+        self._ejected_until: dict[int, float] = {}
+        self._cycle = itertools.cycle(range(len(replicas)))
+        self._lock = threading.Lock()
+
+        for index, replica in enumerate(replicas):
+            event.listen(
+                replica.sync_engine,
+                "handle_error",
+                self._make_error_handler(index),
+            )
+
+    def get_engine(self) -> AsyncEngine:
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                index = next(self._cycle)
+                if self._ejected_until.get(index, 0.0) <= now:
+                    return self.replicas[index]
+
+        return self.primary
+
+    def eject(self, engine: AsyncEngine) -> None:
+        with self._lock:
+            for index, replica in enumerate(self.replicas):
+                if replica is engine:
+                    self._ejected_until[index] = (
+                        time.monotonic() + self.ejection_seconds
+                    )
+
+    def is_replica(self, engine: AsyncEngine) -> bool:
+        return any(replica is engine for replica in self.replicas)
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        now = time.monotonic()
+        for index, replica in enumerate(self.replicas):
+            if replica is engine:
+                return self._ejected_until.get(index, 0.0) <= now
+        return True
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def _make_error_handler(self, index: int) -> Any:
+        def _on_error(context: Any) -> None:
+            # Only connectivity problems eject, not bad SQL
+            if context.is_disconnect or isinstance(
+                context.sqlalchemy_exception,
+                exc.OperationalError,
+            ):
+                self.eject(self.replicas[index])
+
+        return _on_error
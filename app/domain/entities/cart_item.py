@@ -1,9 +1,10 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index
 
+from app.core.clock import utcnow
 from app.core.database import Base
 
 if TYPE_CHECKING:
@@ -13,6 +14,15 @@ if TYPE_CHECKING:
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # One row per product in a user's cart; also serves user_id lookups
+        Index(
+            "uq_cart_items_user_product",
+            "user_id",
+            "product_id",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
@@ -22,10 +32,11 @@ class CartItem(Base):
     product_id: Mapped[int] = mapped_column(
         ForeignKey("products.id"),
         nullable=False,
+        index=True,
     )
     quantity: Mapped[int] = mapped_column(default=1)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc)
+        DateTime, default=utcnow
     )
 
     user: Mapped["User"] = relationship(back_populates="cart_items")
@@ -0,0 +1,22 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CategoryDailySales(Base):
+    """
+    Confirmed sales per UTC day and the category each line was sold
+    under. `orders` counts each order once per category however many
+    of its lines fall in it. Lines without a category are rolled up
+    under "".
+    """
+
+    __tablename__ = "category_daily_sales"
+
+    day: Mapped[date] = mapped_column(primary_key=True)
+    category: Mapped[str] = mapped_column(primary_key=True)
+    orders: Mapped[int] = mapped_column(default=0)
+    units: Mapped[int] = mapped_column(default=0)
+    revenue: Mapped[float] = mapped_column(default=0.0)
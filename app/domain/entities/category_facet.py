@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.clock import utcnow
+from app.core.database import Base
+
+
+class CategoryFacet(Base):
+    """
+    Per-category aggregate over products, maintained alongside every
+    product write so category navigation never scans products.
+    """
+
+    __tablename__ = "category_facets"
+
+    category: Mapped[str] = mapped_column(primary_key=True)
+    product_count: Mapped[int] = mapped_column(default=0)
+    in_stock_count: Mapped[int] = mapped_column(default=0)
+    min_price: Mapped[Optional[float]] = mapped_column()
+    max_price: Mapped[Optional[float]] = mapped_column()
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=utcnow,
+        onupdate=utcnow,
+    )
@@ -0,0 +1,19 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DailySales(Base):
+    """
+    Confirmed sales per UTC day, rolled up from orders so revenue
+    reports never scan orders or order_items.
+    """
+
+    __tablename__ = "daily_sales"
+
+    day: Mapped[date] = mapped_column(primary_key=True)
+    orders: Mapped[int] = mapped_column(default=0)
+    units: Mapped[int] = mapped_column(default=0)
+    revenue: Mapped[float] = mapped_column(default=0.0)
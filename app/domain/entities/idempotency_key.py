@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client's Idempotency-Key and the response it produced, so a
+    retried request is answered without running again. A row without
+    a status code is a request still in flight.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"),
+        primary_key=True,
+    )
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # sha256 over method, path and body of the original request
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[Optional[int]] = mapped_column()
+    response_body: Mapped[Optional[str]] = mapped_column(Text)
+    # Naive UTC
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class InventoryBucket(Base):
+    """
+    One slice of a product's free stock. A product with buckets takes
+    reservations from them instead of its own row, so concurrent
+    checkouts of a hot product lock different rows; Product.stock is
+    then a copy of their sum, refreshed by reconciliation.
+    """
+
+    __tablename__ = "inventory_buckets"
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    bucket: Mapped[int] = mapped_column(primary_key=True)
+    available: Mapped[int] = mapped_column(default=0)
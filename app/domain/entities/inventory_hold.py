@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.clock import utcnow
+from app.core.database import Base
+
+
+class InventoryHold(Base):
+    """
+    Units taken from an inventory bucket for a checkout in progress.
+    Consumed when the order is paid, otherwise given back to the same
+    bucket on payment failure or once `expires_at` has passed.
+    """
+
+    __tablename__ = "inventory_holds"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Shared by the holds of one checkout
+    reservation: Mapped[str] = mapped_column(String(32), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"),
+        index=True,
+    )
+    bucket: Mapped[int] = mapped_column()
+    quantity: Mapped[int] = mapped_column()
+    # Naive UTC, like the other timestamps
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow
+    )
@@ -1,9 +1,10 @@
-from datetime import datetime, timezone
-from typing import TYPE_CHECKING, List
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.clock import utcnow
 from app.core.database import Base
 
 if TYPE_CHECKING:
@@ -14,6 +15,18 @@ if TYPE_CHECKING:
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Order history: filter by user, newest first, keyset on
+        # (created_at, id)
+        Index(
+            "ix_orders_user_id_created_at",
+            "user_id",
+            "created_at",
+            "id",
+        ),
+        # Sweep of checkouts left pending
+        Index("ix_orders_status_created_at", "status", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(
@@ -23,8 +36,11 @@ class Order(Base):
     total_price: Mapped[float] = mapped_column(nullable=False)
     status: Mapped[str] = mapped_column(default="pending")
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc)
+        DateTime, default=utcnow
     )
+    # The order as OrderSchema JSON, frozen once it is confirmed or
+    # cancelled. Deferred: only order detail reads it
+    snapshot: Mapped[Optional[str]] = mapped_column(Text, deferred=True)
 
     user: Mapped["User"] = relationship(back_populates="orders")
     order_items: Mapped[List["OrderItem"]] = relationship(
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from app.domain.entities.order import Order
@@ -17,6 +17,7 @@ class OrderItem(Base):
     order_id: Mapped[int] = mapped_column(
         ForeignKey("orders.id"),
         nullable=False,
+        index=True,
     )
     product_id: Mapped[int] = mapped_column(
         ForeignKey("products.id"),
@@ -24,6 +25,8 @@ class OrderItem(Base):
     )
     quantity: Mapped[int] = mapped_column(nullable=False)
     price: Mapped[float] = mapped_column(nullable=False)
+    # The product's category when sold: sales rollups group by it
+    category: Mapped[Optional[str]] = mapped_column()
 
     order: Mapped["Order"] = relationship(back_populates="order_items")
     product: Mapped["Product"] = relationship(back_populates="order_items")
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.clock import utcnow
+from app.core.database import Base
+
+
+class OutboxEvent(Base):
+    """
+    A side effect to run after a commit, written in the same
+    transaction as the change that causes it and delivered at least
+    once by the outbox worker.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # The worker's claim: live events that are due, oldest first
+        Index(
+            "ix_outbox_events_dead_at_available_at",
+            "dead_at",
+            "available_at",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    topic: Mapped[str] = mapped_column(String(64))
+    # JSON object
+    payload: Mapped[str] = mapped_column(Text)
+    attempts: Mapped[int] = mapped_column(default=0)
+    # Naive UTC. Pushed back by a claim (lease) and by a failed attempt
+    # (backoff)
+    available_at: Mapped[datetime] = mapped_column(DateTime)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    # Set once the attempts are used up; such events are kept for
+    # inspection and never retried
+    dead_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow
+    )
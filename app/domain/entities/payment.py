@@ -1,9 +1,10 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.clock import utcnow
 from app.core.database import Base
 
 if TYPE_CHECKING:
@@ -23,7 +24,7 @@ class Payment(Base):
     payment_method: Mapped[str] = mapped_column(nullable=False)
     paid_at: Mapped[datetime | None] = mapped_column(nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        default=lambda: datetime.now(timezone.utc)
+        default=utcnow
     )
 
     order: Mapped["Order"] = relationship(back_populates="payment")
@@ -1,9 +1,10 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, Text
+from sqlalchemy import DateTime, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.clock import utcnow
 from app.core.database import Base
 
 if TYPE_CHECKING:
@@ -13,16 +14,33 @@ if TYPE_CHECKING:
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination over (sort key, id)
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        # Category listings sorted or filtered by price
+        Index("ix_products_category_price_id", "category", "price", "id"),
+        # Incremental exports of rows changed since a watermark
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # Natural key of the supplier feed, bulk imports upsert on it
+    sku: Mapped[Optional[str]] = mapped_column(unique=True, index=True)
     name: Mapped[str] = mapped_column(nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
     price: Mapped[float] = mapped_column(nullable=False)
     stock: Mapped[int] = mapped_column(default=0)
-    category: Mapped[Optional[str]] = mapped_column()
+    category: Mapped[Optional[str]] = mapped_column(index=True)
     image_url: Mapped[Optional[str]] = mapped_column()
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc)
+        DateTime, default=utcnow
+    )
+    # Bumped by every UPDATE (ORM or Core), including stock changes
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=utcnow,
+        onupdate=utcnow,
     )
 
     cart_items: Mapped[list["CartItem"]] = relationship(
@@ -0,0 +1,17 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ProductDailySales(Base):
+    """Confirmed sales per UTC day and product."""
+
+    __tablename__ = "product_daily_sales"
+
+    day: Mapped[date] = mapped_column(primary_key=True)
+    product_id: Mapped[int] = mapped_column(primary_key=True)
+    orders: Mapped[int] = mapped_column(default=0)
+    units: Mapped[int] = mapped_column(default=0)
+    revenue: Mapped[float] = mapped_column(default=0.0)
@@ -0,0 +1,19 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class RolledUpOrder(Base):
+    """
+    An order already counted in the sales rollups. Claiming the row in
+    the transaction that adds the order to them makes the outbox
+    consumer and the backfill safe to repeat or run side by side.
+    """
+
+    __tablename__ = "rolled_up_orders"
+
+    order_id: Mapped[int] = mapped_column(
+        ForeignKey("orders.id"),
+        primary_key=True,
+    )
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Protocol
+
+
+class LRUCache:
+    """
+    In-process LRU cache with a per-entry TTL. Keeps hit, miss,
+    eviction (capacity) and expiration (TTL) counters.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class CacheBackend(Protocol):
+    """Shared cache tier, visible to every worker process."""
+
+    async def get(self, key: str) -> Optional[str]: ...
+
+    async def get_many(self, keys: list[str]) -> list[Optional[str]]: ...
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None: ...
+
+    async def set_many(
+        self,
+        items: dict[str, str],
+        ttl_seconds: float,
+    ) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """
+    Local stand-in for the shared backend (memory://). Same interface
+    as RedisCacheBackend but only visible within this process.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[1]
+
+    async def get_many(self, keys: list[str]) -> list[Optional[str]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    async def set_many(
+        self,
+        items: dict[str, str],
+        ttl_seconds: float,
+    ) -> None:
+        for key, value in items.items():
+            await self.set(key, value, ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend on Redis (redis://). Needs the `redis` package."""
+
+    def __init__(self, url: str, prefix: str = "ecommerce:") -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND_URL points at Redis but the `redis` "
+                "package is not installed"
+            ) from e
+
+        self.client = redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def get_many(self, keys: list[str]) -> list[Optional[str]]:
+        if not keys:
+            return []
+        return await self.client.mget([self.prefix + key for key in keys])
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        await self.client.set(
+            self.prefix + key,
+            value,
+            px=int(ttl_seconds * 1000),
+        )
+
+    async def set_many(
+        self,
+        items: dict[str, str],
+        ttl_seconds: float,
+    ) -> None:
+        # One round trip; MSET cannot carry a per-key expiry
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self.prefix + key, value, px=int(ttl_seconds * 1000))
+            await pipe.execute()
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+
+def create_cache_backend(url: Optional[str]) -> Optional[CacheBackend]:
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryCacheBackend()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported cache backend: {url}")
@@ -0,0 +1,46 @@
+import asyncio
+from typing import NamedTuple, Optional
+
+from app.core.config import settings
+from app.infrastructure.cache.backends import LRUCache
+
+# (user id, Idempotency-Key)
+Scope = tuple[int, str]
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    # JSON text, None for an empty response
+    body: Optional[str]
+
+
+class IdempotencyCache:
+    """
+    Per-process front of the idempotency_keys table: completed
+    responses in an LRU, and an event per key whose original request
+    is running in this process so duplicates wait on it instead of
+    polling the database.
+    """
+
+    def __init__(self, completed: LRUCache) -> None:
+        self.completed = completed
+        self.in_flight: dict[Scope, asyncio.Event] = {}
+
+    def get(self, scope: Scope) -> Optional[StoredResponse]:
+        return self.completed.get(scope)
+
+    def set(self, scope: Scope, response: StoredResponse) -> None:
+        self.completed.set(scope, response)
+
+    def clear(self) -> None:
+        self.completed.clear()
+        self.in_flight.clear()
+
+
+idempotency_cache = IdempotencyCache(
+    LRUCache(
+        max_entries=settings.idempotency_cache_max_entries,
+        ttl_seconds=settings.idempotency_ttl_seconds,
+    )
+)
@@ -0,0 +1,11 @@
+import math
+
+from app.core.config import settings
+from app.infrastructure.cache.backends import LRUCache
+
+# Order id -> (owner's user id, snapshot JSON). A snapshot never
+# changes, so entries leave only by eviction
+order_snapshots = LRUCache(
+    max_entries=settings.order_snapshot_cache_max_entries,
+    ttl_seconds=math.inf,
+)
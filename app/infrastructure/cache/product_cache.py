@@ -0,0 +1,158 @@
+from typing import Optional
+
+from app.core.config import settings
+from app.application.schemas.product import ProductSchema
+from app.infrastructure.cache.backends import (
+    CacheBackend,
+    LRUCache,
+    create_cache_backend,
+)
+
+
+class ProductCache:
+    """
+    Read-through cache of products by id. A per-process LRU with TTL
+    sits in front of an optional shared backend; entries are immutable
+    ProductSchema snapshots, never session-bound ORM rows. Shared
+    entries live for `ttl_seconds`, by default the local tier's TTL.
+    """
+
+    def __init__(
+        self,
+        local: LRUCache,
+        shared: Optional[CacheBackend] = None,
+        enabled: bool = True,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.local = local
+        self.shared = shared
+        self.enabled = enabled
+        self.ttl_seconds = (
+            local.ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @staticmethod
+    def _key(product_id: int) -> str:
+        return f"product:{product_id}"
+
+    async def get(self, product_id: int) -> Optional[ProductSchema]:
+        if not self.enabled:
+            return None
+
+        product = self.local.get(product_id)
+        if product is not None or self.shared is None:
+            return product
+
+        raw = await self.shared.get(self._key(product_id))
+        if raw is None:
+            self.shared_misses += 1
+            return None
+
+        self.shared_hits += 1
+        product = ProductSchema.model_validate_json(raw)
+        self.local.set(product_id, product)
+        return product
+
+    async def get_many(
+        self,
+        product_ids: list[int],
+    ) -> dict[int, ProductSchema]:
+        """Cached products among `product_ids`, one shared round trip."""
+        if not self.enabled:
+            return {}
+
+        found: dict[int, ProductSchema] = {}
+        remote: list[int] = []
+        for product_id in product_ids:
+            product = self.local.get(product_id)
+            if product is not None:
+                found[product_id] = product
+            else:
+                remote.append(product_id)
+
+        if not remote or self.shared is None:
+            return found
+
+        raws = await self.shared.get_many([self._key(i) for i in remote])
+        for product_id, raw in zip(remote, raws):
+            if raw is None:
+                self.shared_misses += 1
+                continue
+            self.shared_hits += 1
+            product = ProductSchema.model_validate_json(raw)
+            self.local.set(product_id, product)
+            found[product_id] = product
+
+        return found
+
+    async def set(self, product: ProductSchema) -> None:
+        if not self.enabled:
+            return
+
+        self.local.set(product.id, product)
+        if self.shared is not None:
+            await self.shared.set(
+                self._key(product.id),
+                product.model_dump_json(),
+                self.ttl_seconds,
+            )
+
+    async def set_many(self, products: list[ProductSchema]) -> None:
+        if not self.enabled or not products:
+            return
+
+        for product in products:
+            self.local.set(product.id, product)
+        if self.shared is not None:
+            await self.shared.set_many(
+                {
+                    self._key(product.id): product.model_dump_json()
+                    for product in products
+                },
+                self.ttl_seconds,
+            )
+
+    async def invalidate(self, *product_ids: int) -> None:
+        for product_id in product_ids:
+            self.local.delete(product_id)
+            if self.shared is not None:
+                await self.shared.delete(self._key(product_id))
+
+    async def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            await self.shared.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "local": self.local.stats(),
+            "shared": (
+                {"hits": self.shared_hits, "misses": self.shared_misses}
+                if self.shared is not None
+                else None
+            ),
+        }
+
+
+def create_product_cache() -> ProductCache:
+    shared = create_cache_backend(settings.cache_backend_url)
+    local_ttl = settings.product_cache_ttl_seconds
+    if shared is not None:
+        # Invalidation reaches only this process's LRU and the shared
+        # tier, so the LRU must expire soon to see other workers' writes
+        local_ttl = min(local_ttl, settings.product_cache_local_ttl_seconds)
+    return ProductCache(
+        local=LRUCache(
+            max_entries=settings.product_cache_max_entries,
+            ttl_seconds=local_ttl,
+        ),
+        shared=shared,
+        enabled=settings.product_cache_enabled,
+        ttl_seconds=settings.product_cache_ttl_seconds,
+    )
+
+
+product_cache = create_product_cache()
@@ -0,0 +1,243 @@
+import asyncio
+import random
+import time
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class PaymentUnavailable(Exception):
+    """
+    The gateway could not be asked: it timed out, is shedding load or
+    its circuit is open. Unlike a declined payment, retrying later may
+    succeed.
+    """
+
+
+class CircuitOpen(PaymentUnavailable):
+    """Rejected before reaching the gateway: nothing was charged."""
+
+
+class PaymentGateway(Protocol):
+    """
+    A payment processor. Declines are results, not exceptions. Charges
+    carry the order id as reference, so one that timed out can still
+    be voided.
+    """
+
+    async def charge(
+        self,
+        order_id: int,
+        amount: float,
+        payment_method: str,
+    ) -> dict: ...
+
+    async def refund(self, transaction_id: str, amount: float) -> dict: ...
+
+    async def void(self, order_id: int) -> dict: ...
+
+
+class FakePaymentGateway:
+    """
+    Local stand-in for a payment processor with a configurable round
+    trip time and decline rate.
+    """
+
+    def __init__(self, latency_seconds: float, failure_rate: float) -> None:
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        # Completed charges by order id, until refunded or voided
+        self.charges: dict[int, str] = {}
+
+    async def charge(
+        self,
+        order_id: int,
+        amount: float,
+        payment_method: str,
+    ) -> dict:
+        await asyncio.sleep(self.latency_seconds)
+        transaction_id = f"txn_{order_id}_{random.randint(1000, 9999)}"
+
+        if random.random() >= self.failure_rate:
+            self.charges[order_id] = transaction_id
+            return {
+                "status": "completed",
+                "transaction_id": transaction_id,
+                "amount": amount,
+                "payment_method": payment_method,
+            }
+        else:
+            return {
+                "status": "failed",
+                "error": "Payment processing failed",
+                "amount": amount,
+                "payment_method": payment_method,
+            }
+
+    async def refund(self, transaction_id: str, amount: float) -> dict:
+        await asyncio.sleep(self.latency_seconds)
+        self.charges = {
+            order_id: charged
+            for order_id, charged in self.charges.items()
+            if charged != transaction_id
+        }
+        return {
+            "status": "refunded",
+            "refund_id": f"ref_{transaction_id}_{random.randint(1000, 9999)}",
+            "amount": amount,
+        }
+
+    async def void(self, order_id: int) -> dict:
+        """Cancel the order's charge, if there is one; safe to repeat."""
+        await asyncio.sleep(self.latency_seconds)
+        transaction_id = self.charges.pop(order_id, None)
+        if transaction_id is None:
+            return {"status": "not_found"}
+        return {"status": "voided", "transaction_id": transaction_id}
+
+
+class CircuitBreaker:
+    """
+    Stops calling a gateway after `failure_threshold` consecutive
+    errors. After `reset_seconds` one trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.reset()
+
+    def reset(self) -> None:
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_running:
+            self.trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.reset()
+
+    def release_trial(self) -> None:
+        """The trial call ended without an answer either way."""
+        self.trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or (
+            self.failures >= self.failure_threshold
+        ):
+            self.opened_at = time.monotonic()
+
+
+class GuardedPaymentGateway:
+    """
+    Wraps a gateway with a bounded number of calls in flight, a
+    deadline per call (waiting for a slot included) and a circuit
+    breaker, so a slow or failing processor costs checkouts a quick
+    PaymentUnavailable rather than a pile-up of waiting requests.
+    """
+
+    def __init__(
+        self,
+        gateway: PaymentGateway,
+        timeout_seconds: float,
+        max_concurrency: int,
+        breaker: CircuitBreaker,
+    ) -> None:
+        self.gateway = gateway
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker
+        self.in_flight = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def available(self) -> bool:
+        return self.breaker.state != "open"
+
+    async def charge(
+        self,
+        order_id: int,
+        amount: float,
+        payment_method: str,
+    ) -> dict:
+        return await self._call(
+            self.gateway.charge(order_id, amount, payment_method)
+        )
+
+    async def refund(self, transaction_id: str, amount: float) -> dict:
+        return await self._call(self.gateway.refund(transaction_id, amount))
+
+    async def void(self, order_id: int) -> dict:
+        return await self._call(self.gateway.void(order_id))
+
+    async def _call(self, call) -> dict:
+        if not self.breaker.allow():
+            call.close()
+            raise CircuitOpen("Payment gateway circuit is open")
+
+        try:
+            result = await asyncio.wait_for(
+                self._limited(call),
+                self.timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            raise PaymentUnavailable("Payment gateway timed out")
+        except Exception as e:
+            self.breaker.record_failure()
+            raise PaymentUnavailable("Payment gateway error") from e
+        except asyncio.CancelledError:
+            # Not the gateway's fault, but a half-open circuit must not
+            # wait forever on a trial call that was abandoned
+            self.breaker.release_trial()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def _limited(self, call) -> dict:
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                return await call
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+payment_gateway = GuardedPaymentGateway(
+    FakePaymentGateway(
+        latency_seconds=settings.payment_gateway_latency_seconds,
+        failure_rate=settings.payment_gateway_failure_rate,
+    ),
+    timeout_seconds=settings.payment_gateway_timeout_seconds,
+    max_concurrency=settings.payment_gateway_max_concurrency,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.payment_breaker_failure_threshold,
+        reset_seconds=settings.payment_breaker_reset_seconds,
+    ),
+)
@@ -0,0 +1,161 @@
+from datetime import date
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Date, Row, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.category_daily_sales import CategoryDailySales
+from app.domain.entities.daily_sales import DailySales
+from app.domain.entities.order import Order
+from app.domain.entities.order_item import OrderItem
+from app.domain.entities.product_daily_sales import ProductDailySales
+from app.domain.entities.rolled_up_order import RolledUpOrder
+
+# Orders are bucketed by the UTC day they were placed, their lines by
+# the category recorded at sale, so a product later moved or deleted
+# does not rewrite history
+DAY = func.date(Order.created_at, type_=Date)
+CATEGORY = func.coalesce(OrderItem.category, "")
+
+# Rollup table -> the columns it is grouped by besides the day
+ROLLUPS = (
+    (DailySales, ()),
+    (CategoryDailySales, (("category", CATEGORY),)),
+    (ProductDailySales, (("product_id", OrderItem.product_id),)),
+)
+
+
+class AnalyticsRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    def _insert(self, table: Any) -> Any:
+        if self.db.bind.dialect.name == "postgresql":
+            return postgresql.insert(table)
+        return sqlite.insert(table)
+
+    async def confirmed_after(self, after: int, limit: int) -> list[int]:
+        """Ids of the next `limit` confirmed orders, in id order."""
+        result = await self.db.scalars(
+            select(Order.id)
+            .where(Order.id > after, Order.status == "confirmed")
+            .order_by(Order.id)
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def claim(self, order_ids: Sequence[int]) -> list[int]:
+        """
+        Mark the confirmed orders among `order_ids` as rolled up and
+        return those that were not already; no commit.
+        """
+        result = await self.db.scalars(
+            self._insert(RolledUpOrder)
+            .from_select(
+                ["order_id"],
+                select(Order.id).where(
+                    Order.id.in_(order_ids),
+                    Order.status == "confirmed",
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(RolledUpOrder.order_id)
+        )
+        return list(result.all())
+
+    async def add(self, order_ids: Sequence[int]) -> None:
+        """
+        Add the orders to every rollup; no commit. Each rollup is one
+        GROUP BY over the orders' lines and one upsert of its groups,
+        however many orders there are.
+        """
+        for table, keys in ROLLUPS:
+            columns = [DAY.label("day")] + [
+                column.label(name) for name, column in keys
+            ]
+            result = await self.db.execute(
+                select(
+                    *columns,
+                    func.count(Order.id.distinct()).label("orders"),
+                    func.sum(OrderItem.quantity).label("units"),
+                    func.sum(OrderItem.quantity * OrderItem.price).label(
+                        "revenue"
+                    ),
+                )
+                .select_from(OrderItem)
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(OrderItem.order_id.in_(order_ids))
+                .group_by(*columns)
+            )
+            groups = [row._asdict() for row in result]
+            if not groups:
+                continue
+
+            stmt = self._insert(table)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["day", *(name for name, _ in keys)],
+                    set_={
+                        name: getattr(table, name)
+                        + getattr(stmt.excluded, name)
+                        for name in ("orders", "units", "revenue")
+                    },
+                ),
+                groups,
+            )
+
+    async def get_daily(self, start: date, end: date) -> list[DailySales]:
+        result = await self.db.scalars(
+            select(DailySales)
+            .where(DailySales.day.between(start, end))
+            .order_by(DailySales.day)
+        )
+        return list(result.all())
+
+    async def get_by_category(self, start: date, end: date) -> list[Row]:
+        """Totals per category over the days, highest revenue first."""
+        return await self._totals(
+            CategoryDailySales,
+            CategoryDailySales.category,
+            start,
+            end,
+        )
+
+    async def get_by_product(
+        self,
+        start: date,
+        end: date,
+        limit: Optional[int] = None,
+    ) -> list[Row]:
+        """Totals per product over the days, highest revenue first."""
+        return await self._totals(
+            ProductDailySales,
+            ProductDailySales.product_id,
+            start,
+            end,
+            limit,
+        )
+
+    async def _totals(
+        self,
+        table: Any,
+        key: Any,
+        start: date,
+        end: date,
+        limit: Optional[int] = None,
+    ) -> list[Row]:
+        revenue = func.sum(table.revenue)
+        result = await self.db.execute(
+            select(
+                key,
+                func.sum(table.orders).label("orders"),
+                func.sum(table.units).label("units"),
+                revenue.label("revenue"),
+            )
+            .where(table.day.between(start, end))
+            .group_by(key)
+            .order_by(revenue.desc(), key)
+            .limit(limit)
+        )
+        return list(result.all())
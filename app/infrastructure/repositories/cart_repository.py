@@ -1,69 +1,90 @@
-from sqlalchemy.orm import Session, joinedload
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.domain.entities.cart_item import CartItem
 from app.application.schemas.cart import CartItemCreateSchema
 
 
 class CartRepository:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    def get_user_cart(self, user_id: int) -> list[CartItem]:
-        return (
-            self.db.query(CartItem)
-            .filter(CartItem.user_id == user_id)
+    async def get_user_cart(self, user_id: int) -> list[CartItem]:
+        result = await self.db.scalars(
+            select(CartItem)
+            .where(CartItem.user_id == user_id)
             .options(joinedload(CartItem.product))
-            .all()
         )
+        return list(result.all())
 
-    def get_cart_item(self, user_id: int, product_id: int) -> CartItem | None:
-        return (
-            self.db.query(CartItem)
-            .filter(
+    async def get_cart_item(
+        self,
+        user_id: int,
+        product_id: int,
+    ) -> CartItem | None:
+        # The product is eager loaded: lazy loads are not allowed on
+        # an AsyncSession and callers check its stock
+        return await self.db.scalar(
+            select(CartItem)
+            .where(
                 CartItem.user_id == user_id,
                 CartItem.product_id == product_id,
             )
-            .first()
+            .options(joinedload(CartItem.product))
         )
 
-    def add_item(
+    def _insert(self) -> Any:
+        if self.db.bind.dialect.name == "postgresql":
+            return postgresql.insert(CartItem)
+        return sqlite.insert(CartItem)
+
+    async def add_item(
         self,
         user_id: int,
         cart_item_create: CartItemCreateSchema,
     ) -> CartItem:
-        # Check if item already exists in cart
-        existing_item = self.get_cart_item(
-            user_id,
-            cart_item_create.product_id,
+        """
+        Add to the quantity already in the cart, or insert the line.
+        One upsert: concurrent adds of the same product both land
+        instead of racing on the unique (user_id, product_id) index.
+        """
+        stmt = self._insert().values(
+            user_id=user_id,
+            **cart_item_create.model_dump(),
         )
+        # populate_existing: the line may already be in the identity map
+        cart_item = await self.db.scalar(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "product_id"],
+                set_={"quantity": CartItem.quantity + stmt.excluded.quantity},
+            ).returning(CartItem),
+            execution_options={"populate_existing": True},
+        )
+        await self.db.commit()
+        await self.db.refresh(cart_item, ["product"])
+        return cart_item
 
-        if existing_item:
-            # Update quantity if item exists
-            existing_item.quantity += cart_item_create.quantity
-            self.db.commit()
-            self.db.refresh(existing_item)
-            return existing_item
-        else:
-            # Create new cart item
-            cart_item = CartItem(
-                user_id=user_id,
-                **cart_item_create.model_dump(),
-            )
-            self.db.add(cart_item)
-            self.db.commit()
-            self.db.refresh(cart_item)
-            return cart_item
-
-    def update_item(self, cart_item: CartItem, quantity: int) -> CartItem:
+    async def update_item(
+        self,
+        cart_item: CartItem,
+        quantity: int,
+    ) -> CartItem:
         cart_item.quantity = quantity
-        self.db.commit()
-        self.db.refresh(cart_item)
+        await self.db.commit()
+        await self.db.refresh(cart_item, ["quantity", "product"])
         return cart_item
 
-    def remove_item(self, cart_item: CartItem) -> None:
-        self.db.delete(cart_item)
-        self.db.commit()
+    async def remove_item(self, cart_item: CartItem) -> None:
+        await self.db.delete(cart_item)
+        await self.db.commit()
 
-    def clear_cart(self, user_id: int) -> None:
-        self.db.query(CartItem).filter(CartItem.user_id == user_id).delete()
-        self.db.commit()
+    async def clear_cart(self, user_id: int, commit: bool = True) -> None:
+        await self.db.execute(
+            delete(CartItem).where(CartItem.user_id == user_id),
+        )
+        if commit:
+            await self.db.commit()
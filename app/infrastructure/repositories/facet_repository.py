@@ -0,0 +1,144 @@
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.category_facet import CategoryFacet
+from app.domain.entities.product import Product
+
+# What a product contributes to its category facet
+FacetState = tuple[str, float, bool]
+
+
+def facet_state(product: Product) -> Optional[FacetState]:
+    if product.category is None:
+        return None
+    return (product.category, product.price, product.stock > 0)
+
+
+class FacetRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def get_all(self) -> list[CategoryFacet]:
+        result = await self.db.scalars(
+            select(CategoryFacet).order_by(CategoryFacet.category),
+        )
+        return list(result.all())
+
+    async def apply(
+        self,
+        changes: Iterable[tuple[Optional[FacetState], Optional[FacetState]]],
+    ) -> None:
+        """
+        Fold (before, after) product states into the facets, inside the
+        caller's transaction. Counts move by deltas; min/max price are
+        re-read per touched category, two seeks on the (category,
+        price) index, so a removed extreme is handled too.
+        """
+        deltas: dict[str, list[int]] = {}
+        for before, after in changes:
+            if before == after:
+                continue
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None:
+                    continue
+                category, _, in_stock = state
+                delta = deltas.setdefault(category, [0, 0])
+                delta[0] += sign
+                delta[1] += sign * in_stock
+
+        if not deltas:
+            return
+
+        # The price subqueries must see the pending product writes
+        await self.db.flush()
+        for category, (count, in_stock) in sorted(deltas.items()):
+            await self._ensure(category)
+            prices = select(Product.price).where(
+                Product.category == category,
+            )
+            await self.db.execute(
+                update(CategoryFacet)
+                .where(CategoryFacet.category == category)
+                .values(
+                    product_count=CategoryFacet.product_count + count,
+                    in_stock_count=CategoryFacet.in_stock_count + in_stock,
+                    min_price=prices.with_only_columns(
+                        func.min(Product.price)
+                    ).scalar_subquery(),
+                    max_price=prices.with_only_columns(
+                        func.max(Product.price)
+                    ).scalar_subquery(),
+                )
+            )
+
+        await self.db.execute(
+            delete(CategoryFacet).where(
+                CategoryFacet.category.in_(deltas),
+                CategoryFacet.product_count <= 0,
+            )
+        )
+
+    async def rebuild(self) -> None:
+        """
+        Recompute every facet from products, e.g. after a bulk load.
+        Rows are upserted and only categories without products are
+        deleted: a product write running meanwhile may add its
+        category's row, which must not make the rebuild fail.
+        """
+        columns = (
+            "category",
+            "product_count",
+            "in_stock_count",
+            "min_price",
+            "max_price",
+            "updated_at",
+        )
+        stmt = self._insert().from_select(
+            columns,
+            select(
+                Product.category,
+                func.count(),
+                func.count().filter(Product.stock > 0),
+                func.min(Product.price),
+                func.max(Product.price),
+                func.max(Product.updated_at),
+            )
+            .where(Product.category.is_not(None))
+            .group_by(Product.category),
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["category"],
+                set_={name: getattr(stmt.excluded, name) for name in columns},
+            )
+        )
+        await self.db.execute(
+            delete(CategoryFacet).where(
+                CategoryFacet.category.not_in(
+                    select(Product.category).where(
+                        Product.category.is_not(None)
+                    )
+                )
+            )
+        )
+        await self.db.commit()
+
+    def _insert(self) -> Any:
+        if self.db.bind.dialect.name == "postgresql":
+            return postgresql.insert(CategoryFacet)
+        return sqlite.insert(CategoryFacet)
+
+    async def _ensure(self, category: str) -> None:
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(CategoryFacet).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(CategoryFacet).on_conflict_do_nothing()
+        else:
+            if await self.db.get(CategoryFacet, category) is not None:
+                return
+            stmt = insert(CategoryFacet)
+        await self.db.execute(stmt.values(category=category))
@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Row, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def claim(
+        self,
+        user_id: int,
+        key: str,
+        fingerprint: str,
+        now: datetime,
+        expires_at: datetime,
+    ) -> bool:
+        """
+        Record the key as in flight and commit. False if another
+        request already holds it; an expired record is replaced.
+        """
+        await self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at <= now,
+            )
+        )
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(IdempotencyKey).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(IdempotencyKey).on_conflict_do_nothing()
+        else:
+            if await self.get(user_id, key) is not None:
+                await self.db.commit()
+                return False
+            stmt = insert(IdempotencyKey)
+        result = await self.db.execute(
+            stmt.values(
+                user_id=user_id,
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=expires_at,
+            )
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def get(self, user_id: int, key: str) -> Optional[Row]:
+        # Plain columns, not an entity: a poll must never be answered
+        # from the identity map
+        result = await self.db.execute(
+            select(
+                IdempotencyKey.fingerprint,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response_body,
+            ).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+            )
+        )
+        return result.first()
+
+    async def complete(
+        self,
+        user_id: int,
+        key: str,
+        status_code: int,
+        response_body: Optional[str],
+        expires_at: datetime,
+    ) -> None:
+        """Store the response, replayed until `expires_at`, and commit."""
+        await self.db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+            )
+            .values(
+                status_code=status_code,
+                response_body=response_body,
+                expires_at=expires_at,
+            )
+        )
+        await self.db.commit()
+
+    async def release(self, user_id: int, key: str) -> None:
+        await self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+            )
+        )
+        await self.db.commit()
+
+    async def purge_expired(self, now: datetime) -> int:
+        result = await self.db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now)
+        )
+        await self.db.commit()
+        return result.rowcount
@@ -0,0 +1,254 @@
+import random
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    ColumnElement,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.inventory_bucket import InventoryBucket
+from app.domain.entities.inventory_hold import InventoryHold
+from app.domain.entities.product import Product
+
+# (bucket, quantity) taken from or given back to a product's buckets
+Portion = tuple[int, int]
+
+# Attempts at taking stock before the buckets are declared short; a
+# retry only happens when another checkout drained a bucket between
+# reading it and updating it
+TAKE_ATTEMPTS = 3
+
+
+def split_stock(stock: int, buckets: int) -> list[int]:
+    """Spread `stock` as evenly as possible over `buckets` buckets."""
+    share, extra = divmod(stock, buckets)
+    return [share + (bucket < extra) for bucket in range(buckets)]
+
+
+class InventoryRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def get_buckets(self, product_id: int) -> list[InventoryBucket]:
+        result = await self.db.scalars(
+            select(InventoryBucket)
+            .where(InventoryBucket.product_id == product_id)
+            .order_by(InventoryBucket.bucket)
+        )
+        return list(result.all())
+
+    async def bucketed(self, product_ids: Iterable[int]) -> set[int]:
+        """Which of the products take reservations from buckets."""
+        result = await self.db.scalars(
+            select(InventoryBucket.product_id)
+            .where(InventoryBucket.product_id.in_(list(product_ids)))
+            .distinct()
+        )
+        return set(result.all())
+
+    async def held(self, product_id: int) -> int:
+        total = await self.db.scalar(
+            select(func.sum(InventoryHold.quantity)).where(
+                InventoryHold.product_id == product_id
+            )
+        )
+        return total or 0
+
+    async def set_buckets(
+        self,
+        product_id: int,
+        stock: int,
+        buckets: int,
+    ) -> None:
+        """Replace the product's buckets with `stock` spread over them."""
+        await self.db.execute(
+            delete(InventoryBucket).where(
+                InventoryBucket.product_id == product_id
+            )
+        )
+        if buckets:
+            await self.db.execute(
+                insert(InventoryBucket),
+                [
+                    {
+                        "product_id": product_id,
+                        "bucket": bucket,
+                        "available": available,
+                    }
+                    for bucket, available in enumerate(
+                        split_stock(stock, buckets)
+                    )
+                ],
+            )
+
+    async def take(
+        self,
+        product_id: int,
+        quantity: int,
+    ) -> Optional[list[Portion]]:
+        """
+        Take `quantity` units from the product's buckets with
+        conditional UPDATEs, none of which can drive a bucket below
+        zero. A bucket holding the whole quantity is picked at random,
+        so concurrent checkouts spread over the buckets; otherwise the
+        quantity is split across several. Returns None if the buckets
+        are short, leaving any partial take to the caller's rollback.
+        """
+        portions: list[Portion] = []
+        needed = quantity
+        for _ in range(TAKE_ATTEMPTS):
+            # A plain read: it locks nothing and may be stale, the
+            # conditional UPDATE below is what decides
+            result = await self.db.execute(
+                select(InventoryBucket.bucket, InventoryBucket.available)
+                .where(
+                    InventoryBucket.product_id == product_id,
+                    InventoryBucket.available > 0,
+                )
+            )
+            free = result.all()
+            if sum(available for _, available in free) < needed:
+                return None
+
+            random.shuffle(free)
+            whole = [
+                bucket for bucket, available in free if available >= needed
+            ]
+            if whole:
+                plan = [(whole[0], needed)]
+            else:
+                plan = []
+                remaining = needed
+                for bucket, available in free:
+                    if not remaining:
+                        break
+                    take = min(available, remaining)
+                    plan.append((bucket, take))
+                    remaining -= take
+
+            for bucket, take in plan:
+                if await self._take_from(product_id, bucket, take):
+                    portions.append((bucket, take))
+                    needed -= take
+            if not needed:
+                return portions
+        return None
+
+    async def _take_from(
+        self,
+        product_id: int,
+        bucket: int,
+        take: int,
+    ) -> bool:
+        result = await self.db.execute(
+            update(InventoryBucket)
+            .where(
+                InventoryBucket.product_id == product_id,
+                InventoryBucket.bucket == bucket,
+                InventoryBucket.available >= take,
+            )
+            .values(available=InventoryBucket.available - take)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    async def give_back(
+        self,
+        portions: Iterable[tuple[int, int, int]],
+    ) -> None:
+        """Return (product_id, bucket, quantity) units to their buckets."""
+        for product_id, bucket, quantity in sorted(portions):
+            await self.db.execute(
+                update(InventoryBucket)
+                .where(
+                    InventoryBucket.product_id == product_id,
+                    InventoryBucket.bucket == bucket,
+                )
+                .values(available=InventoryBucket.available + quantity)
+                .execution_options(synchronize_session=False)
+            )
+
+    async def add_holds(
+        self,
+        reservation: str,
+        user_id: int,
+        product_id: int,
+        portions: list[Portion],
+        expires_at: datetime,
+    ) -> None:
+        self.db.add_all(
+            InventoryHold(
+                reservation=reservation,
+                user_id=user_id,
+                product_id=product_id,
+                bucket=bucket,
+                quantity=quantity,
+                expires_at=expires_at,
+            )
+            for bucket, quantity in portions
+        )
+        await self.db.flush()
+
+    async def claim_holds(
+        self,
+        reservation: str,
+    ) -> list[tuple[int, int, int]]:
+        """
+        Delete a reservation's holds and return their (product_id,
+        bucket, quantity). A hold can only be claimed once, so payment
+        and expiry never both act on it.
+        """
+        return await self._claim(InventoryHold.reservation == reservation)
+
+    async def claim_expired(
+        self,
+        now: datetime,
+        limit: int = 1000,
+    ) -> list[tuple[int, int, int]]:
+        expired = (
+            select(InventoryHold.id)
+            .where(InventoryHold.expires_at <= now)
+            .order_by(InventoryHold.expires_at)
+            .limit(limit)
+        )
+        return await self._claim(InventoryHold.id.in_(expired))
+
+    async def _claim(
+        self,
+        condition: ColumnElement[bool],
+    ) -> list[tuple[int, int, int]]:
+        result = await self.db.execute(
+            delete(InventoryHold)
+            .where(condition)
+            .returning(
+                InventoryHold.product_id,
+                InventoryHold.bucket,
+                InventoryHold.quantity,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def get_drifted(self) -> list[tuple[Product, int]]:
+        """Bucketed products whose stock differs from their buckets' sum."""
+        totals = (
+            select(
+                InventoryBucket.product_id,
+                func.sum(InventoryBucket.available).label("available"),
+            )
+            .group_by(InventoryBucket.product_id)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(Product, totals.c.available)
+            .join(totals, totals.c.product_id == Product.id)
+            .where(Product.stock != totals.c.available)
+            .order_by(Product.id)
+        )
+        return [(product, available) for product, available in result.all()]
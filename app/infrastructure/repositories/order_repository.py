@@ -1,69 +1,206 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from typing import Optional
 
+from sqlalchemy import Row, Select, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.clock import utcnow
 from app.domain.entities.order import Order
 from app.domain.entities.order_item import OrderItem
 from app.domain.entities.payment import Payment
 
 
 class OrderRepository:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    def get_user_orders(self, user_id: int) -> list[Order]:
-        return (
-            self.db.query(Order)
-            .filter(Order.user_id == user_id)
+    def history_query(
+        self,
+        stmt: Select,
+        user_id: int,
+        after: Optional[tuple[datetime, int]] = None,
+        limit: int = 100,
+    ) -> Select:
+        """
+        A page of `stmt` over the user's orders, newest first. Pages by
+        keyset over (created_at, id): `after` is that pair for the last
+        order already seen, so a deep page seeks through
+        ix_orders_user_id_created_at instead of skipping rows.
+        """
+        stmt = stmt.where(Order.user_id == user_id)
+        if after is not None:
+            stmt = stmt.where(tuple_(Order.created_at, Order.id) < after)
+        return stmt.order_by(
+            Order.created_at.desc(), Order.id.desc()
+        ).limit(limit)
+
+    async def get_user_orders(
+        self,
+        user_id: int,
+        after: Optional[tuple[datetime, int]] = None,
+        limit: int = 100,
+    ) -> list[Order]:
+        # selectinload: one IN query per level rather than a join that
+        # repeats every order row once per item
+        result = await self.db.scalars(
+            self.history_query(
+                select(Order).options(
+                    selectinload(Order.order_items).selectinload(
+                        OrderItem.product
+                    ),
+                ),
+                user_id,
+                after,
+                limit,
+            )
+        )
+        return list(result.all())
+
+    async def get_user_order_summaries(
+        self,
+        user_id: int,
+        after: Optional[tuple[datetime, int]] = None,
+        limit: int = 100,
+    ) -> list[Row]:
+        """Order header columns and item count, no items or products."""
+        item_count = (
+            select(func.count(OrderItem.id))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            self.history_query(
+                select(
+                    Order.id,
+                    Order.user_id,
+                    Order.total_price,
+                    Order.status,
+                    Order.created_at,
+                    item_count.label("item_count"),
+                ),
+                user_id,
+                after,
+                limit,
+            )
+        )
+        return list(result.all())
+
+    async def get_by_id(
+        self,
+        order_id: int,
+        user_id: Optional[int] = None,
+    ) -> Order | None:
+        stmt = (
+            select(Order)
+            .where(Order.id == order_id)
             .options(
-                joinedload(Order.order_items).joinedload(OrderItem.product),
+                selectinload(Order.order_items).selectinload(
+                    OrderItem.product
+                ),
             )
-            .order_by(Order.created_at.desc())
-            .all()
         )
+        if user_id is not None:
+            stmt = stmt.where(Order.user_id == user_id)
+        return await self.db.scalar(stmt)
 
-    def get_by_id(self, order_id: int) -> Order:
-        return (
-            self.db.query(Order)
-            .filter(Order.id == order_id)
+    async def get_stale_pending(
+        self,
+        before: datetime,
+        limit: int,
+    ) -> list[Order]:
+        """
+        Up to `limit` orders still pending that were created before
+        `before`, oldest first, with their items, products and payment.
+        """
+        result = await self.db.scalars(
+            select(Order)
+            .where(Order.status == "pending", Order.created_at < before)
+            .order_by(Order.created_at, Order.id)
+            .limit(limit)
             .options(
-                joinedload(Order.order_items).joinedload(OrderItem.product),
+                selectinload(Order.order_items).selectinload(
+                    OrderItem.product
+                ),
+                selectinload(Order.payment),
             )
-            .first()
         )
+        return list(result.all())
 
-    def create(self, user_id: int, total_price: float) -> Order:
-        order = Order(user_id=user_id, total_price=total_price)
-        self.db.add(order)
-        self.db.commit()
-        self.db.refresh(order)
-        return order
-
-    def add_order_items(self, order: Order, order_items_data: list) -> None:
-        for item_data in order_items_data:
-            order_item = OrderItem(order_id=order.id, **item_data)
-            self.db.add(order_item)
-
-        self.db.commit()
-
-    def create_payment(self, order_id: int, payment_method: str) -> Payment:
-        payment = Payment(order_id=order_id, payment_method=payment_method)
-        self.db.add(payment)
-        self.db.commit()
-        self.db.refresh(payment)
-        return payment
+    async def get_snapshot(self, order_id: int, user_id: int) -> Optional[Row]:
+        """
+        The (snapshot,) row of the user's order by primary key, None if
+        they have no such order. The snapshot is None until the order
+        is confirmed or cancelled.
+        """
+        result = await self.db.execute(
+            select(Order.snapshot).where(
+                Order.id == order_id,
+                Order.user_id == user_id,
+            )
+        )
+        return result.first()
+
+    # The writes below only flush: checkout commits them as one unit
+
+    async def create(
+        self,
+        user_id: int,
+        total_price: float,
+        order_items_data: list[dict],
+        payment_method: str,
+    ) -> tuple[Order, Payment]:
+        """
+        Insert a pending order, its items and its payment in three
+        statements, bypassing the unit of work: the order and payment
+        come back through RETURNING already in the identity map, and
+        the items go out as one multi-row INSERT however many there
+        are.
+        """
+        order = await self.db.scalar(
+            insert(Order)
+            .values(user_id=user_id, total_price=total_price)
+            .returning(Order)
+        )
+        await self.db.execute(
+            insert(OrderItem),
+            [
+                {"order_id": order.id, **item_data}
+                for item_data in order_items_data
+            ],
+        )
+        payment = await self.db.scalar(
+            insert(Payment)
+            .values(order_id=order.id, payment_method=payment_method)
+            .returning(Payment)
+        )
+        return order, payment
 
-    def update_order_status(self, order: Order, status: str) -> Order:
-        order.status = status
-        self.db.commit()
-        self.db.refresh(order)
-        return order
+    async def settle(self, order: Order, status: str) -> bool:
+        """
+        Move a pending order to `status`. False, changing nothing, if
+        it is no longer pending: the request and the stale-checkout
+        sweep may race to settle the same order.
+        """
+        result = await self.db.execute(
+            update(Order)
+            .where(Order.id == order.id, Order.status == "pending")
+            .values(status=status)
+        )
+        return result.rowcount == 1
 
-    def update_payment_status(self, payment: Payment, status: str) -> Payment:
+    async def set_snapshot(self, order: Order, snapshot: str) -> None:
+        order.snapshot = snapshot
+        await self.db.flush()
+
+    async def update_payment_status(
+        self,
+        payment: Payment,
+        status: str,
+    ) -> Payment:
         payment.status = status
         if status == "completed":
-            from datetime import datetime
-
-            payment.paid_at = datetime.utcnow()
+            payment.paid_at = utcnow()
 
-        self.db.commit()
-        self.db.refresh(payment)
+        await self.db.flush()
         return payment
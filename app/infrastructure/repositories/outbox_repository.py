@@ -0,0 +1,126 @@
+import json
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Row, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utcnow
+from app.domain.entities.outbox_event import OutboxEvent
+
+
+class OutboxRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def add(self, topic: str, payload: dict[str, Any]) -> None:
+        """Queue an event in the caller's transaction; no commit."""
+        self.db.add(
+            OutboxEvent(
+                topic=topic,
+                payload=json.dumps(payload),
+                available_at=utcnow(),
+            )
+        )
+        await self.db.flush()
+
+    async def claim(
+        self,
+        now: datetime,
+        lease_until: datetime,
+        limit: int,
+    ) -> Sequence[Row]:
+        """
+        Lease up to `limit` due events until `lease_until` and commit.
+        Returns (id, topic, payload, attempts) rows. An event whose
+        worker dies is claimed again once its lease runs out.
+        """
+        due = (
+            select(OutboxEvent.id)
+            .where(
+                OutboxEvent.dead_at.is_(None),
+                OutboxEvent.available_at <= now,
+            )
+            .order_by(OutboxEvent.available_at)
+            .limit(limit)
+            # Concurrent workers on PostgreSQL split the batch instead
+            # of queueing on each other's rows
+            .with_for_update(skip_locked=True)
+        )
+        ids = (await self.db.scalars(due)).all()
+        if not ids:
+            await self.db.commit()
+            return []
+        result = await self.db.execute(
+            update(OutboxEvent)
+            # Re-checked: another worker may have leased it meanwhile
+            .where(OutboxEvent.id.in_(ids), OutboxEvent.available_at <= now)
+            .values(available_at=lease_until)
+            .returning(
+                OutboxEvent.id,
+                OutboxEvent.topic,
+                OutboxEvent.payload,
+                OutboxEvent.attempts,
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        rows = result.all()
+        await self.db.commit()
+        return sorted(rows, key=lambda row: row.id)
+
+    async def delete(self, ids: Iterable[int]) -> None:
+        await self.db.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(list(ids)))
+        )
+        await self.db.commit()
+
+    async def retry(
+        self,
+        event_id: int,
+        attempts: int,
+        available_at: datetime,
+        error: str,
+    ) -> None:
+        await self.db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == event_id)
+            .values(
+                attempts=attempts,
+                available_at=available_at,
+                last_error=error,
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        await self.db.commit()
+
+    async def dead_letter(
+        self,
+        event_id: int,
+        attempts: int,
+        now: datetime,
+        error: str,
+    ) -> None:
+        await self.db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == event_id)
+            .values(attempts=attempts, dead_at=now, last_error=error),
+            execution_options={"synchronize_session": False},
+        )
+        await self.db.commit()
+
+    async def stats(self, now: datetime) -> dict[str, int]:
+        result = await self.db.execute(
+            select(
+                func.count().filter(
+                    OutboxEvent.dead_at.is_(None),
+                    OutboxEvent.available_at <= now,
+                ),
+                func.count().filter(
+                    OutboxEvent.dead_at.is_(None),
+                    OutboxEvent.available_at > now,
+                ),
+                func.count().filter(OutboxEvent.dead_at.is_not(None)),
+            )
+        )
+        due, waiting, dead = result.one()
+        return {"due": due, "waiting": waiting, "dead": dead}
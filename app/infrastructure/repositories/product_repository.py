@@ -1,60 +1,475 @@
-from sqlalchemy.orm import Session
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
+from sqlalchemy import Select, case, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.database import ReadSessionLocal, replica_router
+from app.domain.entities.inventory_bucket import InventoryBucket
+from app.domain.entities.order import Order
+from app.domain.entities.order_item import OrderItem
 from app.domain.entities.product import Product
+from app.infrastructure.cache.product_cache import product_cache
+from app.infrastructure.repositories.facet_repository import (
+    FacetRepository,
+    facet_state,
+)
+from app.infrastructure.search.autocomplete import (
+    autocomplete_index,
+    prepare_index,
+)
+from app.infrastructure.search.product_search import ProductSearch
 from app.application.schemas.product import (
     ProductCreateSchema,
+    ProductFilterSchema,
+    ProductSchema,
     ProductUpdateSchema,
 )
 
+# Columns a bulk import overwrites when the sku already exists; stock
+# only on products without inventory buckets
+UPSERT_COLUMNS = (
+    "name",
+    "description",
+    "price",
+    "stock",
+    "category",
+    "image_url",
+    "updated_at",
+)
+
+# Matching rows counted before an estimated total gives up
+COUNT_ESTIMATE_CAP = 10_000
+
+SORT_COLUMNS = {
+    "id": Product.id,
+    "price": Product.price,
+    "created_at": Product.created_at,
+}
+
 
 class ProductRepository:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
+        self.product_search = ProductSearch(db)
+        self.facet_repo = FacetRepository(db)
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> list[Product]:
+        result = await self.db.scalars(
+            select(Product).offset(skip).limit(limit),
+        )
+        return list(result.all())
+
+    async def fetch_all(self, stmt: Select) -> list[Product]:
+        result = await self.db.scalars(stmt)
+        return list(result.all())
+
+    async def fetch_fresh(self, stmt: Select) -> list[Product]:
+        """
+        Rows to fill the product cache with, read on the primary when
+        this session is on a replica. A lagging replica would otherwise
+        put back the version a write just invalidated, for a whole TTL.
+        """
+        if not replica_router.is_replica(self.db.bind):
+            return await self.fetch_all(stmt)
+        async with ReadSessionLocal(bind=replica_router.primary) as db:
+            return await ProductRepository(db).fetch_all(stmt)
+
+    async def fetch_versions(self, stmt: Select) -> list[tuple[int, datetime]]:
+        """
+        (id, updated_at) of the rows `stmt` would return, without
+        loading them. Enough to validate a cached list page.
+        """
+        result = await self.db.execute(
+            stmt.with_only_columns(Product.id, Product.updated_at),
+        )
+        return [(row.id, row.updated_at) for row in result]
+
+    async def get_page(
+        self,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[tuple[Any, int]] = None,
+        skip: int = 0,
+    ) -> list[Product]:
+        return await self.fetch_all(
+            self.page_query(limit, sort, descending, after, skip),
+        )
+
+    def page_query(
+        self,
+        limit: int = 100,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[tuple[Any, int]] = None,
+        skip: int = 0,
+    ) -> Select:
+        return self.catalog_query(
+            ProductFilterSchema(),
+            sort=sort,
+            descending=descending,
+            after=after,
+            skip=skip,
+            limit=limit,
+        )
+
+    def filter_query(
+        self,
+        filters: ProductFilterSchema,
+        ranked: bool = False,
+    ) -> Select:
+        """
+        Products matching every filter that is set. Unordered unless
+        `ranked`, which orders search matches by relevance.
+        """
+        stmt = select(Product)
+        if filters.category is not None:
+            stmt = stmt.where(Product.category == filters.category)
+        if filters.min_price is not None:
+            stmt = stmt.where(Product.price >= filters.min_price)
+        if filters.max_price is not None:
+            stmt = stmt.where(Product.price <= filters.max_price)
+        if filters.in_stock:
+            stmt = stmt.where(Product.stock > 0)
+        if filters.search:
+            stmt = self.product_search.apply(stmt, filters.search, ranked)
+        return stmt
+
+    def catalog_query(
+        self,
+        filters: ProductFilterSchema,
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[tuple[Any, int]] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Select:
+        """
+        One page of filtered products. Column sorts page by keyset over
+        (sort, id): `after` is the (sort key, id) of the last row
+        already seen, so deep pages seek through the matching index
+        instead of scanning and discarding rows. Relevance (search
+        only) pages by offset.
+        """
+        if sort == "relevance":
+            stmt = self.filter_query(filters, ranked=True)
+            return stmt.offset(skip).limit(limit)
+
+        column = SORT_COLUMNS[sort]
+        keys = [Product.id] if sort == "id" else [column, Product.id]
+
+        stmt = self.filter_query(filters)
+        if after is not None:
+            key, last_id = after
+            bound = (last_id,) if sort == "id" else (key, last_id)
+            row = tuple_(*keys)
+            stmt = stmt.where(row < bound if descending else row > bound)
+        elif skip:
+            stmt = stmt.offset(skip)
+
+        order_by = [k.desc() for k in keys] if descending else keys
+        return stmt.order_by(*order_by).limit(limit)
+
+    async def count(
+        self,
+        filters: ProductFilterSchema,
+        estimate: bool = False,
+    ) -> tuple[int, bool]:
+        """
+        Number of products matching `filters`, and whether it is an
+        estimate. Estimates come from the planner on PostgreSQL;
+        elsewhere the count stops at COUNT_ESTIMATE_CAP and the cap is
+        returned as a lower bound.
+        """
+        stmt = self.filter_query(filters).with_only_columns(Product.id)
+        if not estimate:
+            total = await self.db.scalar(
+                select(func.count()).select_from(stmt.subquery()),
+            )
+            return total, False
+
+        if self.db.bind.dialect.name == "postgresql":
+            return await self._planner_estimate(stmt), True
+
+        capped = stmt.limit(COUNT_ESTIMATE_CAP + 1).subquery()
+        total = await self.db.scalar(select(func.count()).select_from(capped))
+        if total > COUNT_ESTIMATE_CAP:
+            return COUNT_ESTIMATE_CAP, True
+        return total, False
+
+    async def _planner_estimate(self, stmt: Select) -> int:
+        compiled = stmt.compile(
+            dialect=self.db.bind.dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        connection = await self.db.connection()
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}",
+        )
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def stream(
+        self,
+        stmt: Select,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Product]:
+        """
+        Iterate the rows of `stmt` through a server-side cursor,
+        buffering `batch_size` rows at a time. Each batch is expunged
+        once consumed so the session does not grow with the result.
+        """
+        result = await self.db.stream_scalars(
+            stmt.execution_options(yield_per=batch_size),
+        )
+        async for partition in result.partitions():
+            for product in partition:
+                yield product
+            for product in partition:
+                self.db.expunge(product)
+
+    def export_query(
+        self,
+        category: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> Select:
+        """
+        Whole-catalog export, optionally narrowed to a category and to
+        rows changed since a watermark. Incremental exports are ordered
+        by (updated_at, id) so the last row is the next watermark.
+        """
+        stmt = select(Product)
+        if category is not None:
+            stmt = stmt.where(Product.category == category)
+        if updated_since is None:
+            return stmt.order_by(Product.id)
+
+        return stmt.where(Product.updated_at > updated_since).order_by(
+            Product.updated_at,
+            Product.id,
+        )
+
+    async def get_by_id(self, product_id: int) -> Product | None:
+        return await self.db.scalar(
+            select(Product).where(Product.id == product_id),
+        )
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> list[Product]:
-        return self.db.query(Product).offset(skip).limit(limit).all()
+    async def get_cached(self, product_id: int) -> ProductSchema | None:
+        """Read-through lookup for callers that only read the product."""
+        product = await product_cache.get(product_id)
+        if product is not None:
+            return product
 
-    def get_by_id(self, product_id: int) -> Product | None:
-        return self.db.query(Product).filter(Product.id == product_id).first()
+        rows = await self.fetch_fresh(
+            select(Product).where(Product.id == product_id),
+        )
+        if not rows:
+            return None
+
+        product = ProductSchema.model_validate(rows[0])
+        await product_cache.set(product)
+        return product
+
+    async def get_many(
+        self,
+        product_ids: list[int],
+    ) -> dict[int, ProductSchema]:
+        """
+        Read-through batch lookup: cache hits first, then one IN (...)
+        query for the rest. Ids that do not exist are absent from the
+        result.
+        """
+        products = await product_cache.get_many(product_ids)
+        missing = [i for i in dict.fromkeys(product_ids) if i not in products]
+        if not missing:
+            return products
 
-    def create(self, product_create: ProductCreateSchema) -> Product:
+        rows = await self.fetch_fresh(
+            select(Product).where(Product.id.in_(missing)),
+        )
+        loaded = [ProductSchema.model_validate(row) for row in rows]
+        await product_cache.set_many(loaded)
+        products.update((product.id, product) for product in loaded)
+        return products
+
+    async def invalidate_cached(self, *product_ids: int) -> None:
+        await product_cache.invalidate(*product_ids)
+
+    async def rebuild_autocomplete(self) -> None:
+        """
+        Reload the autocomplete index from the catalog, ranked by units
+        sold in confirmed orders. Ranking runs in a worker thread so a
+        large catalog does not stall the event loop.
+        """
+        names = await self.db.execute(select(Product.id, Product.name))
+        sales = await self.db.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.status == "confirmed")
+            .group_by(OrderItem.product_id)
+        )
+        data = await asyncio.to_thread(
+            prepare_index,
+            names.tuples().all(),
+            dict(sales.tuples().all()),
+        )
+        autocomplete_index.install(data)
+
+    async def create(self, product_create: ProductCreateSchema) -> Product:
         product = Product(**product_create.model_dump())
         self.db.add(product)
-        self.db.commit()
-        self.db.refresh(product)
+        await self.facet_repo.apply([(None, facet_state(product))])
+        await self.db.commit()
+        await self.db.refresh(product)
+        # Ids can be reused after a delete, drop anything cached under it
+        await self.invalidate_cached(product.id)
+        autocomplete_index.upsert(product.id, product.name)
         return product
 
-    def update(
+    async def upsert_many(self, rows: list[dict[str, Any]]) -> list[int]:
+        """
+        Insert or update a batch of products keyed by sku in one
+        executemany round trip, then commit. Rows without a sku are
+        always inserted. Returns the ids written.
+
+        An existing product whose stock is split into buckets keeps its
+        stock: the buckets hold it and reconciliation would overwrite
+        the import. The autocomplete index is left alone: patching it
+        row by row is a list insert per key on the event loop, so bulk
+        writers call rebuild_autocomplete once they are done.
+        """
+        if not rows:
+            return []
+
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(Product)
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(Product)
+        else:
+            stmt = insert(Product)
+
+        if dialect in ("postgresql", "sqlite"):
+            set_ = {column: stmt.excluded[column] for column in UPSERT_COLUMNS}
+            set_["stock"] = case(
+                (
+                    Product.id.in_(select(InventoryBucket.product_id)),
+                    Product.stock,
+                ),
+                else_=stmt.excluded.stock,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Product.sku],
+                set_=set_,
+            )
+
+        result = await self.db.scalars(stmt.returning(Product.id), rows)
+        product_ids = list(result.all())
+        await self.db.commit()
+
+        await self.invalidate_cached(*product_ids)
+        return product_ids
+
+    async def update(
         self,
         product: Product,
         product_update: ProductUpdateSchema,
     ) -> Product:
+        before = facet_state(product)
         update_data = product_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(product, field, value)
 
-        self.db.commit()
-        self.db.refresh(product)
+        await self.facet_repo.apply([(before, facet_state(product))])
+        await self.db.commit()
+        await self.db.refresh(product)
+        await self.invalidate_cached(product.id)
+        autocomplete_index.upsert(product.id, product.name)
         return product
 
-    def delete(self, product: Product) -> None:
-        self.db.delete(product)
-        self.db.commit()
+    async def decrement_stock(
+        self,
+        product: Product,
+        quantity: int,
+    ) -> Optional[int]:
+        """
+        Take `quantity` units in one conditional UPDATE, so concurrent
+        checkouts cannot oversell. Returns the remaining stock, or None
+        (and changes nothing) if there is not enough left. Does not
+        commit.
+        """
+        return await self._adjust_stock(
+            product,
+            -quantity,
+            Product.stock >= quantity,
+        )
 
-    def search_by_name(self, name: str) -> list[Product]:
-        return (
-            self.db.query(Product)
-            .filter(
-                Product.name.ilike(f"%{name}%"),
-            )
-            .all()
+    async def increment_stock(self, product: Product, quantity: int) -> int:
+        """Give units back, e.g. after a failed payment. Does not commit."""
+        return await self._adjust_stock(product, quantity)
+
+    async def _adjust_stock(
+        self,
+        product: Product,
+        delta: int,
+        *conditions: Any,
+    ) -> Optional[int]:
+        result = await self.db.execute(
+            update(Product)
+            .where(Product.id == product.id, *conditions)
+            .values(stock=Product.stock + delta)
+            .returning(Product.stock, Product.updated_at)
+            # The in-session product holds a stale stock; sync it from
+            # the row instead of evaluating the expression in Python
+            .execution_options(synchronize_session=False)
         )
+        row = result.first()
+        if row is None:
+            return None
 
-    def get_by_category(self, category: str) -> list[Product]:
-        return (
-            self.db.query(Product)
-            .filter(
-                Product.category == category,
-            )
-            .all()
+        set_committed_value(product, "stock", row.stock)
+        set_committed_value(product, "updated_at", row.updated_at)
+        return row.stock
+
+    async def delete(self, product: Product) -> None:
+        await self.db.delete(product)
+        await self.facet_repo.apply([(facet_state(product), None)])
+        await self.db.commit()
+        await self.invalidate_cached(product.id)
+        autocomplete_index.remove(product.id)
+
+    async def search(
+        self,
+        term: str,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[Product]:
+        return await self.fetch_all(
+            self.catalog_query(
+                ProductFilterSchema(search=term),
+                sort="relevance",
+                skip=skip,
+                limit=limit,
+            ),
+        )
+
+    async def get_by_category(
+        self,
+        category: str,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[Product]:
+        return await self.fetch_all(
+            self.catalog_query(
+                ProductFilterSchema(category=category),
+                skip=skip,
+                limit=limit,
+            ),
         )
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.entities.user import User
 from app.application.schemas.user import UserCreateSchema, UserUpdateSchema
@@ -6,32 +7,32 @@ from app.core.security import get_password_hash
 
 
 class UserRepository:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    def get_by_id(self, user_id: int) -> User | None:
-        return self.db.query(User).filter(User.id == user_id).first()
+    async def get_by_id(self, user_id: int) -> User | None:
+        return await self.db.scalar(select(User).where(User.id == user_id))
 
-    def get_by_email(self, email: str) -> User | None:
-        return self.db.query(User).filter(User.email == email).first()
+    async def get_by_email(self, email: str) -> User | None:
+        return await self.db.scalar(select(User).where(User.email == email))
 
-    def create(self, user_create: UserCreateSchema) -> User:
+    async def create(self, user_create: UserCreateSchema) -> User:
         hashed_password = get_password_hash(user_create.password)
         user = User(email=user_create.email, hashed_password=hashed_password)
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def update(self, user: User, user_update: UserUpdateSchema) -> User:
+    async def update(self, user: User, user_update: UserUpdateSchema) -> User:
         update_data = user_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(user, field, value)
 
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def delete(self, user: User) -> None:
-        self.db.delete(user)
-        self.db.commit()
+    async def delete(self, user: User) -> None:
+        await self.db.delete(user)
+        await self.db.commit()
@@ -0,0 +1,255 @@
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Iterable, NamedTuple
+
+MAX_SUGGESTIONS = 20
+# Prefixes whose ranked suggestions are kept between lookups
+TOP_CACHE_SIZE = 100_000
+# Prefixes up to this length match the widest ranges; their suggestions
+# are ranked while the index is built rather than on first lookup
+WARM_PREFIX = 3
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    """Casefold, strip accents and collapse punctuation to spaces."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", stripped.casefold()).split())
+
+
+def index_keys(name: str) -> list[str]:
+    """The name from each word onwards, so any word start matches."""
+    words = normalize(name).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def prefixes(keys: Iterable[str]) -> set[str]:
+    return {key[:length] for key in keys for length in range(1, len(key) + 1)}
+
+
+class Suggestion(NamedTuple):
+    id: int
+    name: str
+    popularity: int
+
+
+def _order(suggestion: Suggestion) -> tuple:
+    return (-suggestion.popularity, suggestion.name, suggestion.id)
+
+
+class IndexData(NamedTuple):
+    keys: list[str]
+    ids: list[int]
+    names: dict[int, str]
+    popularity: dict[int, int]
+    top: dict[str, list[Suggestion]]
+
+
+def prepare_index(
+    products: Iterable[tuple[int, str]],
+    popularity: dict[int, int],
+) -> IndexData:
+    """
+    Build index data from (id, name) pairs and units sold. CPU bound on
+    a large catalog; safe to run in a worker thread.
+    """
+    entries = []
+    names = {}
+    suggestions = []
+    for product_id, name in products:
+        names[product_id] = name
+        keys = index_keys(name)
+        entries.extend((key, product_id) for key in keys)
+        suggestions.append(
+            (
+                Suggestion(product_id, name, popularity.get(product_id, 0)),
+                keys,
+            )
+        )
+    entries.sort()
+
+    # Visiting products best first fills each warm prefix in rank order
+    suggestions.sort(key=lambda item: _order(item[0]))
+    top: dict[str, list[Suggestion]] = {}
+    for suggestion, keys in suggestions:
+        warm = {key[:n] for key in keys for n in range(1, WARM_PREFIX + 1)}
+        for term in warm:
+            ranked = top.setdefault(term, [])
+            if len(ranked) < MAX_SUGGESTIONS:
+                ranked.append(suggestion)
+
+    return IndexData(
+        keys=[key for key, _ in entries],
+        ids=[product_id for _, product_id in entries],
+        names=names,
+        popularity={
+            product_id: count
+            for product_id, count in popularity.items()
+            if product_id in names
+        },
+        top=top,
+    )
+
+
+class PrefixIndex:
+    """
+    In-process autocomplete over product names: a sorted array of
+    normalized keys searched with bisect, ranked by popularity (units
+    sold). Ranked suggestions are kept per prefix and patched in place
+    by writes: every prefix up to WARM_PREFIX characters is ranked at
+    build time, longer ones on first lookup and then held in an LRU.
+
+    Lookups never touch the database. ProductRepository keeps the
+    index in step with its writes and the app rebuilds it periodically
+    to pick up writes made by other processes.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[str] = []
+        self._ids: list[int] = []
+        self._names: dict[int, str] = {}
+        self._popularity: dict[int, int] = {}
+        self._warm: dict[str, list[Suggestion]] = {}
+        self._top: OrderedDict[str, list[Suggestion]] = OrderedDict()
+        # Lists cut short by a removal: their best entries are exact
+        # but they may no longer hold every match
+        self._partial: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def build(
+        self,
+        products: Iterable[tuple[int, str]],
+        popularity: dict[int, int],
+    ) -> None:
+        self.install(prepare_index(products, popularity))
+
+    def install(self, data: IndexData) -> None:
+        # No await in between, so a lookup never sees a partial swap
+        self._keys = data.keys
+        self._ids = data.ids
+        self._names = data.names
+        self._popularity = data.popularity
+        self._warm = data.top
+        self._top = OrderedDict()
+        self._partial = set()
+
+    def upsert(self, product_id: int, name: str) -> None:
+        if self._names.get(product_id) == name:
+            return
+        self._remove_keys(product_id)
+        self._names[product_id] = name
+        keys = index_keys(name)
+        for key in keys:
+            position = bisect.bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._ids.insert(position, product_id)
+        self._promote(product_id, keys)
+
+    def remove(self, product_id: int) -> None:
+        self._remove_keys(product_id)
+        self._names.pop(product_id, None)
+        self._popularity.pop(product_id, None)
+
+    def add_popularity(self, product_id: int, count: int) -> None:
+        name = self._names.get(product_id)
+        if name is None:
+            return
+        self._popularity[product_id] = (
+            self._popularity.get(product_id, 0) + count
+        )
+        self._promote(product_id, index_keys(name))
+
+    def clear(self) -> None:
+        self.build([], {})
+
+    def search(self, prefix: str, limit: int = 10) -> list[Suggestion]:
+        term = normalize(prefix)
+        if not term:
+            return []
+
+        if len(term) <= WARM_PREFIX:
+            # Every prefix with a match was ranked at build time
+            return self._warm.get(term, [])[:limit]
+
+        top = self._top.get(term)
+        if top is None:
+            top = self._top[term] = self._rank(term)
+            if len(self._top) > TOP_CACHE_SIZE:
+                self._top.popitem(last=False)
+        else:
+            self._top.move_to_end(term)
+        return top[:limit]
+
+    def _suggestion(self, product_id: int) -> Suggestion:
+        return Suggestion(
+            product_id,
+            self._names[product_id],
+            self._popularity.get(product_id, 0),
+        )
+
+    def _rank(self, term: str) -> list[Suggestion]:
+        start = bisect.bisect_left(self._keys, term)
+        end = bisect.bisect_left(self._keys, term + "\U0010ffff", lo=start)
+        matches = (self._suggestion(i) for i in set(self._ids[start:end]))
+        return heapq.nsmallest(MAX_SUGGESTIONS, matches, key=_order)
+
+    def _promote(self, product_id: int, keys: list[str]) -> None:
+        """
+        Fold a product that was added or became more popular into the
+        ranked suggestions of every prefix it matches.
+        """
+        suggestion = self._suggestion(product_id)
+        for term in prefixes(keys):
+            if len(term) <= WARM_PREFIX:
+                top = self._warm.setdefault(term, [])
+            else:
+                top = self._top.get(term)
+                if top is None:
+                    continue
+
+            top[:] = [s for s in top if s.id != product_id]
+            # A short, complete list holds every match; otherwise only
+            # a product that outranks the last entry is known to belong
+            bounded = len(top) == MAX_SUGGESTIONS or term in self._partial
+            if bounded and top and _order(suggestion) > _order(top[-1]):
+                continue
+            bisect.insort(top, suggestion, key=_order)
+            del top[MAX_SUGGESTIONS:]
+
+    def _remove_keys(self, product_id: int) -> None:
+        name = self._names.get(product_id)
+        if name is None:
+            return
+        keys = index_keys(name)
+        for key in keys:
+            start = bisect.bisect_left(self._keys, key)
+            end = bisect.bisect_right(self._keys, key, lo=start)
+            for position in range(start, end):
+                if self._ids[position] == product_id:
+                    del self._keys[position]
+                    del self._ids[position]
+                    break
+
+        for term in prefixes(keys):
+            if len(term) > WARM_PREFIX:
+                # Re-ranked from the keys on the next lookup
+                top = self._top.get(term)
+                if top is not None and any(s.id == product_id for s in top):
+                    del self._top[term]
+                continue
+
+            top = self._warm.get(term, [])
+            if any(s.id == product_id for s in top):
+                if len(top) == MAX_SUGGESTIONS:
+                    self._partial.add(term)
+                top[:] = [s for s in top if s.id != product_id]
+
+
+autocomplete_index = PrefixIndex()
@@ -0,0 +1,121 @@
+import re
+
+from sqlalchemy import DDL, Select, event, false
+from sqlalchemy import column, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.product import Product
+
+FTS_TABLE = "products_fts"
+
+# SQLite: external-content FTS5 table over products, keyed by products.id
+products_fts = table(FTS_TABLE, column("rowid"))
+FTS_COLUMNS = "name, description, category"
+FTS_NEW = "new.id, new.name, new.description, new.category"
+FTS_OLD = "old.id, old.name, old.description, old.category"
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{FTS_COLUMNS}, content='products', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    # Triggers keep the index in step with every write to products
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products "
+    f"BEGIN INSERT INTO {FTS_TABLE}(rowid, {FTS_COLUMNS}) "
+    f"VALUES ({FTS_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {FTS_COLUMNS}) "
+    f"VALUES ('delete', {FTS_OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    f"AFTER UPDATE OF {FTS_COLUMNS} ON products "
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {FTS_COLUMNS}) "
+    f"VALUES ('delete', {FTS_OLD}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {FTS_COLUMNS}) "
+    f"VALUES ({FTS_NEW}); END",
+]
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+# bm25 column weights: name, description, category
+FTS_RANK = f"bm25({FTS_TABLE}, 10.0, 1.0, 4.0)"
+
+# PostgreSQL: weighted tsvector over the same columns behind a GIN index.
+# Queries repeat this exact expression so the planner can use the index.
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(products.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(products.category, '')), 'B')"
+    " || setweight(to_tsvector('simple', "
+    "coalesce(products.description, '')), 'C')"
+)
+POSTGRESQL_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_products_search "
+    f"ON products USING gin (({PG_DOCUMENT}))",
+]
+
+for statement in SQLITE_DDL:
+    event.listen(
+        Product.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in POSTGRESQL_DDL:
+    event.listen(
+        Product.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
+def is_search_table(name: str | None) -> bool:
+    """FTS5 and its shadow tables are not part of the ORM metadata."""
+    return bool(name) and name.startswith(FTS_TABLE)
+
+
+def tokenize(term: str) -> list[str]:
+    return re.findall(r"\w+", term.lower())
+
+
+class ProductSearch:
+    """
+    Ranked full-text search over product name, description and
+    category: FTS5 with bm25 on SQLite, a GIN-indexed tsvector with
+    ts_rank on PostgreSQL. Every word of the term must match as a
+    prefix.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    @property
+    def dialect(self) -> str:
+        return self.db.bind.dialect.name
+
+    def apply(self, stmt: Select, term: str, ranked: bool = True) -> Select:
+        """
+        Narrow a select of products to those matching `term`, best
+        matches first unless `ranked` is off (the caller then orders).
+        """
+        tokens = tokenize(term)
+        if not tokens:
+            return stmt.where(false())
+
+        if self.dialect == "postgresql":
+            query = " & ".join(f"{token}:*" for token in tokens)
+            tsquery = "to_tsquery('simple', :query)"
+            match = text(f"{PG_DOCUMENT} @@ {tsquery}")
+            stmt = stmt.where(match.bindparams(query=query))
+            if ranked:
+                rank = text(f"ts_rank({PG_DOCUMENT}, {tsquery}) DESC")
+                stmt = stmt.order_by(rank.bindparams(query=query), Product.id)
+        else:
+            query = " ".join(f'"{token}"*' for token in tokens)
+            match = text(f"{FTS_TABLE} MATCH :query").bindparams(query=query)
+            stmt = stmt.join(
+                products_fts,
+                products_fts.c.rowid == Product.id,
+            ).where(match)
+            if ranked:
+                stmt = stmt.order_by(text(FTS_RANK), Product.id)
+
+        return stmt
@@ -0,0 +1,80 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(versions: Iterable[tuple[int, datetime]]) -> str:
+    """Strong ETag over the (id, updated_at) of every row in a payload."""
+    digest = hashlib.sha256()
+    for product_id, updated_at in versions:
+        digest.update(f"{product_id}:{updated_at.isoformat()};".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def last_modified(
+    versions: Iterable[tuple[int, datetime]],
+) -> Optional[datetime]:
+    # Timestamps are stored as naive UTC
+    latest = max((updated_at for _, updated_at in versions), default=None)
+    if latest is None:
+        return None
+    return latest.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def has_preconditions(request: Request) -> bool:
+    return (
+        "if-none-match" in request.headers
+        or "if-modified-since" in request.headers
+    )
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    modified: Optional[datetime],
+) -> bool:
+    """
+    RFC 9110 evaluation for GET: If-None-Match wins when present,
+    otherwise If-Modified-Since is compared at one second precision.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified <= since
+
+
+def set_validators(
+    response: Response,
+    etag: str,
+    modified: Optional[datetime],
+) -> None:
+    response.headers["ETag"] = etag
+    if modified is not None:
+        response.headers["Last-Modified"] = format_datetime(
+            modified,
+            usegmt=True,
+        )
+
+
+def not_modified(etag: str, modified: Optional[datetime]) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, modified)
+    return response
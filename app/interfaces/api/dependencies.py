@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.domain.entities.user import User
@@ -9,12 +9,12 @@ from app.application.services.auth_service import AuthService
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     auth_service = AuthService(db)
-    return auth_service.get_current_user(credentials.credentials)
+    return await auth_service.get_current_user(credentials.credentials)
 
 
 def get_current_admin_user(
@@ -0,0 +1,75 @@
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Header, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.services.idempotency_service import IdempotencyService
+from app.domain.entities.user import User
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def idempotency_key_header(
+    key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Client-chosen key; a retry with the same key and "
+        "body gets the original response instead of running again",
+    ),
+) -> Optional[str]:
+    return key
+
+
+async def fingerprint(request: Request) -> str:
+    """Tells a retry from a different request reusing the same key."""
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+async def idempotent(
+    request: Request,
+    db: AsyncSession,
+    user: User,
+    key: Optional[str],
+    call: Callable[[], Awaitable[Any]],
+    status_code: int = 200,
+    response_model: Optional[type[BaseModel]] = None,
+) -> Any:
+    """
+    Run a mutating endpoint's `call` at most once per Idempotency-Key
+    and answer duplicates with the stored response. Without a key the
+    result of `call` is returned untouched.
+    """
+    if key is None:
+        return await call()
+
+    async def handler() -> tuple[int, Optional[str]]:
+        result = await call()
+        if result is None:
+            return status_code, None
+        if response_model is not None:
+            result = response_model.model_validate(result)
+        return status_code, json.dumps(jsonable_encoder(result))
+
+    stored, replayed = await IdempotencyService(db).run(
+        user.id,
+        key,
+        await fingerprint(request),
+        handler,
+    )
+    response = Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json" if stored.body is not None else None,
+    )
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return response
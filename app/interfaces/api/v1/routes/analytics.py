@@ -0,0 +1,55 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.interfaces.api.dependencies import get_current_admin_user
+from app.application.services.analytics_service import AnalyticsService
+from app.application.schemas.analytics import (
+    CategorySalesSchema,
+    DailySalesSchema,
+    ProductSalesSchema,
+)
+
+router = APIRouter()
+
+
+@router.get("/sales", response_model=list[DailySalesSchema])
+async def get_daily_sales(
+    start: date,
+    end: date,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_admin_user),
+):
+    """
+    Orders, units and revenue per UTC day from `start` to `end`
+    inclusive; days without sales are omitted.
+    """
+    analytics_service = AnalyticsService(db)
+    return await analytics_service.get_daily(start, end)
+
+
+@router.get("/sales/categories", response_model=list[CategorySalesSchema])
+async def get_category_sales(
+    start: date,
+    end: date,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_admin_user),
+):
+    """Totals per category over the days, highest revenue first."""
+    analytics_service = AnalyticsService(db)
+    return await analytics_service.get_by_category(start, end)
+
+
+@router.get("/sales/products", response_model=list[ProductSalesSchema])
+async def get_product_sales(
+    start: date,
+    end: date,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_admin_user),
+):
+    """Best-selling products over the days, by revenue."""
+    analytics_service = AnalyticsService(db)
+    return await analytics_service.get_by_product(start, end, limit)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.domain.entities.user import User
@@ -21,25 +21,25 @@ router = APIRouter()
 )
 async def register(
     user_create: UserCreateSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     auth_service = AuthService(db)
-    return auth_service.register_user(user_create)
+    return await auth_service.register_user(user_create)
 
 
 @router.post("/login", response_model=TokenSchema)
 async def login(
     user_login: UserLoginSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     auth_service = AuthService(db)
-    return auth_service.authenticate_user(user_login)
+    return await auth_service.authenticate_user(user_login)
 
 
 @router.post("/refresh", response_model=TokenSchema)
 async def refresh_token(
     token_refresh: TokenRefreshSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     auth_service = AuthService(db)
-    return auth_service.refresh_token(token_refresh.refresh_token)
+    return await auth_service.refresh_token(token_refresh.refresh_token)
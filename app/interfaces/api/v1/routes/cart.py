@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db, get_read_db
 from app.domain.entities.cart_item import CartItem
 from app.domain.entities.user import User
 from app.application.services.cart_service import CartService
@@ -12,6 +14,7 @@ from app.application.schemas.cart import (
     CartItemUpdateSchema,
 )
 from app.interfaces.api.dependencies import get_current_user
+from app.interfaces.api.idempotency import idempotency_key_header, idempotent
 
 router = APIRouter()
 
@@ -19,10 +22,10 @@ router = APIRouter()
 @router.get("/", response_model=CartSchema)
 async def get_cart(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> CartSchema:
     cart_service = CartService(db)
-    return cart_service.get_user_cart(current_user)
+    return await cart_service.get_user_cart(current_user)
 
 
 @router.post(
@@ -32,45 +35,81 @@ async def get_cart(
 )
 async def add_to_cart(
     cart_item_create: CartItemCreateSchema,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ) -> CartItem:
     cart_service = CartService(db)
-    return cart_service.add_to_cart(current_user, cart_item_create)
+    return await idempotent(
+        request,
+        db,
+        current_user,
+        idempotency_key,
+        lambda: cart_service.add_to_cart(current_user, cart_item_create),
+        status_code=status.HTTP_201_CREATED,
+        response_model=CartItemSchema,
+    )
 
 
 @router.put("/items/{product_id}")
 async def update_cart_item(
     product_id: int,
     cart_item_update: CartItemUpdateSchema,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ):
     cart_service = CartService(db)
-    result = cart_service.update_cart_item(
-        current_user, product_id, cart_item_update.quantity
-    )
 
-    if result is None:
-        return {"message": "Item removed from cart"}
+    async def update():
+        result = await cart_service.update_cart_item(
+            current_user, product_id, cart_item_update.quantity
+        )
+
+        if result is None:
+            return {"message": "Item removed from cart"}
 
-    return result
+        return result
+
+    return await idempotent(
+        request, db, current_user, idempotency_key, update
+    )
 
 
 @router.delete("/items/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_cart(
     product_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ) -> None:
     cart_service = CartService(db)
-    cart_service.remove_from_cart(current_user, product_id)
+    return await idempotent(
+        request,
+        db,
+        current_user,
+        idempotency_key,
+        lambda: cart_service.remove_from_cart(current_user, product_id),
+        status_code=status.HTTP_204_NO_CONTENT,
+    )
 
 
 @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
 async def clear_cart(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ) -> None:
     cart_service = CartService(db)
-    cart_service.clear_cart(current_user)
+    return await idempotent(
+        request,
+        db,
+        current_user,
+        idempotency_key,
+        lambda: cart_service.clear_cart(current_user),
+        status_code=status.HTTP_204_NO_CONTENT,
+    )
@@ -1,49 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.database import get_db
+from fastapi import (
+    APIRouter,
+    Depends,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db, get_read_db
 
 from app.domain.entities.order import Order
 from app.domain.entities.user import User
-from app.infrastructure.repositories.order_repository import OrderRepository
 from app.application.services.checkout_service import CheckoutService
-from app.application.schemas.order import OrderSchema, OrderCreateSchema
+from app.application.services.order_service import OrderService
+from app.application.schemas.order import (
+    OrderCreateSchema,
+    OrderSchema,
+    OrderSummarySchema,
+)
 from app.interfaces.api.dependencies import get_current_user
+from app.interfaces.api.idempotency import idempotency_key_header, idempotent
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[OrderSchema])
 async def get_user_orders(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[Order]:
-    order_repo = OrderRepository(db)
-    return order_repo.get_user_orders(current_user.id)
+    """
+    Newest first, with items and products. Pass the X-Next-Cursor
+    header back as `cursor` for the following page.
+    """
+    order_service = OrderService(db)
+    orders = await order_service.get_orders(current_user.id, cursor, limit)
+    next_cursor = order_service.next_cursor(orders, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
+
+
+@router.get("/summary", response_model=list[OrderSummarySchema])
+async def get_user_order_summaries(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Order history without items: order fields and an item count per
+    order, paged like the full listing.
+    """
+    order_service = OrderService(db)
+    orders = await order_service.get_summaries(
+        current_user.id, cursor, limit
+    )
+    next_cursor = order_service.next_cursor(orders, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
 
 
 @router.get("/{order_id}", response_model=OrderSchema)
 async def get_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> Order:
-    order_repo = OrderRepository(db)
-    order = order_repo.get_by_id(order_id)
-
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
-        )
-
-    # Ensure user can only access their own orders
-    if order.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this order",
-        )
-
-    return order
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    order_service = OrderService(db)
+    return Response(
+        content=await order_service.get_order_json(current_user.id, order_id),
+        media_type="application/json",
+    )
 
 
 @router.post(
@@ -53,8 +89,26 @@ async def get_order(
 )
 async def checkout(
     order_create: OrderCreateSchema,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
 ):
+    """
+    Send an Idempotency-Key to make retries safe: a repeat gets the
+    first attempt's response (waiting for it if still running) and
+    never places a second order.
+    """
     checkout_service = CheckoutService(db)
-    return checkout_service.create_order_from_cart(current_user, order_create)
+    return await idempotent(
+        request,
+        db,
+        current_user,
+        idempotency_key,
+        lambda: checkout_service.create_order_from_cart(
+            current_user,
+            order_create,
+        ),
+        status_code=status.HTTP_201_CREATED,
+        response_model=OrderSchema,
+    )
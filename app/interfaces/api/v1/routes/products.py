@@ -1,54 +1,233 @@
-from typing import Optional
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.domain.entities.category_facet import CategoryFacet
 from app.domain.entities.product import Product
+from app.interfaces.api.conditional import (
+    has_preconditions,
+    is_not_modified,
+    last_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+)
 from app.interfaces.api.dependencies import get_current_admin_user
+from app.infrastructure.search.autocomplete import (
+    MAX_SUGGESTIONS,
+    Suggestion,
+    autocomplete_index,
+)
+from app.infrastructure.repositories.facet_repository import (
+    FacetRepository,
+)
 from app.infrastructure.repositories.product_repository import (
     ProductRepository,
 )
+from app.application.services.catalog_service import CatalogService
+from app.application.services.inventory_service import InventoryService
+from app.application.services.product_export_service import (
+    EXPORT_MEDIA_TYPES,
+    ProductExportService,
+)
+from app.application.services.product_import_service import (
+    ProductImportService,
+)
+from app.application.schemas.inventory import (
+    InventorySchema,
+    InventoryUpdateSchema,
+)
 from app.application.schemas.product import (
+    CategoryFacetSchema,
+    ProductBatchSchema,
     ProductSchema,
+    ProductSuggestionSchema,
     ProductCreateSchema,
+    ProductFilterSchema,
+    ProductImportReportSchema,
     ProductUpdateSchema,
 )
 
 router = APIRouter()
 
+MAX_BATCH_IDS = 500
+
+
+@asynccontextmanager
+async def unique_sku(db: AsyncSession) -> AsyncIterator[None]:
+    """Turn a write that collides with another product's sku into 409."""
+    try:
+        yield
+    except IntegrityError as e:
+        if "sku" not in str(e.orig):
+            raise
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A product with this sku already exists",
+        ) from e
+
 
 @router.get("/", response_model=list[ProductSchema])
 async def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
-) -> list[Product]:
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: bool = False,
+    sort: Optional[Literal["id", "price", "created_at"]] = None,
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Filters combine; search results are ranked by relevance unless a
+    sort is given. Column sorts hand out an X-Next-Cursor header.
+    """
+    catalog_service = CatalogService(db)
+    product_repo = catalog_service.product_repo
+    filters = ProductFilterSchema(
+        category=category,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+    )
+    sort = catalog_service.resolve_sort(filters, sort)
+    descending = order == "desc"
+    stmt = catalog_service.page_query(
+        filters, sort, descending, cursor, skip, limit
+    )
+
+    # Revalidation only needs (id, updated_at) of the page, not the rows
+    if has_preconditions(request):
+        versions = await product_repo.fetch_versions(stmt)
+        etag, modified = make_etag(versions), last_modified(versions)
+        if is_not_modified(request, etag, modified):
+            return not_modified(etag, modified)
+
+    products = await product_repo.fetch_all(stmt)
+    versions = [(product.id, product.updated_at) for product in products]
+    set_validators(response, make_etag(versions), last_modified(versions))
+
+    next_cursor = catalog_service.next_cursor(
+        products, sort, descending, limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return products
+
+
+@router.get("/autocomplete", response_model=list[ProductSuggestionSchema])
+async def autocomplete_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+) -> list[Suggestion]:
+    """
+    Type-ahead over product names, most popular first. Served from the
+    in-process prefix index, without a database round trip.
+    """
+    return autocomplete_index.search(q, limit)
+
+
+@router.get("/facets", response_model=list[CategoryFacetSchema])
+async def get_category_facets(
+    db: AsyncSession = Depends(get_read_db),
+) -> list[CategoryFacet]:
+    """Product count, in-stock count and price range per category."""
+    facet_repo = FacetRepository(db)
+    return await facet_repo.get_all()
+
+
+@router.get("/batch", response_model=ProductBatchSchema)
+async def get_products_batch(
+    ids: list[int] = Query([]),
+    db: AsyncSession = Depends(get_read_db),
+) -> ProductBatchSchema:
+    """
+    Look up many products at once, e.g. `?ids=3&ids=1&ids=2`. Products
+    come back in request order, ids that do not exist under `missing`.
+    """
+    if not 1 <= len(ids) <= MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Pass between 1 and {MAX_BATCH_IDS} ids",
+        )
+
     product_repo = ProductRepository(db)
+    found = await product_repo.get_many(ids)
+
+    requested = list(dict.fromkeys(ids))
+    return ProductBatchSchema(
+        products=[found[i] for i in requested if i in found],
+        missing=[i for i in requested if i not in found],
+    )
 
-    if search:
-        return product_repo.search_by_name(search)
-    elif category:
-        return product_repo.get_by_category(category)
-    else:
-        return product_repo.get_all(skip=skip, limit=limit)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_products(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    category: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_admin_user),
+) -> StreamingResponse:
+    """
+    Stream the whole catalog, or the rows of a category and/or changed
+    after `updated_since`, as NDJSON or CSV.
+    """
+    export_service = ProductExportService(db)
+    return StreamingResponse(
+        export_service.export(format, category, updated_since),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="products.{format}"'
+            ),
+        },
+    )
 
 
 @router.get("/{product_id}", response_model=ProductSchema)
 async def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
-) -> Product:
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
     product_repo = ProductRepository(db)
-    product = product_repo.get_by_id(product_id)
+    product = await product_repo.get_cached(product_id)
 
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
 
+    versions = [(product.id, product.updated_at)]
+    etag, modified = make_etag(versions), last_modified(versions)
+    if is_not_modified(request, etag, modified):
+        return not_modified(etag, modified)
+
+    set_validators(response, etag, modified)
     return product
 
 
@@ -59,43 +238,111 @@ async def get_product(
 )
 async def create_product(
     product_create: ProductCreateSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_admin_user),
 ) -> Product:
     product_repo = ProductRepository(db)
-    return product_repo.create(product_create)
+    async with unique_sku(db):
+        return await product_repo.create(product_create)
+
+
+@router.post("/import", response_model=ProductImportReportSchema)
+async def import_products(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+) -> ProductImportReportSchema:
+    """
+    Bulk upsert of a CSV (header row required) or NDJSON feed, keyed
+    by sku. The body is consumed as a stream; invalid rows are
+    reported by line number and skipped.
+    """
+    import_service = ProductImportService(db)
+    return await import_service.import_stream(
+        request.stream(),
+        request.headers.get("content-type"),
+    )
 
 
 @router.put("/{product_id}", response_model=ProductSchema)
 async def update_product(
     product_id: int,
     product_update: ProductUpdateSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_admin_user),
 ) -> Product:
     product_repo = ProductRepository(db)
-    product = product_repo.get_by_id(product_id)
+    product = await product_repo.get_by_id(product_id)
+
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+        )
+    if product_update.stock is not None:
+        # Reconciliation would overwrite it from the buckets
+        if await InventoryService(db).bucketed([product.id]):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Stock of this product is set through its inventory",
+            )
+
+    async with unique_sku(db):
+        return await product_repo.update(product, product_update)
+
+
+@router.get("/{product_id}/inventory", response_model=InventorySchema)
+async def get_product_inventory(
+    product_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+) -> InventorySchema:
+    product_repo = ProductRepository(db)
+    product = await product_repo.get_by_id(product_id)
+
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+        )
+
+    return await InventoryService(db).get_inventory(product)
+
+
+@router.put("/{product_id}/inventory", response_model=InventorySchema)
+async def set_product_inventory(
+    product_id: int,
+    inventory_update: InventoryUpdateSchema,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_admin_user),
+) -> InventorySchema:
+    """
+    Set a product's free stock and split it over buckets. Checkouts of
+    a bucketed product reserve from the buckets, which keeps hot
+    products from serializing on their row; the product's stock then
+    follows the buckets through periodic reconciliation.
+    """
+    product_repo = ProductRepository(db)
+    product = await product_repo.get_by_id(product_id)
 
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
 
-    return product_repo.update(product, product_update)
+    return await InventoryService(db).set_inventory(product, inventory_update)
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_admin_user),
 ) -> None:
     product_repo = ProductRepository(db)
-    product = product_repo.get_by_id(product_id)
+    product = await product_repo.get_by_id(product_id)
 
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
 
-    product_repo.delete(product)
+    await product_repo.delete(product)
@@ -0,0 +1,51 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.application.services.catalog_service import CatalogService
+from app.application.schemas.product import (
+    ProductFilterSchema,
+    ProductPageSchema,
+)
+
+router = APIRouter()
+
+
+@router.get("/", response_model=ProductPageSchema)
+async def get_products(
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: bool = False,
+    sort: Optional[Literal["relevance", "id", "price", "created_at"]] = None,
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    total: Literal["exact", "estimated", "none"] = "estimated",
+    db: AsyncSession = Depends(get_read_db),
+) -> ProductPageSchema:
+    """
+    Catalog page in an envelope. `total` is exact, estimated (a planner
+    estimate on PostgreSQL, a capped count elsewhere) or skipped; pass
+    `next_cursor` back as `cursor` for the following page.
+    """
+    catalog_service = CatalogService(db)
+    return await catalog_service.get_page(
+        ProductFilterSchema(
+            category=category,
+            search=search,
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=in_stock,
+        ),
+        sort=sort,
+        descending=order == "desc",
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        total=total,
+    )
@@ -0,0 +1,45 @@
+"""
+Roll up order history into the sales analytics tables, a chunk of
+confirmed orders per transaction. Orders already counted, by the
+outbox consumer or an earlier run, are skipped, so it is safe to
+rerun and to run while the app is serving checkouts:
+
+    python -m app.interfaces.cli.backfill_sales --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import logging
+
+# Imported for its side effect: registers every entity with the mapper
+import app.main  # noqa: F401
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.application.services.analytics_service import AnalyticsService
+
+
+async def backfill(chunk_size: int) -> int:
+    try:
+        async with SessionLocal() as db:
+            return await AnalyticsService(db).backfill(chunk_size)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.sales_backfill_chunk_size,
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger(AnalyticsService.__module__).setLevel(logging.INFO)
+    added = asyncio.run(backfill(args.chunk_size))
+    print(f"rolled up {added} orders")
+
+
+if __name__ == "__main__":
+    main()
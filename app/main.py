@@ -1,22 +1,89 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import create_tables
+from app.application.services.autocomplete_service import (
+    rebuild_autocomplete,
+    refresh_autocomplete,
+)
+from app.application.services.checkout_service import settle_stale_checkouts
+from app.application.services.idempotency_service import (
+    PURGE_INTERVAL_SECONDS,
+    purge_idempotency_keys,
+)
+from app.application.services.inventory_service import maintain_inventory
+from app.application.services.outbox_service import (
+    OutboxService,
+    outbox_worker,
+)
+from app.core.config import settings
+from app.core.database import (
+    create_tables,
+    engine,
+    get_db,
+    pool_metrics,
+    replica_router,
+)
+from app.infrastructure.cache.product_cache import product_cache
+from app.infrastructure.gateways.payment_gateway import payment_gateway
 from app.interfaces.api.v1.routes import (
     auth,
     users,
     products,
     cart,
     orders,
+    analytics,
 )
+from app.interfaces.api.v2.routes import products as products_v2
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Create tables
+    await create_tables()
+    await rebuild_autocomplete()
+    autocomplete_refresh = asyncio.create_task(
+        refresh_autocomplete(settings.autocomplete_refresh_seconds)
+    )
+    inventory_maintenance = asyncio.create_task(
+        maintain_inventory(settings.inventory_maintenance_seconds)
+    )
+    idempotency_purge = asyncio.create_task(
+        purge_idempotency_keys(PURGE_INTERVAL_SECONDS)
+    )
+    checkout_sweep = asyncio.create_task(
+        settle_stale_checkouts(settings.checkout_sweep_seconds)
+    )
+    outbox = asyncio.create_task(
+        outbox_worker.run(
+            settings.outbox_poll_seconds,
+            settings.outbox_batch_size,
+        )
+    )
+    yield
+    for task in (
+        autocomplete_refresh,
+        inventory_maintenance,
+        idempotency_purge,
+        checkout_sweep,
+        outbox,
+    ):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await replica_router.dispose()
+    await engine.dispose()
 
-# Create tables
-create_tables()
 
 app = FastAPI(
     title="Prototype FastAPI Ecommerce",
     description="A prototype FastAPI ecommerce application",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -54,6 +121,16 @@ app.include_router(
     prefix="/api/v1/orders",
     tags=["Orders"],
 )
+app.include_router(
+    analytics.router,
+    prefix="/api/v1/analytics",
+    tags=["Analytics"],
+)
+app.include_router(
+    products_v2.router,
+    prefix="/api/v2/products",
+    tags=["Products"],
+)
 
 
 @app.get("/")
@@ -64,3 +141,23 @@ async def root() -> dict:
 @app.get("/health")
 async def health_check() -> dict:
     return {"status": "healthy"}
+
+
+@app.get("/health/pool")
+async def pool_health() -> dict:
+    return pool_metrics.snapshot()
+
+
+@app.get("/health/cache")
+async def cache_health() -> dict:
+    return product_cache.stats()
+
+
+@app.get("/health/payments")
+async def payments_health() -> dict:
+    return payment_gateway.stats()
+
+
+@app.get("/health/outbox")
+async def outbox_health(db: AsyncSession = Depends(get_db)) -> dict:
+    return await OutboxService(db).stats()
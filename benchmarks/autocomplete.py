@@ -0,0 +1,80 @@
+"""
+Autocomplete lookup latency from the in-process prefix index over a
+synthetic catalog, for 1-4 character prefixes. "cold" is the first
+lookup of each prefix (a range scan), p50/p99 are warm lookups:
+
+    python -m benchmarks.autocomplete --products 500000 --queries 20000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from app.infrastructure.search.autocomplete import PrefixIndex
+
+WORDS = [
+    "classic", "denim", "jacket", "linen", "shirt", "wool", "scarf",
+    "leather", "boots", "cotton", "hoodie", "running", "shoes", "summer",
+    "dress", "winter", "coat", "slim", "fit", "jeans", "silk", "tie",
+]
+
+
+def build(products: int, seed: int) -> PrefixIndex:
+    rng = random.Random(seed)
+    names = [
+        (
+            product_id,
+            " ".join(rng.choices(WORDS, k=rng.randint(2, 4)))
+            + f" {rng.choice(string.ascii_uppercase)}{product_id}",
+        )
+        for product_id in range(1, products + 1)
+    ]
+    popularity = {
+        product_id: int(rng.paretovariate(1.2))
+        for product_id in range(1, products + 1)
+    }
+    index = PrefixIndex()
+    index.build(names, popularity)
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build(args.products, args.seed)
+    elapsed = time.perf_counter() - started
+    print(f"built {len(index)} products in {elapsed:.1f}s")
+
+    rng = random.Random(args.seed)
+    print(
+        f"{'prefix':<8} {'cold max ms':>12} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for length in range(1, 5):
+        cold = []
+        for prefix in sorted({word[:length] for word in WORDS}):
+            start = time.perf_counter()
+            index.search(prefix, limit=10)
+            cold.append((time.perf_counter() - start) * 1000)
+
+        samples = []
+        for _ in range(args.queries):
+            prefix = rng.choice(WORDS)[:length]
+            start = time.perf_counter()
+            index.search(prefix, limit=10)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(
+            f"{length:<8} {max(cold):>12.3f} "
+            f"{statistics.median(samples):>8.3f} {p99:>8.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
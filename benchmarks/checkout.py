@@ -0,0 +1,314 @@
+"""
+Checkout under contention: seeds users, products and carts, then has
+concurrent clients POST /api/v1/orders/checkout once per user and
+reports orders/s, latency percentiles, database statements per
+checkout and any broken invariant (negative or oversold stock, orders
+without a payment, orders whose status disagrees with their payment).
+
+By default the app runs in process over ASGI against a fresh SQLite
+file. --database-url points it at another database, e.g. a local
+Postgres; its tables are dropped and recreated, so use a scratch one:
+
+    python -m benchmarks.checkout --users 500 --products 20 --clients 50
+    python -m benchmarks.checkout \\
+        --database-url postgresql://postgres@localhost/bench
+
+With --base-url the checkouts go to a running server instead, e.g.
+`uvicorn app.main:app --workers 4` started with DATABASE_URL set to
+the same scratch database. Statements are then not counted, and the
+server's own payment gateway settings apply.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, AsyncGenerator, Optional
+
+import httpx
+from sqlalchemy import and_, event, func, insert, select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import to_async_url
+from app.core.database import (
+    Base,
+    enable_sqlite_profile,
+    get_db,
+    get_engine_options,
+    get_read_db,
+)
+from app.core.security import create_access_token
+from app.domain.entities.cart_item import CartItem
+from app.domain.entities.order import Order
+from app.domain.entities.order_item import OrderItem
+from app.domain.entities.payment import Payment
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.gateways.payment_gateway import payment_gateway
+from app.main import app
+
+CHECKOUT = {"payment_method": "credit_card"}
+
+
+async def seed(
+    engine: AsyncEngine,
+    args: argparse.Namespace,
+) -> None:
+    """A cart of --items distinct products per user."""
+    rng = random.Random(args.seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Product),
+            [
+                {
+                    "name": f"Product {i}",
+                    "description": f"Benchmark product number {i}",
+                    "price": 10.0 + i % 90,
+                    "stock": args.stock,
+                    "category": f"category-{i % 20}",
+                }
+                for i in range(args.products)
+            ],
+        )
+        await conn.execute(
+            insert(User),
+            [
+                {"email": f"bench{i}@example.com", "hashed_password": "x"}
+                for i in range(args.users)
+            ],
+        )
+        await conn.execute(
+            insert(CartItem),
+            [
+                {
+                    "user_id": user_id,
+                    "product_id": product_id,
+                    "quantity": rng.randint(1, args.max_quantity),
+                }
+                for user_id in range(1, args.users + 1)
+                for product_id in rng.sample(
+                    range(1, args.products + 1),
+                    min(args.items, args.products),
+                )
+            ],
+        )
+
+
+async def client_worker(
+    client: httpx.AsyncClient,
+    user_ids: asyncio.Queue,
+    latencies: list[float],
+    statuses: Counter,
+) -> None:
+    while not user_ids.empty():
+        user_id = user_ids.get_nowait()
+        headers = {
+            "Authorization": f"Bearer {create_access_token(user_id)}"
+        }
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/v1/orders/checkout", json=CHECKOUT, headers=headers
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses[response.status_code] += 1
+
+
+async def check_invariants(
+    session_factory: async_sessionmaker,
+    stock: int,
+) -> dict[str, int]:
+    """Count rows breaking each invariant; all zero on a correct run."""
+    sold = (
+        select(
+            OrderItem.product_id,
+            func.sum(OrderItem.quantity).label("quantity"),
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.status != "cancelled")
+        .group_by(OrderItem.product_id)
+        .subquery()
+    )
+    async with session_factory() as db:
+        negative_stock = await db.scalar(
+            select(func.count()).where(Product.stock < 0)
+        )
+        # Stock taken must equal units in orders that were not cancelled
+        oversold = await db.scalar(
+            select(func.count())
+            .select_from(Product)
+            .outerjoin(sold, sold.c.product_id == Product.id)
+            .where(
+                Product.stock + func.coalesce(sold.c.quantity, 0) != stock
+            )
+        )
+        without_payment = await db.scalar(
+            select(func.count())
+            .select_from(Order)
+            .outerjoin(Payment, Payment.order_id == Order.id)
+            .where(Payment.id.is_(None))
+        )
+        mismatched = await db.scalar(
+            select(func.count())
+            .select_from(Order)
+            .join(Payment, Payment.order_id == Order.id)
+            .where(
+                (Order.status == "pending")
+                | and_(
+                    Order.status == "confirmed",
+                    Payment.status != "completed",
+                )
+                | and_(
+                    Order.status == "cancelled",
+                    Payment.status == "completed",
+                )
+            )
+        )
+    return {
+        "negative stock": negative_stock,
+        "oversold products": oversold,
+        "orders without payment": without_payment,
+        "order/payment status mismatch": mismatched,
+    }
+
+
+def create_engine(args: argparse.Namespace) -> AsyncEngine:
+    url = to_async_url(args.database_url)
+    options = get_engine_options(url)
+    if options:
+        options["pool_size"] = args.clients
+    engine = create_async_engine(url, **options)
+    if url.startswith("sqlite") and args.sqlite_profile:
+        enable_sqlite_profile(engine)
+    return engine
+
+
+def in_process_client(
+    session_factory: async_sessionmaker,
+) -> httpx.AsyncClient:
+    async def bench_db() -> AsyncGenerator[AsyncSession, None]:
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = bench_db
+    app.dependency_overrides[get_read_db] = bench_db
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://benchmark",
+    )
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    engine = create_engine(args)
+    await seed(engine, args)
+    session_factory = async_sessionmaker(
+        bind=engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    statements: Optional[list[int]] = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        payment_gateway.gateway.latency_seconds = args.payment_latency
+        payment_gateway.gateway.failure_rate = args.payment_failure_rate
+        client = in_process_client(session_factory)
+        statements = [0]
+
+        # Counted from here on: only checkout requests run
+        def count(*_: Any) -> None:
+            statements[0] += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    user_ids: asyncio.Queue = asyncio.Queue()
+    for user_id in range(1, args.users + 1):
+        user_ids.put_nowait(user_id)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    async with client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                client_worker(client, user_ids, latencies, statuses)
+                for _ in range(args.clients)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    violations = await check_invariants(session_factory, args.stock)
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "statuses": statuses,
+        "orders_ps": statuses[201] / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "statements": (
+            None if statements is None else statements[0] / len(latencies)
+        ),
+        "violations": violations,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url")
+    parser.add_argument("--base-url")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--max-quantity", type=int, default=3)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--payment-latency", type=float, default=0.05)
+    parser.add_argument("--payment-failure-rate", type=float, default=0.0)
+    parser.add_argument("--sqlite-profile", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url is None:
+            if args.base_url:
+                parser.error("--base-url needs the server's --database-url")
+            args.database_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        result = asyncio.run(run(args))
+
+    statuses = ", ".join(
+        f"{code}: {count}"
+        for code, count in sorted(result["statuses"].items())
+    )
+    statements = result["statements"]
+    print(f"checkouts      {sum(result['statuses'].values())} ({statuses})")
+    print(f"elapsed        {result['elapsed']:.2f}s")
+    print(f"orders/s       {result['orders_ps']:.1f}")
+    print(
+        f"latency ms     p50 {result['p50']:.1f}  "
+        f"p95 {result['p95']:.1f}  p99 {result['p99']:.1f}"
+    )
+    print(
+        "statements     "
+        + ("n/a" if statements is None else f"{statements:.1f} per checkout")
+    )
+    for name, count in result["violations"].items():
+        print(f"{name:<30} {count}")
+    if any(result["violations"].values()):
+        raise SystemExit("invariant violated")
+
+
+if __name__ == "__main__":
+    main()
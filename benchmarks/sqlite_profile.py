@@ -0,0 +1,179 @@
+"""
+Catalog and checkout throughput on SQLite with and without the
+performance profile (see app.core.database.enable_sqlite_profile).
+
+Readers and checkout writers run concurrently against a fresh database
+file for each configuration. The fake payment gateway answers at once
+unless --payment-latency is set, so checkouts/s measures SQLite rather
+than a fixed sleep per order:
+
+    python -m benchmarks.sqlite_profile --seconds 5 --readers 16 --writers 4
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.application.schemas.cart import CartItemCreateSchema
+from app.application.schemas.order import OrderCreateSchema
+from app.application.services.cart_service import CartService
+from app.application.services.checkout_service import CheckoutService
+from app.core.database import (
+    Base,
+    enable_sqlite_profile,
+    get_engine_options,
+)
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.gateways.payment_gateway import payment_gateway
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+
+
+async def seed(engine: AsyncEngine, products: int, users: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Product),
+            [
+                {
+                    "name": f"Product {i}",
+                    "description": f"Benchmark product number {i}",
+                    "price": 10.0 + i % 90,
+                    "stock": 1_000_000,
+                    "category": f"category-{i % 20}",
+                }
+                for i in range(products)
+            ],
+        )
+        await conn.execute(
+            insert(User),
+            [
+                {"email": f"bench{i}@example.com", "hashed_password": "x"}
+                for i in range(users)
+            ],
+        )
+
+
+async def catalog_worker(
+    session_factory: async_sessionmaker,
+    deadline: float,
+    products: int,
+) -> int:
+    requests = 0
+    while time.perf_counter() < deadline:
+        async with session_factory() as db:
+            product_repo = ProductRepository(db)
+            await product_repo.get_by_id(random.randint(1, products))
+            await product_repo.get_all(
+                skip=random.randint(0, max(products - 100, 0)),
+                limit=100,
+            )
+        requests += 2
+    return requests
+
+
+async def checkout_worker(
+    session_factory: async_sessionmaker,
+    deadline: float,
+    user_id: int,
+    products: int,
+) -> tuple[int, int]:
+    orders = 0
+    failures = 0
+    while time.perf_counter() < deadline:
+        async with session_factory() as db:
+            user = await db.get(User, user_id)
+            try:
+                await CartService(db).add_to_cart(
+                    user,
+                    CartItemCreateSchema(
+                        product_id=random.randint(1, products),
+                        quantity=1,
+                    ),
+                )
+                await CheckoutService(db).create_order_from_cart(
+                    user,
+                    OrderCreateSchema(),
+                )
+                orders += 1
+            except HTTPException:
+                # Simulated payment failures still count as load
+                failures += 1
+    return orders, failures
+
+
+async def run(profile: bool, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        options = get_engine_options(url)
+        options["pool_size"] = args.readers + args.writers
+        engine = create_async_engine(url, **options)
+        if profile:
+            enable_sqlite_profile(engine)
+
+        await seed(engine, args.products, args.writers)
+        session_factory = async_sessionmaker(
+            bind=engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+        deadline = time.perf_counter() + args.seconds
+        readers = [
+            catalog_worker(session_factory, deadline, args.products)
+            for _ in range(args.readers)
+        ]
+        writers = [
+            checkout_worker(session_factory, deadline, user_id, args.products)
+            for user_id in range(1, args.writers + 1)
+        ]
+        results = await asyncio.gather(*readers, *writers)
+        await engine.dispose()
+
+    reads = sum(results[: args.readers])
+    checkouts = results[args.readers :]
+    return {
+        "profile": "on" if profile else "off",
+        "catalog_rps": reads / args.seconds,
+        "checkouts_ps": sum(o for o, _ in checkouts) / args.seconds,
+        "failed_ps": sum(f for _, f in checkouts) / args.seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--payment-latency", type=float, default=0.0)
+    args = parser.parse_args()
+    payment_gateway.gateway.latency_seconds = args.payment_latency
+
+    print(
+        f"{'profile':<8} {'catalog/s':>12} "
+        f"{'checkouts/s':>12} {'failed/s':>10}"
+    )
+    for profile in (False, True):
+        result = asyncio.run(run(profile, args))
+        print(
+            f"{result['profile']:<8} {result['catalog_rps']:>12.1f} "
+            f"{result['checkouts_ps']:>12.1f} {result['failed_ps']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
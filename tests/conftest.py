@@ -1,19 +1,33 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db
 from app.core.security import get_password_hash
 from app.domain.entities.user import User
 from app.domain.entities.product import Product
+from app.infrastructure.cache.idempotency_cache import idempotency_cache
+from app.infrastructure.cache.order_cache import order_snapshots
+from app.infrastructure.cache.product_cache import product_cache
+from app.infrastructure.gateways.payment_gateway import (
+    FakePaymentGateway,
+    payment_gateway,
+)
+from app.infrastructure.search.autocomplete import autocomplete_index
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+SQLALCHEMY_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
+# Fixtures seed data through a sync engine, the app under test reads it
+# back through its own AsyncEngine on the same database file
 engine: Engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
@@ -21,9 +35,37 @@ engine: Engine = create_engine(
 TestingSessionLocal: sessionmaker[Session] = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine,
 )
 
+# TestClient runs the app on its own event loop, so async connections
+# must not be pooled across tests
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    poolclass=NullPool,
+)
+TestingAsyncSessionLocal: async_sessionmaker[AsyncSession] = (
+    async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+)
+
+
+@pytest.fixture(autouse=True)
+def fake_payments(monkeypatch: pytest.MonkeyPatch) -> FakePaymentGateway:
+    """
+    Instant, always approved payments; a test sets `failure_rate` or
+    `latency_seconds` on the returned gateway to change that.
+    """
+    fake = payment_gateway.gateway
+    monkeypatch.setattr(fake, "latency_seconds", 0.0)
+    monkeypatch.setattr(fake, "failure_rate", 0.0)
+    payment_gateway.breaker.reset()
+    return fake
+
 
 @pytest.fixture(scope="session")
 def db_engine() -> Generator:
@@ -34,21 +76,29 @@ def db_engine() -> Generator:
 
 @pytest.fixture
 def db_session(db_engine: Engine) -> Generator:
-    connection = db_engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    session = TestingSessionLocal()
     yield session
     session.close()
-    transaction.rollback()
-    connection.close()
+    product_cache.local.clear()
+    idempotency_cache.clear()
+    order_snapshots.clear()
+    autocomplete_index.clear()
+
+    # Requests commit through their own connections, so isolation is
+    # restored by emptying every table rather than a rollback
+    with db_engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
 
 
 @pytest.fixture
 def client(db_session: Session) -> Generator:
-    def _get_test_db() -> Generator:
-        yield db_session
+    async def _get_test_db() -> AsyncGenerator:
+        async with TestingAsyncSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = _get_test_db
+    app.dependency_overrides[get_read_db] = _get_test_db
     with TestClient(app) as c:
         yield c
 
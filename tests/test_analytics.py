@@ -0,0 +1,192 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.application.services.analytics_service import AnalyticsService
+from app.application.services.outbox_service import OutboxService
+from app.domain.entities.order import Order
+from app.domain.entities.order_item import OrderItem
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from tests.conftest import TestingAsyncSessionLocal
+
+RANGE = {"start": "2024-03-01", "end": "2024-03-31"}
+
+
+def _seed_history(db_session, user: User) -> None:
+    lamp = Product(name="Lamp", price=20.0, stock=10, category="home")
+    mug = Product(name="Mug", price=5.0, stock=10, category="home")
+    pen = Product(name="Pen", price=2.0, stock=10)
+    db_session.add_all([lamp, mug, pen])
+    db_session.flush()
+    # (day, status, [(product, quantity)])
+    history = [
+        (1, "confirmed", [(lamp, 1), (mug, 2)]),
+        (1, "confirmed", [(mug, 1)]),
+        (2, "confirmed", [(pen, 5), (lamp, 2)]),
+        (2, "cancelled", [(lamp, 9)]),
+        (3, "pending", [(mug, 9)]),
+    ]
+    for day, status, lines in history:
+        order = Order(
+            user_id=user.id,
+            total_price=sum(p.price * q for p, q in lines),
+            status=status,
+            created_at=datetime(2024, 3, day, 12),
+        )
+        db_session.add(order)
+        db_session.flush()
+        db_session.add_all(
+            OrderItem(
+                order_id=order.id,
+                product_id=product.id,
+                quantity=quantity,
+                price=product.price,
+                category=product.category,
+            )
+            for product, quantity in lines
+        )
+    db_session.commit()
+
+
+async def _backfill(chunk_size: int) -> int:
+    async with TestingAsyncSessionLocal() as session:
+        return await AnalyticsService(session).backfill(chunk_size)
+
+
+def test_backfill_answers_reports_from_rollups(
+    client: TestClient,
+    db_session,
+    test_user: User,
+    admin_auth_headers,
+) -> None:
+    _seed_history(db_session, test_user)
+
+    assert client.portal.call(_backfill, 2) == 3
+    # Safe to repeat: every order is already counted
+    assert client.portal.call(_backfill, 2) == 0
+
+    def get(path: str, **params):
+        response = client.get(
+            f"/api/v1/analytics/{path}",
+            params={**RANGE, **params},
+            headers=admin_auth_headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    assert get("sales") == [
+        {"day": "2024-03-01", "orders": 2, "units": 4, "revenue": 35.0},
+        {"day": "2024-03-02", "orders": 1, "units": 7, "revenue": 50.0},
+    ]
+    assert get("sales", start="2024-03-02") == get("sales")[1:]
+    assert get("sales/categories") == [
+        {"category": "home", "orders": 3, "units": 6, "revenue": 75.0},
+        {"category": None, "orders": 1, "units": 5, "revenue": 10.0},
+    ]
+    products = get("sales/products", limit=2)
+    assert [(p["name"], p["units"], p["revenue"]) for p in products] == [
+        ("Lamp", 3, 60.0),
+        ("Mug", 3, 15.0),
+    ]
+
+
+def test_rollups_keep_the_category_lines_were_sold_under(
+    client: TestClient,
+    db_session,
+    test_user: User,
+    admin_auth_headers,
+) -> None:
+    _seed_history(db_session, test_user)
+    # After the sales: the lamp is moved, the pen deleted
+    lamp = db_session.query(Product).filter_by(name="Lamp").one()
+    lamp.category = "lighting"
+    db_session.execute(delete(Product).where(Product.name == "Pen"))
+    db_session.commit()
+
+    client.portal.call(_backfill, 100)
+
+    response = client.get(
+        "/api/v1/analytics/sales/categories",
+        params=RANGE,
+        headers=admin_auth_headers,
+    )
+    assert response.json() == [
+        {"category": "home", "orders": 3, "units": 6, "revenue": 75.0},
+        {"category": None, "orders": 1, "units": 5, "revenue": 10.0},
+    ]
+    response = client.get(
+        "/api/v1/analytics/sales",
+        params=RANGE,
+        headers=admin_auth_headers,
+    )
+    assert [day["revenue"] for day in response.json()] == [35.0, 50.0]
+
+
+def test_checkout_reaches_rollups_through_the_outbox(
+    client: TestClient,
+    test_product: Product,
+    auth_headers,
+    admin_auth_headers,
+) -> None:
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": test_product.id, "quantity": 3},
+        headers=auth_headers,
+    )
+    order = client.post(
+        "/api/v1/orders/checkout",
+        json={"payment_method": "credit_card"},
+        headers=auth_headers,
+    ).json()
+
+    async def drain() -> int:
+        async with TestingAsyncSessionLocal() as session:
+            return await OutboxService(session).drain(100)
+
+    assert client.portal.call(drain) == 1
+    # A backfill afterwards does not count the order twice
+    assert client.portal.call(_backfill, 100) == 0
+
+    day = order["created_at"][:10]
+    response = client.get(
+        "/api/v1/analytics/sales",
+        params={"start": day, "end": day},
+        headers=admin_auth_headers,
+    )
+    assert response.json() == [
+        {
+            "day": day,
+            "orders": 1,
+            "units": 3,
+            "revenue": test_product.price * 3,
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    "headers, params, expected",
+    [
+        ("auth_headers", RANGE, 403),
+        (
+            "admin_auth_headers",
+            {"start": "2024-03-02", "end": "2024-03-01"},
+            400,
+        ),
+    ],
+)
+def test_sales_report_access_and_range(
+    client: TestClient,
+    request,
+    headers: str,
+    params: dict,
+    expected: int,
+) -> None:
+    response = client.get(
+        "/api/v1/analytics/sales",
+        params=params,
+        headers=request.getfixturevalue(headers),
+    )
+    assert response.status_code == expected
@@ -0,0 +1,141 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.entities.order import Order
+from app.domain.entities.order_item import OrderItem
+from app.domain.entities.product import Product
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from app.infrastructure.search import autocomplete
+from app.infrastructure.search.autocomplete import (
+    PrefixIndex,
+    autocomplete_index,
+    normalize,
+)
+from tests.conftest import TestingAsyncSessionLocal
+
+
+def _names(suggestions) -> list[str]:
+    return [suggestion.name for suggestion in suggestions]
+
+
+def test_normalize_folds_case_accents_and_punctuation() -> None:
+    assert normalize("  Crème-Brûlée  TORCH! ") == "creme brulee torch"
+
+
+def test_matches_any_word_start_ranked_by_popularity() -> None:
+    index = PrefixIndex()
+    index.build(
+        [(1, "Denim Jacket"), (2, "Denim Shorts"), (3, "Leather Jacket")],
+        {2: 5, 3: 9},
+    )
+
+    assert _names(index.search("den")) == ["Denim Shorts", "Denim Jacket"]
+    assert _names(index.search("JACK")) == ["Leather Jacket", "Denim Jacket"]
+    assert _names(index.search("denim j")) == ["Denim Jacket"]
+    assert index.search("xyz") == []
+    assert index.search("  ") == []
+
+
+def test_incremental_updates_reach_cached_short_prefixes() -> None:
+    index = PrefixIndex()
+    index.build([(1, "Denim Jacket"), (2, "Desk Lamp")], {})
+    assert _names(index.search("d", limit=1)) == ["Denim Jacket"]
+
+    index.add_popularity(2, 3)
+    assert _names(index.search("d", limit=1)) == ["Desk Lamp"]
+
+    index.upsert(2, "Floor Lamp")
+    assert _names(index.search("d")) == ["Denim Jacket"]
+    assert _names(index.search("f")) == ["Floor Lamp"]
+
+    index.remove(1)
+    assert index.search("d") == []
+    assert len(index) == 1
+
+
+def test_removal_from_a_full_list_keeps_ranking_exact(monkeypatch):
+    monkeypatch.setattr(autocomplete, "MAX_SUGGESTIONS", 2)
+    index = PrefixIndex()
+    index.build(
+        [(1, "Lamp A"), (2, "Lamp B"), (3, "Lamp C"), (4, "Lamp D")],
+        {1: 9, 2: 8, 3: 7, 4: 1},
+    )
+    assert _names(index.search("la")) == ["Lamp A", "Lamp B"]
+
+    index.remove(1)
+    assert _names(index.search("la")) == ["Lamp B"]
+    # Only a product known to outrank the list may join it
+    index.add_popularity(4, 1)
+    assert _names(index.search("la")) == ["Lamp B"]
+    index.add_popularity(4, 10)
+    assert _names(index.search("la")) == ["Lamp D", "Lamp B"]
+    assert _names(index.search("lamp c")) == ["Lamp C"]
+
+
+def test_autocomplete_follows_product_writes(
+    client: TestClient,
+    admin_auth_headers,
+):
+    response = client.post(
+        "/api/v1/products/",
+        json={"name": "Wool Scarf", "price": 20.0},
+        headers=admin_auth_headers,
+    )
+    product_id = response.json()["id"]
+
+    response = client.get("/api/v1/products/autocomplete?q=sca")
+    assert response.json() == [{"id": product_id, "name": "Wool Scarf"}]
+
+    client.put(
+        f"/api/v1/products/{product_id}",
+        json={"name": "Wool Beanie"},
+        headers=admin_auth_headers,
+    )
+    assert client.get("/api/v1/products/autocomplete?q=sca").json() == []
+
+    client.delete(
+        f"/api/v1/products/{product_id}", headers=admin_auth_headers
+    )
+    assert client.get("/api/v1/products/autocomplete?q=wool").json() == []
+    response = client.get("/api/v1/products/autocomplete?q=")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_rebuild_ranks_by_confirmed_sales(db_session, test_user):
+    hoodie = Product(name="Hoodie", price=30.0)
+    hat = Product(name="Hat", price=10.0)
+    db_session.add_all([hoodie, hat])
+    db_session.flush()
+    confirmed = Order(user_id=test_user.id, total_price=1, status="confirmed")
+    cancelled = Order(user_id=test_user.id, total_price=1, status="cancelled")
+    db_session.add_all([confirmed, cancelled])
+    db_session.flush()
+    db_session.add_all(
+        [
+            OrderItem(
+                order_id=confirmed.id,
+                product_id=hat.id,
+                quantity=2,
+                price=10.0,
+            ),
+            OrderItem(
+                order_id=cancelled.id,
+                product_id=hoodie.id,
+                quantity=9,
+                price=30.0,
+            ),
+        ]
+    )
+    db_session.commit()
+
+    async with TestingAsyncSessionLocal() as db:
+        await ProductRepository(db).rebuild_autocomplete()
+
+    suggestions = autocomplete_index.search("h")
+    assert [(s.name, s.popularity) for s in suggestions] == [
+        ("Hat", 2),
+        ("Hoodie", 0),
+    ]
@@ -1,5 +1,14 @@
+import asyncio
+
+import pytest
 from fastapi.testclient import TestClient
 
+from app.application.schemas.cart import CartItemCreateSchema
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.repositories.cart_repository import CartRepository
+from tests.conftest import TestingAsyncSessionLocal
+
 
 def test_get_empty_cart(client: TestClient, auth_headers):
     response = client.get("/api/v1/cart/", headers=auth_headers)
@@ -33,6 +42,26 @@ def test_add_to_cart_insufficient_stock(client: TestClient, test_product, auth_h
     assert "Insufficient stock" in response.json()["detail"]
 
 
+def test_add_to_cart_checks_current_stock(
+    client: TestClient,
+    db_session,
+    test_product,
+    auth_headers,
+):
+    # Cache the product, then sell it out behind the cache's back
+    client.get(f"/api/v1/products/{test_product.id}")
+    test_product.stock = 0
+    db_session.commit()
+
+    response = client.post(
+        "/api/v1/cart/items",
+        json={"product_id": test_product.id, "quantity": 1},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    assert "Insufficient stock" in response.json()["detail"]
+
+
 def test_get_cart_with_items(client: TestClient, test_product, auth_headers):
     # Add item to cart
     cart_item_data = {"product_id": test_product.id, "quantity": 2}
@@ -90,3 +119,25 @@ def test_clear_cart(client: TestClient, test_product, auth_headers):
     # Verify cart is empty
     cart_response = client.get("/api/v1/cart/", headers=auth_headers)
     assert len(cart_response.json()["items"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_adds_of_one_product_are_summed(
+    db_session,
+    test_user: User,
+    test_product: Product,
+) -> None:
+    async def add(quantity: int) -> None:
+        async with TestingAsyncSessionLocal() as session:
+            await CartRepository(session).add_item(
+                test_user.id,
+                CartItemCreateSchema(
+                    product_id=test_product.id, quantity=quantity
+                ),
+            )
+
+    await asyncio.gather(*(add(quantity) for quantity in (1, 2, 3)))
+
+    async with TestingAsyncSessionLocal() as session:
+        items = await CartRepository(session).get_user_cart(test_user.id)
+    assert [item.quantity for item in items] == [6]
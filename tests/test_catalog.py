@@ -0,0 +1,114 @@
+from fastapi.testclient import TestClient
+
+from app.domain.entities.product import Product
+from app.infrastructure.repositories import product_repository
+
+
+def _seed(db_session) -> list[Product]:
+    products = [
+        Product(
+            name=f"{'Denim' if i % 2 else 'Linen'} Shirt {i}",
+            price=float(10 * i),
+            stock=0 if i % 3 == 0 else 5,
+            category="shirts" if i < 8 else "hats",
+        )
+        for i in range(1, 11)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    return products
+
+
+def test_filters_compose(client: TestClient, db_session):
+    _seed(db_session)
+
+    response = client.get(
+        "/api/v2/products/",
+        params={
+            "category": "shirts",
+            "search": "denim",
+            "min_price": 20,
+            "max_price": 70,
+            "in_stock": True,
+            "sort": "price",
+            "order": "desc",
+            "total": "exact",
+        },
+    )
+
+    assert response.status_code == 200
+    page = response.json()
+    # Denim (odd), shirts (< 8), 20-70, in stock (not a multiple of 3)
+    assert [p["price"] for p in page["items"]] == [70.0, 50.0]
+    assert (page["total"], page["total_is_estimate"]) == (2, False)
+    assert page["next_cursor"] is None
+
+
+def test_cursor_pages_through_a_filtered_listing(
+    client: TestClient,
+    db_session,
+):
+    _seed(db_session)
+    params = {"category": "shirts", "sort": "price", "limit": 3}
+
+    first = client.get("/api/v2/products/", params=params).json()
+    second = client.get(
+        "/api/v2/products/",
+        params={**params, "cursor": first["next_cursor"]},
+    ).json()
+    third = client.get(
+        "/api/v2/products/",
+        params={**params, "cursor": second["next_cursor"]},
+    ).json()
+
+    prices = [p["price"] for p in first["items"] + second["items"]]
+    prices += [p["price"] for p in third["items"]]
+    assert prices == [10.0 * i for i in range(1, 8)]
+    assert third["next_cursor"] is None
+    assert first["total"] == 7
+
+
+def test_estimated_total_is_capped(
+    client: TestClient,
+    db_session,
+    monkeypatch,
+):
+    _seed(db_session)
+    monkeypatch.setattr(product_repository, "COUNT_ESTIMATE_CAP", 4)
+
+    page = client.get("/api/v2/products/", params={"limit": 1}).json()
+    assert (page["total"], page["total_is_estimate"]) == (4, True)
+
+    page = client.get(
+        "/api/v2/products/", params={"category": "hats", "limit": 1}
+    ).json()
+    assert (page["total"], page["total_is_estimate"]) == (3, False)
+
+    page = client.get("/api/v2/products/", params={"total": "none"}).json()
+    assert page["total"] is None
+
+
+def test_search_defaults_to_relevance(client: TestClient, db_session):
+    _seed(db_session)
+
+    page = client.get(
+        "/api/v2/products/", params={"search": "linen", "limit": 2}
+    ).json()
+    assert len(page["items"]) == 2
+    assert page["next_cursor"] is None
+
+    response = client.get(
+        "/api/v2/products/",
+        params={"search": "linen", "cursor": "abc", "sort": "relevance"},
+    )
+    assert response.status_code == 400
+
+
+def test_v1_category_listing_is_paginated(client: TestClient, db_session):
+    _seed(db_session)
+
+    response = client.get(
+        "/api/v1/products/", params={"category": "shirts", "limit": 5}
+    )
+    assert len(response.json()) == 5
+    assert "X-Next-Cursor" in response.headers
@@ -1,6 +1,18 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from sqlalchemy import event, select
 
+from app.application.schemas.order import OrderCreateSchema
+from app.application.services.checkout_service import CheckoutService
+from app.domain.entities.cart_item import CartItem
+from app.domain.entities.order import Order
 from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.repositories.order_repository import OrderRepository
+from tests.conftest import TestingAsyncSessionLocal
 
 
 def test_checkout_success(client: TestClient, test_product, auth_headers):
@@ -86,3 +98,92 @@ def test_get_order_by_id(
 def test_get_nonexistent_order(client: TestClient, auth_headers: dict) -> None:
     response = client.get("/api/v1/orders/999", headers=auth_headers)
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checkouts_never_oversell(
+    db_session,
+    test_product: Product,
+) -> None:
+    buyers = 8
+    users = [
+        User(email=f"buyer{i}@example.com", hashed_password="x")
+        for i in range(buyers)
+    ]
+    db_session.add_all(users)
+    db_session.flush()
+    db_session.add_all(
+        CartItem(user_id=user.id, product_id=test_product.id, quantity=3)
+        for user in users
+    )
+    db_session.commit()
+
+    async def checkout(user: User) -> bool:
+        async with TestingAsyncSessionLocal() as session:
+            try:
+                await CheckoutService(session).create_order_from_cart(
+                    user,
+                    OrderCreateSchema(payment_method="credit_card"),
+                )
+            except HTTPException as e:
+                assert "Insufficient stock" in e.detail
+                return False
+            return True
+
+    results = await asyncio.gather(*(checkout(user) for user in users))
+
+    # 10 in stock, 3 per order
+    assert results.count(True) == 3
+    db_session.expire_all()
+    assert db_session.get(Product, test_product.id).stock == 1
+    orders = db_session.scalars(select(Order)).all()
+    assert len(orders) == 3
+    assert all(order.status == "confirmed" for order in orders)
+
+
+@pytest.mark.asyncio
+async def test_large_order_is_written_in_three_statements(
+    db_session,
+    test_user: User,
+) -> None:
+    products = [
+        Product(
+            name=f"Part {i}",
+            description="B2B line",
+            price=1.0 + i,
+            stock=5,
+            category="parts",
+        )
+        for i in range(300)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    items = [
+        {"product_id": product.id, "quantity": 2, "price": product.price}
+        for product in products
+    ]
+
+    statements = []
+    async with TestingAsyncSessionLocal() as session:
+        engine = session.bind.sync_engine
+
+        def record(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            order, payment = await OrderRepository(session).create(
+                test_user.id, 1234.0, items, "credit_card"
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        await session.commit()
+
+        assert len(statements) == 3
+        assert (order.status, payment.status) == ("pending", "pending")
+        assert payment.order_id == order.id
+        stored = await OrderRepository(session).get_by_id(order.id)
+        assert len(stored.order_items) == 300
+        assert {item.product_id for item in stored.order_items} == {
+            product.id for product in products
+        }
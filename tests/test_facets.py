@@ -0,0 +1,147 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.domain.entities.category_facet import CategoryFacet
+from app.domain.entities.product import Product
+from app.infrastructure.repositories.facet_repository import FacetRepository
+from tests.conftest import TestingAsyncSessionLocal
+
+
+def _facets(client: TestClient) -> dict[str, dict]:
+    response = client.get("/api/v1/products/facets")
+    assert response.status_code == 200
+    return {facet.pop("category"): facet for facet in response.json()}
+
+
+def _create(client: TestClient, headers: dict, **fields) -> int:
+    response = client.post(
+        "/api/v1/products/",
+        json={"name": "Item", **fields},
+        headers=headers,
+    )
+    return response.json()["id"]
+
+
+def test_facets_follow_product_writes(client: TestClient, admin_auth_headers):
+    cheap = _create(
+        client, admin_auth_headers, price=5.0, stock=0, category="hats"
+    )
+    _create(client, admin_auth_headers, price=15.0, stock=2, category="hats")
+    _create(client, admin_auth_headers, price=40.0, stock=1, category="shoes")
+
+    assert _facets(client) == {
+        "hats": {
+            "product_count": 2,
+            "in_stock_count": 1,
+            "min_price": 5.0,
+            "max_price": 15.0,
+        },
+        "shoes": {
+            "product_count": 1,
+            "in_stock_count": 1,
+            "min_price": 40.0,
+            "max_price": 40.0,
+        },
+    }
+
+    # Moving the cheapest hat out of the category drops the minimum
+    client.put(
+        f"/api/v1/products/{cheap}",
+        json={"category": "shoes", "stock": 3},
+        headers=admin_auth_headers,
+    )
+    facets = _facets(client)
+    assert facets["hats"]["min_price"] == 15.0
+    assert facets["shoes"] == {
+        "product_count": 2,
+        "in_stock_count": 2,
+        "min_price": 5.0,
+        "max_price": 40.0,
+    }
+
+    client.delete(f"/api/v1/products/{cheap}", headers=admin_auth_headers)
+    assert _facets(client)["shoes"]["product_count"] == 1
+
+
+def test_checkout_updates_in_stock_count(
+    client: TestClient,
+    auth_headers,
+    admin_auth_headers,
+):
+    product_id = _create(
+        client, admin_auth_headers, price=10.0, stock=2, category="mugs"
+    )
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": product_id, "quantity": 2},
+        headers=auth_headers,
+    )
+
+    response = client.post(
+        "/api/v1/orders/checkout",
+        json={"payment_method": "credit_card"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 201
+    assert _facets(client)["mugs"]["in_stock_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rebuild_recounts_from_products(db_session) -> None:
+    db_session.add_all(
+        [
+            Product(name="A", price=3.0, stock=1, category="cups"),
+            Product(name="B", price=9.0, stock=0, category="cups"),
+            Product(name="C", price=1.0),
+        ]
+    )
+    db_session.commit()
+
+    async with TestingAsyncSessionLocal() as db:
+        await db.execute(delete(CategoryFacet))
+        facet_repo = FacetRepository(db)
+        await facet_repo.rebuild()
+        facets = await facet_repo.get_all()
+
+    assert [
+        (f.category, f.product_count, f.in_stock_count, f.max_price)
+        for f in facets
+    ] == [("cups", 2, 1, 9.0)]
+
+
+@pytest.mark.asyncio
+async def test_product_write_during_rebuild(db_session, monkeypatch) -> None:
+    db_session.add_all(
+        [
+            Product(name="A", price=3.0, stock=1, category="cups"),
+            # Left behind by a category that has no products any more
+            CategoryFacet(category="gone", product_count=1),
+        ]
+    )
+    db_session.commit()
+
+    async with TestingAsyncSessionLocal() as db:
+        facet_repo = FacetRepository(db)
+        execute = db.execute
+        interleaved = []
+
+        async def execute_then_write(*args, **kwargs):
+            result = await execute(*args, **kwargs)
+            if not interleaved:
+                # A product create lands after the rebuild's first step;
+                # SQLite serializes writers, so it runs in this session
+                interleaved.append(True)
+                db.add(Product(name="C", price=5.0, stock=2, category="cups"))
+                await facet_repo.apply([(None, ("cups", 5.0, True))])
+            return result
+
+        monkeypatch.setattr(db, "execute", execute_then_write)
+        await facet_repo.rebuild()
+        facets = await facet_repo.get_all()
+
+    assert [
+        (f.category, f.product_count, f.in_stock_count, f.min_price)
+        for f in facets
+    ] == [("cups", 2, 2, 3.0)]
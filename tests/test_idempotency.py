@@ -0,0 +1,242 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.application.services.idempotency_service import IdempotencyService
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.domain.entities.idempotency_key import IdempotencyKey
+from app.domain.entities.order import Order
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.cache.idempotency_cache import idempotency_cache
+from app.infrastructure.gateways.payment_gateway import payment_gateway
+from tests.conftest import TestingAsyncSessionLocal
+
+CHECKOUT = {"payment_method": "credit_card"}
+
+
+def _checkout(client: TestClient, headers: dict, key: str, body=CHECKOUT):
+    return client.post(
+        "/api/v1/orders/checkout",
+        json=body,
+        headers={**headers, "Idempotency-Key": key},
+    )
+
+
+def _add_to_cart(client: TestClient, headers: dict, product_id: int, **kw):
+    return client.post(
+        "/api/v1/cart/items",
+        json={"product_id": product_id, "quantity": 2},
+        headers={**headers, **kw},
+    )
+
+
+def test_checkout_retry_replays_the_order(
+    client: TestClient,
+    db_session,
+    test_product: Product,
+    auth_headers,
+):
+    _add_to_cart(client, auth_headers, test_product.id)
+
+    first = _checkout(client, auth_headers, "order-1")
+    # A retry after the cache is gone (another worker) reads the table
+    idempotency_cache.clear()
+    retry = _checkout(client, auth_headers, "order-1")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert "idempotent-replayed" not in first.headers
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert len(db_session.scalars(select(Order)).all()) == 1
+    db_session.expire_all()
+    assert db_session.get(Product, test_product.id).stock == 8
+
+    # The key is bound to its request
+    response = _checkout(
+        client, auth_headers, "order-1", {"payment_method": "paypal"}
+    )
+    assert response.status_code == 422
+
+
+def test_cart_add_retry_does_not_add_twice(
+    client: TestClient,
+    test_product: Product,
+    auth_headers,
+):
+    for _ in range(2):
+        response = _add_to_cart(
+            client, auth_headers, test_product.id, **{"Idempotency-Key": "a"}
+        )
+        assert response.status_code == 201
+
+    cart = client.get("/api/v1/cart/", headers=auth_headers).json()
+    assert cart["total_items"] == 2
+
+    for _ in range(2):
+        response = client.delete(
+            "/api/v1/cart/",
+            headers={**auth_headers, "Idempotency-Key": "clear"},
+        )
+        assert response.status_code == 204
+        assert response.content == b""
+
+
+def test_client_errors_are_stored_server_errors_are_not(
+    client: TestClient,
+    test_product: Product,
+    auth_headers,
+    fake_payments,
+    monkeypatch,
+):
+    # Stored: the retry is answered with the same 400
+    assert _checkout(client, auth_headers, "empty").status_code == 400
+    _add_to_cart(client, auth_headers, test_product.id)
+    response = _checkout(client, auth_headers, "empty")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Cart is empty"}
+
+    # Released: a retry after a gateway timeout runs again
+    fake_payments.latency_seconds = 1.0
+    monkeypatch.setattr(payment_gateway, "timeout_seconds", 0.01)
+    assert _checkout(client, auth_headers, "retry").status_code == 503
+    fake_payments.latency_seconds = 0.0
+    assert _checkout(client, auth_headers, "retry").status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_waits_for_the_original(
+    db_session,
+    test_user: User,
+) -> None:
+    calls = 0
+
+    async def handler():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return 201, json.dumps({"id": calls})
+
+    async def run():
+        async with TestingAsyncSessionLocal() as session:
+            return await IdempotencyService(session).run(
+                test_user.id, "dup", "fingerprint", handler
+            )
+
+    results = await asyncio.gather(run(), run(), run())
+
+    assert calls == 1
+    assert {stored for stored, _ in results} == {
+        ("fingerprint", 201, '{"id": 1}')
+    }
+    assert sorted(replayed for _, replayed in results) == [
+        False,
+        True,
+        True,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_of_a_request_running_elsewhere(
+    db_session,
+    test_user: User,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(settings, "idempotency_wait_seconds", 0.1)
+
+    async def handler():
+        raise AssertionError("duplicate must not run")
+
+    async with TestingAsyncSessionLocal() as session:
+        idempotency_service = IdempotencyService(session)
+        # Claimed by another process that has not finished yet
+        now = utcnow()
+        assert await idempotency_service.idempotency_repo.claim(
+            test_user.id,
+            "elsewhere",
+            "fingerprint",
+            now,
+            now + timedelta(hours=1),
+        )
+
+        with pytest.raises(HTTPException) as e:
+            await idempotency_service.run(
+                test_user.id, "elsewhere", "fingerprint", handler
+            )
+        assert e.value.status_code == 409
+
+        await idempotency_service.idempotency_repo.complete(
+            test_user.id, "elsewhere", 201, "{}", now + timedelta(hours=1)
+        )
+        stored, replayed = await idempotency_service.run(
+            test_user.id, "elsewhere", "fingerprint", handler
+        )
+        assert (stored.status_code, replayed) == (201, True)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_claim_is_a_short_lease(
+    db_session,
+    test_user: User,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(settings, "idempotency_lease_seconds", 30.0)
+
+    async def expires_in() -> float:
+        async with TestingAsyncSessionLocal() as session:
+            expires_at = await session.scalar(
+                select(IdempotencyKey.expires_at)
+            )
+        return (expires_at - utcnow()).total_seconds()
+
+    leases = []
+
+    async def handler():
+        leases.append(await expires_in())
+        return 201, "{}"
+
+    async with TestingAsyncSessionLocal() as session:
+        await IdempotencyService(session).run(
+            test_user.id, "lease", "fingerprint", handler
+        )
+
+    assert 25 < leases[0] <= 30
+    assert await expires_in() > settings.idempotency_ttl_seconds - 5
+
+
+@pytest.mark.asyncio
+async def test_retryable_client_error_is_not_stored(
+    db_session,
+    test_user: User,
+) -> None:
+    calls = 0
+
+    async def handler():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise HTTPException(
+                status_code=409,
+                detail="Inventory reservation expired, please retry",
+                headers={"Retry-After": "1"},
+            )
+        return 201, "{}"
+
+    async with TestingAsyncSessionLocal() as session:
+        idempotency_service = IdempotencyService(session)
+        with pytest.raises(HTTPException) as e:
+            await idempotency_service.run(
+                test_user.id, "retry", "fingerprint", handler
+            )
+        assert e.value.status_code == 409
+
+        stored, replayed = await idempotency_service.run(
+            test_user.id, "retry", "fingerprint", handler
+        )
+    assert (stored.status_code, replayed, calls) == (201, False, 2)
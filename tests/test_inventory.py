@@ -0,0 +1,225 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.application.schemas.inventory import InventoryUpdateSchema
+from app.application.schemas.order import OrderCreateSchema
+from app.application.services.checkout_service import CheckoutService
+from app.application.services.inventory_service import InventoryService
+from app.core.clock import utcnow
+from app.domain.entities.cart_item import CartItem
+from app.domain.entities.inventory_hold import InventoryHold
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.repositories.inventory_repository import split_stock
+from tests.conftest import TestingAsyncSessionLocal
+
+CHECKOUT = {"payment_method": "credit_card"}
+
+
+def _set_inventory(
+    client: TestClient,
+    headers: dict,
+    product_id: int,
+    **body,
+):
+    return client.put(
+        f"/api/v1/products/{product_id}/inventory",
+        json=body,
+        headers=headers,
+    )
+
+
+async def _maintain() -> tuple[int, int]:
+    async with TestingAsyncSessionLocal() as session:
+        inventory_service = InventoryService(session)
+        released = await inventory_service.release_expired()
+        return released, await inventory_service.reconcile()
+
+
+def test_split_stock() -> None:
+    assert split_stock(10, 4) == [3, 3, 2, 2]
+    assert split_stock(2, 4) == [1, 1, 0, 0]
+
+
+def test_set_inventory_splits_stock(
+    client: TestClient,
+    test_product: Product,
+    auth_headers,
+    admin_auth_headers,
+):
+    path = f"/api/v1/products/{test_product.id}/inventory"
+    assert client.get(path, headers=auth_headers).status_code == 403
+
+    response = _set_inventory(
+        client, admin_auth_headers, test_product.id, stock=10, buckets=4
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "product_id": test_product.id,
+        "available": 10,
+        "held": 0,
+        "buckets": [3, 3, 2, 2],
+    }
+    # Stock of a bucketed product is only set through its inventory
+    response = client.put(
+        f"/api/v1/products/{test_product.id}",
+        json={"stock": 5},
+        headers=admin_auth_headers,
+    )
+    assert response.status_code == 409
+
+    response = _set_inventory(
+        client, admin_auth_headers, test_product.id, stock=7, buckets=0
+    )
+    assert response.json()["buckets"] == []
+    assert client.get(f"/api/v1/products/{test_product.id}").json()[
+        "stock"
+    ] == 7
+
+
+def test_checkout_consumes_reservation(
+    client: TestClient,
+    test_product: Product,
+    auth_headers,
+    admin_auth_headers,
+):
+    _set_inventory(
+        client, admin_auth_headers, test_product.id, stock=10, buckets=4
+    )
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": test_product.id, "quantity": 4},
+        headers=auth_headers,
+    )
+
+    response = client.post(
+        "/api/v1/orders/checkout", json=CHECKOUT, headers=auth_headers
+    )
+
+    assert response.status_code == 201
+    inventory = client.get(
+        f"/api/v1/products/{test_product.id}/inventory",
+        headers=admin_auth_headers,
+    ).json()
+    assert (inventory["available"], inventory["held"]) == (6, 0)
+
+    # Product.stock catches up on reconciliation
+    assert asyncio.run(_maintain()) == (0, 1)
+    product = client.get(f"/api/v1/products/{test_product.id}").json()
+    assert product["stock"] == 6
+
+
+def test_failed_payment_releases_reservation(
+    client: TestClient,
+    test_product: Product,
+    auth_headers,
+    admin_auth_headers,
+    fake_payments,
+):
+    _set_inventory(
+        client, admin_auth_headers, test_product.id, stock=10, buckets=4
+    )
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": test_product.id, "quantity": 4},
+        headers=auth_headers,
+    )
+    fake_payments.failure_rate = 1.0
+
+    response = client.post(
+        "/api/v1/orders/checkout", json=CHECKOUT, headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    inventory = client.get(
+        f"/api/v1/products/{test_product.id}/inventory",
+        headers=admin_auth_headers,
+    ).json()
+    assert inventory["available"] == 10
+    assert inventory["held"] == 0
+    assert sum(inventory["buckets"]) == 10
+
+
+@pytest.mark.asyncio
+async def test_expired_holds_are_released(
+    db_session,
+    test_user: User,
+    test_product: Product,
+) -> None:
+    async with TestingAsyncSessionLocal() as session:
+        inventory_service = InventoryService(session)
+        product = await session.get(Product, test_product.id)
+        await inventory_service.set_inventory(
+            product, InventoryUpdateSchema(stock=10, buckets=2)
+        )
+        reservation = await inventory_service.reserve(
+            test_user.id, [(product, 3)]
+        )
+        assert (await inventory_service.get_inventory(product)).held == 3
+
+        # Nothing is due yet
+        assert await inventory_service.release_expired() == 0
+        await session.execute(
+            update(InventoryHold).values(
+                expires_at=utcnow() - timedelta(seconds=1)
+            )
+        )
+        await session.commit()
+
+        assert await inventory_service.release_expired() > 0
+        inventory = await inventory_service.get_inventory(product)
+        assert (inventory.available, inventory.held) == (10, 0)
+        # A hold is given back once, even if checkout gets to it later
+        assert not await inventory_service.consume(reservation, 3)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reservations_never_oversell(
+    db_session,
+    test_product: Product,
+) -> None:
+    async with TestingAsyncSessionLocal() as session:
+        product = await session.get(Product, test_product.id)
+        await InventoryService(session).set_inventory(
+            product, InventoryUpdateSchema(stock=10, buckets=4)
+        )
+
+    buyers = 8
+    users = [
+        User(email=f"buyer{i}@example.com", hashed_password="x")
+        for i in range(buyers)
+    ]
+    db_session.add_all(users)
+    db_session.flush()
+    db_session.add_all(
+        CartItem(user_id=user.id, product_id=test_product.id, quantity=3)
+        for user in users
+    )
+    db_session.commit()
+
+    async def checkout(user: User) -> bool:
+        async with TestingAsyncSessionLocal() as session:
+            try:
+                await CheckoutService(session).create_order_from_cart(
+                    user,
+                    OrderCreateSchema(**CHECKOUT),
+                )
+            except HTTPException as e:
+                assert "Insufficient stock" in e.detail
+                return False
+            return True
+
+    results = await asyncio.gather(*(checkout(user) for user in users))
+
+    # 10 spread as 3/3/2/2, 3 per order: the third order spans buckets
+    assert results.count(True) == 3
+    assert await _maintain() == (0, 1)
+    db_session.expire_all()
+    assert db_session.get(Product, test_product.id).stock == 1
+    assert not db_session.scalars(select(InventoryHold)).all()
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.pagination import encode_cursor
+from app.domain.entities.order import Order
+from app.domain.entities.order_item import OrderItem
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.cache.order_cache import order_snapshots
+
+
+def _seed_orders(db_session, user: User, product: Product) -> list[Order]:
+    start = datetime(2024, 1, 1)
+    orders = [
+        Order(
+            user_id=user.id,
+            total_price=10.0 * (i + 1),
+            status="confirmed",
+            # Pairs share a timestamp: id breaks the tie
+            created_at=start + timedelta(minutes=i // 2),
+        )
+        for i in range(7)
+    ]
+    db_session.add_all(orders)
+    db_session.flush()
+    db_session.add_all(
+        OrderItem(
+            order_id=order.id,
+            product_id=product.id,
+            quantity=1,
+            price=product.price,
+        )
+        for order in orders
+        for _ in range(order.id % 3 + 1)
+    )
+    db_session.commit()
+    return orders
+
+
+def _pages(client: TestClient, path: str, headers: dict, limit: int):
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return pages
+
+
+def test_order_history_pages_newest_first(
+    client: TestClient,
+    db_session,
+    test_user: User,
+    test_product: Product,
+    auth_headers,
+) -> None:
+    orders = _seed_orders(db_session, test_user, test_product)
+    newest_first = sorted(
+        orders, key=lambda o: (o.created_at, o.id), reverse=True
+    )
+
+    pages = _pages(client, "/api/v1/orders/", auth_headers, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    history = [order for page in pages for order in page]
+    assert [o["id"] for o in history] == [o.id for o in newest_first]
+    assert all(
+        len(o["order_items"]) == o["id"] % 3 + 1
+        and o["order_items"][0]["product"]["id"] == test_product.id
+        for o in history
+    )
+
+
+def test_order_summaries_count_items(
+    client: TestClient,
+    db_session,
+    test_user: User,
+    test_product: Product,
+    auth_headers,
+) -> None:
+    orders = _seed_orders(db_session, test_user, test_product)
+
+    pages = _pages(client, "/api/v1/orders/summary", auth_headers, limit=4)
+    summaries = [order for page in pages for order in page]
+    assert len(summaries) == len(orders)
+    for summary in summaries:
+        assert "order_items" not in summary
+        assert summary["item_count"] == summary["id"] % 3 + 1
+        assert summary["user_id"] == test_user.id
+
+
+def test_order_history_rejects_foreign_cursor(
+    client: TestClient,
+    auth_headers,
+) -> None:
+    response = client.get(
+        "/api/v1/orders/",
+        params={"cursor": "not-a-cursor"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+
+    for key in (None, 5):
+        response = client.get(
+            "/api/v1/orders/",
+            params={"cursor": encode_cursor("created_at", True, key, 1)},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
+
+def test_order_detail_serves_the_snapshot(
+    client: TestClient,
+    test_product: Product,
+    auth_headers,
+    admin_auth_headers,
+) -> None:
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": test_product.id, "quantity": 1},
+        headers=auth_headers,
+    )
+    placed = client.post(
+        "/api/v1/orders/checkout",
+        json={"payment_method": "credit_card"},
+        headers=auth_headers,
+    ).json()
+    path = f"/api/v1/orders/{placed['id']}"
+
+    # The order keeps showing the product as it was bought
+    renamed = client.put(
+        f"/api/v1/products/{test_product.id}",
+        json={"name": "Renamed"},
+        headers=admin_auth_headers,
+    )
+    assert renamed.status_code == 200
+    for _ in range(2):
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == placed
+    assert order_snapshots.stats()["hits"] == 1
+
+    # Someone else's order does not exist for them, cached or not
+    assert client.get(path, headers=admin_auth_headers).status_code == 404
+    order_snapshots.clear()
+    assert client.get(path, headers=admin_auth_headers).status_code == 404
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.application.services.outbox_service import (
+    ORDER_CANCELLED,
+    ORDER_CONFIRMED,
+    OutboxService,
+)
+from app.core.config import settings
+from app.domain.entities.outbox_event import OutboxEvent
+from app.domain.entities.product import Product
+from app.infrastructure.repositories.outbox_repository import (
+    OutboxRepository,
+)
+from app.infrastructure.search.autocomplete import autocomplete_index
+from tests.conftest import TestingAsyncSessionLocal
+
+CHECKOUT = {"payment_method": "credit_card"}
+
+
+def _checkout(client: TestClient, headers: dict, product_id: int):
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": product_id, "quantity": 2},
+        headers=headers,
+    )
+    return client.post(
+        "/api/v1/orders/checkout", json=CHECKOUT, headers=headers
+    )
+
+
+async def _drain(handlers=None) -> int:
+    async with TestingAsyncSessionLocal() as session:
+        return await OutboxService(session, handlers).drain(100)
+
+
+def test_checkout_commits_an_event_for_the_worker(
+    client: TestClient,
+    db_session,
+    test_product: Product,
+    auth_headers,
+) -> None:
+    response = _checkout(client, auth_headers, test_product.id)
+    assert response.status_code == 201
+    order = response.json()
+
+    event = db_session.scalars(select(OutboxEvent)).one()
+    assert event.topic == ORDER_CONFIRMED
+    assert json.loads(event.payload) == {
+        "order_id": order["id"],
+        "user_id": order["user_id"],
+        "total_price": order["total_price"],
+        "items": [{"product_id": test_product.id, "quantity": 2}],
+    }
+
+    # Sales count toward autocomplete once the worker delivers them
+    autocomplete_index.upsert(test_product.id, test_product.name)
+    [suggestion] = autocomplete_index.search(test_product.name)
+    assert suggestion.popularity == 0
+    assert client.portal.call(_drain) == 1
+    [suggestion] = autocomplete_index.search(test_product.name)
+    assert suggestion.popularity == 2
+    db_session.expire_all()
+    assert db_session.scalars(select(OutboxEvent)).all() == []
+
+
+def test_failed_payment_commits_a_cancellation(
+    client: TestClient,
+    db_session,
+    test_product: Product,
+    auth_headers,
+    fake_payments,
+) -> None:
+    fake_payments.failure_rate = 1.0
+    assert _checkout(client, auth_headers, test_product.id).status_code == 400
+
+    event = db_session.scalars(select(OutboxEvent)).one()
+    assert event.topic == ORDER_CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_failing_handler_backs_off_then_dead_letters(
+    db_session,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(settings, "outbox_max_attempts", 3)
+    monkeypatch.setattr(settings, "outbox_retry_base_seconds", 0)
+    calls = []
+
+    async def handler(db, payload: dict) -> None:
+        calls.append(payload)
+        raise RuntimeError("smtp down")
+
+    async with TestingAsyncSessionLocal() as session:
+        await OutboxRepository(session).add("mail.send", {"to": "a"})
+        await session.commit()
+
+    for _ in range(4):
+        await _drain({"mail.send": handler})
+
+    assert calls == [{"to": "a"}] * 3
+    db_session.expire_all()
+    event = db_session.scalars(select(OutboxEvent)).one()
+    assert event.attempts == 3
+    assert event.dead_at is not None
+    assert event.last_error == "RuntimeError: smtp down"
+
+    async with TestingAsyncSessionLocal() as session:
+        stats = await OutboxService(session).stats()
+    assert stats == {"due": 0, "waiting": 0, "dead": 1}
+
+
+@pytest.mark.asyncio
+async def test_retry_waits_for_its_backoff(db_session, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "outbox_retry_base_seconds", 60)
+    outcomes = iter([RuntimeError("timeout"), None])
+
+    async def handler(db, payload: dict) -> None:
+        error = next(outcomes)
+        if error is not None:
+            raise error
+
+    handlers = {"mail.send": handler}
+    async with TestingAsyncSessionLocal() as session:
+        await OutboxRepository(session).add("mail.send", {})
+        await session.commit()
+
+    assert await _drain(handlers) == 1
+    # Not due again for a minute
+    assert await _drain(handlers) == 0
+
+    db_session.expire_all()
+    event = db_session.scalars(select(OutboxEvent)).one()
+    assert event.attempts == 1
+    assert event.dead_at is None
@@ -0,0 +1,291 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.application.schemas.order import OrderCreateSchema
+from app.application.services.checkout_service import CheckoutService
+from app.core.config import settings
+from app.domain.entities.cart_item import CartItem
+from app.domain.entities.order import Order
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.gateways.payment_gateway import (
+    CircuitBreaker,
+    FakePaymentGateway,
+    GuardedPaymentGateway,
+    PaymentUnavailable,
+    payment_gateway,
+)
+from tests.conftest import TestingAsyncSessionLocal
+
+CHECKOUT = {"payment_method": "credit_card"}
+
+
+class CountingGateway(FakePaymentGateway):
+    def __init__(self, latency_seconds: float) -> None:
+        super().__init__(latency_seconds, failure_rate=0.0)
+        self.running = 0
+        self.peak = 0
+
+    async def charge(self, *args) -> dict:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            return await super().charge(*args)
+        finally:
+            self.running -= 1
+
+
+class SlowChargeGateway(FakePaymentGateway):
+    """Charges outlast any test deadline; voids answer at once."""
+
+    def __init__(self, void_fails: bool = False) -> None:
+        super().__init__(latency_seconds=0.0, failure_rate=0.0)
+        self.void_fails = void_fails
+        self.voided: list[int] = []
+
+    async def charge(self, *args) -> dict:
+        await asyncio.sleep(1.0)
+        return await super().charge(*args)
+
+    async def void(self, order_id: int) -> dict:
+        if self.void_fails:
+            raise ConnectionError("gateway unreachable")
+        self.voided.append(order_id)
+        return await super().void(order_id)
+
+
+def _guarded(gateway, timeout=1.0, max_concurrency=10, threshold=2):
+    return GuardedPaymentGateway(
+        gateway,
+        timeout_seconds=timeout,
+        max_concurrency=max_concurrency,
+        breaker=CircuitBreaker(threshold, reset_seconds=60.0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_bounded() -> None:
+    fake = CountingGateway(latency_seconds=0.01)
+    gateway = _guarded(fake, max_concurrency=2)
+
+    results = await asyncio.gather(
+        *(gateway.charge(i, 10.0, "card") for i in range(6))
+    )
+
+    assert all(result["status"] == "completed" for result in results)
+    assert fake.peak == 2
+    assert gateway.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_timeouts_and_recovers() -> None:
+    fake = FakePaymentGateway(latency_seconds=1.0, failure_rate=0.0)
+    gateway = _guarded(fake, timeout=0.01, threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(PaymentUnavailable, match="timed out"):
+            await gateway.charge(1, 10.0, "card")
+    assert gateway.stats()["breaker"] == "open"
+    assert not gateway.available()
+    # Rejected without waiting on the gateway
+    with pytest.raises(PaymentUnavailable, match="circuit is open"):
+        await gateway.charge(1, 10.0, "card")
+
+    # After the reset period one trial call closes the circuit again
+    gateway.breaker.opened_at -= gateway.breaker.reset_seconds
+    assert gateway.stats()["breaker"] == "half_open"
+    fake.latency_seconds = 0.0
+    assert (await gateway.charge(1, 10.0, "card"))["status"] == "completed"
+    assert gateway.stats()["breaker"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_call_frees_the_half_open_circuit() -> None:
+    fake = FakePaymentGateway(latency_seconds=1.0, failure_rate=0.0)
+    gateway = _guarded(fake, timeout=5.0, threshold=1)
+    gateway.breaker.record_failure()
+    gateway.breaker.opened_at -= gateway.breaker.reset_seconds
+
+    trial = asyncio.create_task(gateway.charge(1, 10.0, "card"))
+    await asyncio.sleep(0.01)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    # The next call is the new trial instead of being rejected
+    fake.latency_seconds = 0.0
+    assert (await gateway.charge(1, 10.0, "card"))["status"] == "completed"
+    assert gateway.stats()["breaker"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_declines_do_not_open_the_breaker() -> None:
+    gateway = _guarded(FakePaymentGateway(0.0, failure_rate=1.0))
+
+    for _ in range(5):
+        assert (await gateway.charge(1, 10.0, "card"))["status"] == "failed"
+    assert gateway.stats()["breaker"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_payment_is_awaited_outside_a_transaction(
+    db_session,
+    test_user: User,
+    test_product: Product,
+) -> None:
+    db_session.add(
+        CartItem(user_id=test_user.id, product_id=test_product.id, quantity=2)
+    )
+    db_session.commit()
+
+    async with TestingAsyncSessionLocal() as session:
+        checkout_service = CheckoutService(session)
+        seen = []
+
+        class ProbeGateway(FakePaymentGateway):
+            async def charge(self, *args) -> dict:
+                seen.append(session.in_transaction())
+                return await super().charge(*args)
+
+        checkout_service.payment_service.gateway = ProbeGateway(0.0, 0.0)
+        order = await checkout_service.create_order_from_cart(
+            test_user, OrderCreateSchema(**CHECKOUT)
+        )
+
+    assert seen == [False]
+    assert order.status == "confirmed"
+
+
+def test_checkout_when_gateway_times_out(
+    client: TestClient,
+    db_session,
+    test_product: Product,
+    auth_headers,
+    fake_payments,
+    monkeypatch,
+):
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": test_product.id, "quantity": 2},
+        headers=auth_headers,
+    )
+    gateway = SlowChargeGateway()
+    monkeypatch.setattr(payment_gateway, "gateway", gateway)
+    monkeypatch.setattr(payment_gateway, "timeout_seconds", 0.01)
+
+    response = client.post(
+        "/api/v1/orders/checkout", json=CHECKOUT, headers=auth_headers
+    )
+
+    assert response.status_code == 503
+    # The charge may have gone through: it is voided, then the order
+    # is cancelled and its stock given back
+    db_session.expire_all()
+    order = db_session.scalars(select(Order)).one()
+    assert gateway.voided == [order.id]
+    assert order.status == "cancelled"
+    assert db_session.get(Product, test_product.id).stock == 10
+    # The cart is kept for a retry
+    assert client.get("/api/v1/cart/", headers=auth_headers).json()[
+        "total_items"
+    ] == 2
+
+
+@pytest.mark.asyncio
+async def test_checkout_fails_fast_while_circuit_is_open(
+    db_session,
+    test_user: User,
+    test_product: Product,
+    monkeypatch,
+) -> None:
+    db_session.add(
+        CartItem(user_id=test_user.id, product_id=test_product.id, quantity=1)
+    )
+    db_session.commit()
+    monkeypatch.setattr(payment_gateway, "available", lambda: False)
+
+    async with TestingAsyncSessionLocal() as session:
+        with pytest.raises(HTTPException) as e:
+            await CheckoutService(session).create_order_from_cart(
+                test_user, OrderCreateSchema(**CHECKOUT)
+            )
+
+    assert e.value.status_code == 503
+    assert not db_session.scalars(select(Order)).all()
+
+
+def test_unvoided_timeout_is_settled_by_the_sweep(
+    client: TestClient,
+    db_session,
+    test_product: Product,
+    auth_headers,
+    fake_payments,
+    monkeypatch,
+):
+    client.post(
+        "/api/v1/cart/items",
+        json={"product_id": test_product.id, "quantity": 2},
+        headers=auth_headers,
+    )
+    gateway = SlowChargeGateway(void_fails=True)
+    monkeypatch.setattr(payment_gateway, "gateway", gateway)
+    monkeypatch.setattr(payment_gateway, "timeout_seconds", 0.01)
+
+    response = client.post(
+        "/api/v1/orders/checkout", json=CHECKOUT, headers=auth_headers
+    )
+
+    assert response.status_code == 503
+    # Whether it was charged is unknown, so the order is left pending
+    db_session.expire_all()
+    order = db_session.scalars(select(Order)).one()
+    assert order.status == "pending"
+    assert db_session.get(Product, test_product.id).stock == 8
+
+    async def sweep() -> int:
+        async with TestingAsyncSessionLocal() as session:
+            return await CheckoutService(session).settle_stale()
+
+    monkeypatch.setattr(settings, "checkout_pending_timeout_seconds", 0.0)
+    # Still unreachable: tried again on the next sweep
+    assert asyncio.run(sweep()) == 0
+    gateway.void_fails = False
+    payment_gateway.breaker.reset()
+    assert asyncio.run(sweep()) == 1
+
+    db_session.expire_all()
+    assert gateway.voided == [order.id]
+    assert db_session.get(Order, order.id).status == "cancelled"
+    assert db_session.get(Product, test_product.id).stock == 10
+    assert asyncio.run(sweep()) == 0
+
+
+@pytest.mark.asyncio
+async def test_checkout_rejected_by_open_circuit_is_not_voided(
+    db_session,
+    test_user: User,
+    test_product: Product,
+    monkeypatch,
+) -> None:
+    db_session.add(
+        CartItem(user_id=test_user.id, product_id=test_product.id, quantity=1)
+    )
+    db_session.commit()
+    gateway = SlowChargeGateway()
+    monkeypatch.setattr(payment_gateway, "gateway", gateway)
+    monkeypatch.setattr(payment_gateway.breaker, "allow", lambda: False)
+
+    async with TestingAsyncSessionLocal() as session:
+        with pytest.raises(HTTPException) as e:
+            await CheckoutService(session).create_order_from_cart(
+                test_user, OrderCreateSchema(**CHECKOUT)
+            )
+
+    assert e.value.status_code == 503
+    assert gateway.voided == []
+    assert db_session.scalars(select(Order)).one().status == "cancelled"
+    assert db_session.get(Product, test_product.id).stock == 10
@@ -0,0 +1,73 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.pool_metrics import InstrumentedQueuePool, PoolMetrics
+
+
+def _make_engine(path: Path, **kwargs):
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        poolclass=InstrumentedQueuePool,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_track_checkouts(tmp_path: Path) -> None:
+    engine = _make_engine(tmp_path / "pool.db", pool_size=2, max_overflow=1)
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+
+    conn_a = await engine.connect()
+    conn_b = await engine.connect()
+    conn_c = await engine.connect()
+    await conn_a.execute(text("SELECT 1"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["pool"] == "InstrumentedQueuePool"
+    assert snapshot["checked_out"] == 3
+    assert snapshot["overflow"] == 1
+    assert snapshot["wait_count"] == 3
+
+    for conn in (conn_a, conn_b, conn_c):
+        await conn.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checked_out"] == 0
+    assert snapshot["idle"] == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_record_timeouts(tmp_path: Path) -> None:
+    engine = _make_engine(
+        tmp_path / "pool.db",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+
+    conn = await engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        await asyncio.wait_for(engine.connect(), timeout=5)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["wait_max_ms"] >= 50
+
+    await conn.close()
+    await engine.dispose()
+
+
+def test_pool_health_endpoint(client: TestClient) -> None:
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert {"checked_out", "idle", "overflow", "wait_avg_ms"} <= data.keys()
@@ -0,0 +1,163 @@
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.application.schemas.product import ProductSchema
+from app.core.config import settings
+from app.core.database import Base, ReadSessionLocal
+from app.core.replicas import ReplicaRouter
+from app.domain.entities.product import Product
+from app.infrastructure.cache.backends import LRUCache, MemoryCacheBackend
+from app.infrastructure.cache.product_cache import (
+    ProductCache,
+    create_product_cache,
+    product_cache,
+)
+from app.infrastructure.repositories import product_repository
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from tests.conftest import async_engine
+
+
+def _schema(product_id: int) -> ProductSchema:
+    return ProductSchema(
+        id=product_id,
+        name=f"Product {product_id}",
+        price=10.0,
+        created_at="2024-01-01T00:00:00",
+        updated_at="2024-01-01T00:00:00",
+    )
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_expires_entries() -> None:
+    cache = LRUCache(max_entries=10, ttl_seconds=0.01)
+    cache.set(1, "a")
+    time.sleep(0.02)
+
+    assert cache.get(1) is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_refills_local_tier() -> None:
+    shared = MemoryCacheBackend()
+    worker_a = ProductCache(LRUCache(10, 60), shared)
+    worker_b = ProductCache(LRUCache(10, 60), shared)
+
+    await worker_a.set(_schema(1))
+    product = await worker_b.get(1)
+    assert product == _schema(1)
+    assert worker_b.stats()["shared"]["hits"] == 1
+
+    await worker_a.invalidate(1)
+    worker_b.local.clear()
+    assert await worker_b.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_get_many_reads_both_tiers() -> None:
+    shared = MemoryCacheBackend()
+    worker_a = ProductCache(LRUCache(10, 60), shared)
+    worker_b = ProductCache(LRUCache(10, 60), shared)
+
+    await worker_a.set_many([_schema(1), _schema(2)])
+    await worker_b.set(_schema(3))
+
+    found = await worker_b.get_many([1, 2, 3, 4])
+    assert found == {1: _schema(1), 2: _schema(2), 3: _schema(3)}
+    assert worker_b.stats()["shared"] == {"hits": 2, "misses": 1}
+
+
+def test_local_tier_expires_sooner_with_shared_backend(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "product_cache_ttl_seconds", 60.0)
+    monkeypatch.setattr(settings, "product_cache_local_ttl_seconds", 2.0)
+    assert create_product_cache().local.ttl_seconds == 60.0
+
+    monkeypatch.setattr(settings, "cache_backend_url", "memory://")
+    cache = create_product_cache()
+    assert (cache.local.ttl_seconds, cache.ttl_seconds) == (2.0, 60.0)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_filled_from_the_primary(
+    tmp_path: Path,
+    monkeypatch,
+    test_product: Product,
+) -> None:
+    # A replica that has not caught up with a price change yet
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'r.db'}")
+    async with replica.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            insert(Product).values(
+                id=test_product.id, name=test_product.name, price=1.0
+            )
+        )
+    monkeypatch.setattr(
+        product_repository,
+        "replica_router",
+        ReplicaRouter(async_engine, [replica]),
+    )
+
+    async with ReadSessionLocal(bind=replica) as session:
+        product_repo = ProductRepository(session)
+        product = await product_repo.get_cached(test_product.id)
+        assert product.price == test_product.price
+        await product_cache.invalidate(test_product.id)
+        products = await product_repo.get_many([test_product.id])
+        assert products[test_product.id].price == test_product.price
+    await replica.dispose()
+
+
+def test_product_detail_is_served_from_cache(
+    client: TestClient,
+    test_product: Product,
+) -> None:
+    client.get(f"/api/v1/products/{test_product.id}")
+    hits = product_cache.local.hits
+    response = client.get(f"/api/v1/products/{test_product.id}")
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Test T-Shirt"
+    assert product_cache.local.hits == hits + 1
+
+
+def test_product_update_invalidates_cache(
+    client: TestClient,
+    test_product: Product,
+    admin_auth_headers: dict,
+) -> None:
+    client.get(f"/api/v1/products/{test_product.id}")
+    client.put(
+        f"/api/v1/products/{test_product.id}",
+        json={"price": 19.99},
+        headers=admin_auth_headers,
+    )
+
+    response = client.get(f"/api/v1/products/{test_product.id}")
+    assert response.json()["price"] == 19.99
+
+
+def test_cache_stats_endpoint(client: TestClient) -> None:
+    response = client.get("/health/cache")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions"} <= response.json()["local"].keys()
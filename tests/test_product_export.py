@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.application.services import product_export_service
+from app.domain.entities.product import Product
+
+
+def _seed(db_session, count: int) -> list[Product]:
+    products = [
+        Product(
+            name=f"Item {i}",
+            price=float(i),
+            stock=i,
+            category="even" if i % 2 == 0 else "odd",
+            updated_at=datetime(2024, 1, 1),
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    return products
+
+
+def test_export_ndjson_streams_every_product(
+    client: TestClient,
+    db_session,
+    admin_auth_headers,
+    monkeypatch,
+):
+    # Force several cursor batches and response chunks
+    monkeypatch.setattr(product_export_service, "EXPORT_BATCH_SIZE", 7)
+    monkeypatch.setattr(product_export_service, "EXPORT_CHUNK_SIZE", 256)
+    products = _seed(db_session, 150)
+
+    response = client.get(
+        "/api/v1/products/export", headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [p.id for p in products]
+    assert rows[3]["name"] == "Item 3"
+
+
+def test_export_csv_with_filters(
+    client: TestClient,
+    db_session,
+    admin_auth_headers,
+):
+    products = _seed(db_session, 6)
+    client.put(
+        f"/api/v1/products/{products[4].id}",
+        json={"stock": 40},
+        headers=admin_auth_headers,
+    )
+    client.put(
+        f"/api/v1/products/{products[2].id}",
+        json={"stock": 20},
+        headers=admin_auth_headers,
+    )
+
+    response = client.get(
+        "/api/v1/products/export",
+        params={"format": "csv", "category": "even"},
+        headers=admin_auth_headers,
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.headers["content-type"].startswith("text/csv")
+    assert [row["name"] for row in rows] == ["Item 0", "Item 2", "Item 4"]
+
+    response = client.get(
+        "/api/v1/products/export",
+        params={
+            "format": "csv",
+            "updated_since": "2024-06-01T00:00:00Z",
+        },
+        headers=admin_auth_headers,
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    # Ordered by updated_at, so the last row is the next watermark
+    assert [row["stock"] for row in rows] == ["40", "20"]
+
+
+def test_export_requires_admin(client: TestClient, auth_headers):
+    response = client.get("/api/v1/products/export", headers=auth_headers)
+    assert response.status_code == 403
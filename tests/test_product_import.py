@@ -0,0 +1,167 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.application.services.product_import_service import (
+    iter_csv_records,
+    iter_lines,
+)
+from app.core.config import settings
+from app.domain.entities.product import Product
+from app.infrastructure.search.autocomplete import autocomplete_index
+
+CSV = "text/csv"
+NDJSON = "application/x-ndjson"
+
+
+def _import(client: TestClient, headers: dict, body: str, content_type: str):
+    return client.post(
+        "/api/v1/products/import",
+        content=body.encode(),
+        headers={**headers, "Content-Type": content_type},
+    )
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.mark.asyncio
+async def test_csv_records_across_chunks_and_quoted_newlines() -> None:
+    data = (
+        '\ufeffsku,name,description,price\r\n'
+        'A-1,Mug,"Holds ""hot""\ncoffee",9.5\r\n'
+        '\n'
+        'A-2,Cup,,4\n'
+    ).encode()
+
+    records = [
+        record
+        async for record in iter_csv_records(iter_lines(_chunks(data, 7)))
+    ]
+
+    assert records == [
+        (
+            2,
+            {
+                "sku": "A-1",
+                "name": "Mug",
+                "description": 'Holds "hot"\ncoffee',
+                "price": "9.5",
+            },
+        ),
+        (5, {"sku": "A-2", "name": "Cup", "price": "4"}),
+    ]
+
+
+def test_import_csv_reports_row_errors(
+    client: TestClient,
+    db_session,
+    admin_auth_headers,
+):
+    body = (
+        "sku,name,price,stock,category\n"
+        "A-1,Mug,9.5,3,kitchen\n"
+        "A-2,Cup,not-a-price,1,kitchen\n"
+        "A-3,Plate\n"
+        "A-4,Bowl,7,,kitchen\n"
+    )
+
+    response = _import(client, admin_auth_headers, body, CSV)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["processed"] == 4
+    assert report["upserted"] == 2
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert report["errors"][0]["errors"][0].startswith("price:")
+    assert not report["errors_truncated"]
+
+    products = db_session.scalars(select(Product).order_by(Product.sku)).all()
+    assert [(p.sku, p.stock) for p in products] == [("A-1", 3), ("A-4", 0)]
+
+
+def test_import_upserts_on_sku(
+    client: TestClient,
+    db_session,
+    admin_auth_headers,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, "product_import_batch_size", 2)
+    rows = [
+        {"sku": f"S-{i}", "name": f"Item {i}", "price": i} for i in range(5)
+    ]
+    body = "\n".join(json.dumps(row) for row in rows)
+    assert _import(client, admin_auth_headers, body, NDJSON).json()[
+        "upserted"
+    ] == 5
+
+    product_id = db_session.scalar(
+        select(Product.id).where(Product.sku == "S-1")
+    )
+    client.get(f"/api/v1/products/{product_id}")
+
+    body = "\n".join(
+        [
+            json.dumps({"sku": "S-1", "name": "Item 1", "price": 11}),
+            json.dumps({"sku": "S-1", "name": "Item 1b", "price": 12}),
+            "[1, 2]",
+        ]
+    )
+    report = _import(client, admin_auth_headers, body, NDJSON).json()
+
+    assert report["upserted"] == 1
+    assert report["errors"] == [
+        {"line": 3, "errors": ["expected a JSON object"]}
+    ]
+    assert len(db_session.scalars(select(Product)).all()) == 5
+    # Cached copy was invalidated by the upsert
+    product = client.get(f"/api/v1/products/{product_id}").json()
+    assert (product["name"], product["price"]) == ("Item 1b", 12)
+    # Reindexed once the import was done
+    suggestions = autocomplete_index.search("item 1b")
+    assert [suggestion.id for suggestion in suggestions] == [product_id]
+
+
+def test_import_keeps_stock_of_bucketed_products(
+    client: TestClient,
+    db_session,
+    admin_auth_headers,
+):
+    body = "sku,name,price,stock\nA-1,Mug,1,5\nB-1,Cup,1,5\n"
+    _import(client, admin_auth_headers, body, CSV)
+    products = {
+        product.sku: product
+        for product in db_session.scalars(select(Product)).all()
+    }
+    client.put(
+        f"/api/v1/products/{products['A-1'].id}/inventory",
+        json={"stock": 8, "buckets": 2},
+        headers=admin_auth_headers,
+    )
+
+    body = "sku,name,price,stock\nA-1,Big Mug,2,50\nB-1,Big Cup,2,50\n"
+    assert _import(client, admin_auth_headers, body, CSV).json()[
+        "upserted"
+    ] == 2
+
+    db_session.expire_all()
+    mug = db_session.get(Product, products["A-1"].id)
+    cup = db_session.get(Product, products["B-1"].id)
+    assert (mug.name, mug.price, mug.stock) == ("Big Mug", 2, 8)
+    assert (cup.name, cup.price, cup.stock) == ("Big Cup", 2, 50)
+
+
+def test_import_requires_admin_and_known_format(
+    client: TestClient,
+    auth_headers,
+    admin_auth_headers,
+):
+    body = "sku,name,price\nA-1,Mug,1\n"
+    assert _import(client, auth_headers, body, CSV).status_code == 403
+    response = _import(client, admin_auth_headers, body, "text/plain")
+    assert response.status_code == 415
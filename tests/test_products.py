@@ -1,5 +1,7 @@
+import pytest
 from fastapi.testclient import TestClient
 
+from app.core.pagination import encode_cursor
 from app.domain.entities.product import Product
 
 
@@ -76,6 +78,37 @@ def test_update_product(client: TestClient, test_product, admin_auth_headers):
     assert data["stock"] == 15
 
 
+def test_duplicate_sku_conflicts(
+    client: TestClient,
+    test_product,
+    admin_auth_headers: dict,
+) -> None:
+    product_data = {
+        "name": "New Jacket",
+        "description": "A warm jacket",
+        "price": 89.99,
+        "sku": "JACKET-1",
+    }
+    response = client.post(
+        "/api/v1/products/", json=product_data, headers=admin_auth_headers
+    )
+    assert response.status_code == 201
+
+    response = client.post(
+        "/api/v1/products/", json=product_data, headers=admin_auth_headers
+    )
+    assert response.status_code == 409
+    response = client.put(
+        f"/api/v1/products/{test_product.id}",
+        json={"sku": "JACKET-1"},
+        headers=admin_auth_headers,
+    )
+    assert response.status_code == 409
+
+    response = client.get(f"/api/v1/products/{test_product.id}")
+    assert response.json()["sku"] is None
+
+
 def test_delete_product(client: TestClient, test_product, admin_auth_headers):
     response = client.delete(
         f"/api/v1/products/{test_product.id}", headers=admin_auth_headers
@@ -101,3 +134,201 @@ def test_filter_products_by_category(client: TestClient, test_product):
     data = response.json()
     assert len(data) == 1
     assert data[0]["category"] == "clothing"
+
+
+def _create_products(db_session, prices: list[float]) -> list[Product]:
+    products = [
+        Product(name=f"Keyset {i}", price=price, stock=1, category="keyset")
+        for i, price in enumerate(prices)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    return products
+
+
+def test_cursor_pagination_by_price(client: TestClient, db_session):
+    products = _create_products(db_session, [5.0, 1.0, 3.0, 3.0, 2.0])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "sort": "price"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/products/", params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    expected = sorted(products, key=lambda p: (p.price, p.id))
+    assert seen == [p.id for p in expected]
+
+
+def test_cursor_pagination_descending(client: TestClient, db_session):
+    products = _create_products(db_session, [1.0, 2.0, 3.0])
+
+    first = client.get(
+        "/api/v1/products/", params={"limit": 2, "order": "desc"}
+    )
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(
+        "/api/v1/products/",
+        params={"limit": 2, "order": "desc", "cursor": cursor},
+    )
+
+    ids = [item["id"] for item in first.json() + second.json()]
+    assert ids == sorted((p.id for p in products), reverse=True)
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_cursor_for_other_sort_rejected(client: TestClient, db_session):
+    _create_products(db_session, [1.0, 2.0])
+
+    response = client.get(
+        "/api/v1/products/", params={"limit": 1, "sort": "price"}
+    )
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        "/api/v1/products/", params={"sort": "created_at", "cursor": cursor}
+    )
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/products/", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    ("sort", "key"),
+    [
+        ("created_at", 5),
+        ("created_at", "yesterday"),
+        ("price", [1, 2]),
+        ("price", "1.0"),
+        ("id", None),
+    ],
+)
+def test_cursor_with_mistyped_key_rejected(
+    client: TestClient,
+    db_session,
+    sort: str,
+    key,
+):
+    _create_products(db_session, [1.0, 2.0])
+
+    response = client.get(
+        "/api/v1/products/",
+        params={"sort": sort, "cursor": encode_cursor(sort, False, key, 1)},
+    )
+    assert response.status_code == 400
+
+
+def test_search_ranks_name_matches_first(client: TestClient, db_session):
+    db_session.add_all(
+        [
+            Product(
+                name="Plain Hoodie",
+                description="Pairs well with denim",
+                price=40.0,
+            ),
+            Product(name="Denim Jacket", description="Classic cut", price=90.0),
+        ]
+    )
+    db_session.commit()
+
+    response = client.get("/api/v1/products/?search=denim")
+    names = [item["name"] for item in response.json()]
+    assert names == ["Denim Jacket", "Plain Hoodie"]
+
+    response = client.get("/api/v1/products/?search=denim&limit=1&skip=1")
+    assert [item["name"] for item in response.json()] == ["Plain Hoodie"]
+
+
+def test_search_index_follows_updates(
+    client: TestClient,
+    test_product,
+    admin_auth_headers,
+):
+    client.put(
+        f"/api/v1/products/{test_product.id}",
+        json={"name": "Linen Shorts", "description": "Light and airy"},
+        headers=admin_auth_headers,
+    )
+    assert client.get("/api/v1/products/?search=shirt").json() == []
+    assert len(client.get("/api/v1/products/?search=linen").json()) == 1
+
+    client.delete(
+        f"/api/v1/products/{test_product.id}", headers=admin_auth_headers
+    )
+    assert client.get("/api/v1/products/?search=linen").json() == []
+
+
+def test_catalog_conditional_get(client: TestClient, test_product):
+    response = client.get("/api/v1/products/")
+    etag = response.headers["ETag"]
+    modified = response.headers["Last-Modified"]
+
+    response = client.get(
+        "/api/v1/products/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    response = client.get(
+        "/api/v1/products/", headers={"If-Modified-Since": modified}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        "/api/v1/products/", headers={"If-None-Match": '"stale"'}
+    )
+    assert response.status_code == 200
+
+
+def test_product_etag_changes_on_update(
+    client: TestClient,
+    test_product,
+    admin_auth_headers,
+):
+    url = f"/api/v1/products/{test_product.id}"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(url, json={"price": 24.99}, headers=admin_auth_headers)
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["price"] == 24.99
+
+
+def test_get_products_batch_keeps_request_order(
+    client: TestClient,
+    db_session,
+):
+    products = _create_products(db_session, [1.0, 2.0, 3.0])
+    ids = [products[2].id, 9999, products[0].id, products[2].id]
+
+    # Warm the cache for one of them; the rest come from one query
+    client.get(f"/api/v1/products/{products[0].id}")
+    response = client.get("/api/v1/products/batch", params={"ids": ids})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["id"] for p in data["products"]] == [
+        products[2].id,
+        products[0].id,
+    ]
+    assert data["missing"] == [9999]
+
+
+def test_get_products_batch_limits_ids(client: TestClient):
+    assert client.get("/api/v1/products/batch").status_code == 400
+    response = client.get(
+        "/api/v1/products/batch", params={"ids": list(range(501))}
+    )
+    assert response.status_code == 400
+    response = client.get("/api/v1/products/batch", params={"ids": "x"})
+    assert response.status_code == 422
@@ -0,0 +1,283 @@
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.application.schemas.product import ProductFilterSchema
+from app.core.database import Base
+from app.domain.entities.cart_item import CartItem
+from app.domain.entities.order import Order
+from app.domain.entities.order_item import OrderItem
+from app.domain.entities.product import Product
+from app.domain.entities.user import User
+from app.infrastructure.repositories.analytics_repository import (
+    AnalyticsRepository,
+)
+from app.infrastructure.repositories.cart_repository import CartRepository
+from app.infrastructure.repositories.idempotency_repository import (
+    IdempotencyRepository,
+)
+from app.infrastructure.repositories.inventory_repository import (
+    InventoryRepository,
+)
+from app.infrastructure.repositories.order_repository import OrderRepository
+from app.infrastructure.repositories.outbox_repository import (
+    OutboxRepository,
+)
+from app.infrastructure.repositories.product_repository import (
+    ProductRepository,
+)
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.search.product_search import is_search_table
+
+USERS = 200
+PRODUCTS = 1000
+CATEGORIES = 20
+
+# A SCAN that is not satisfied from an index reads the whole table;
+# FTS5 lookups show up as a SCAN of the virtual table's MATCH index and
+# scans of subquery results (anon_1) read rows already narrowed down
+FULL_SCAN = re.compile(
+    r"^SCAN (TABLE )?(?P<table>\w+)(?!.*(USING|VIRTUAL TABLE INDEX))"
+)
+
+QUERIES: dict[str, Callable[[AsyncSession], Awaitable[Any]]] = {
+    "ProductRepository.get_by_id": lambda db: (
+        ProductRepository(db).get_by_id(42)
+    ),
+    "ProductRepository.get_many": lambda db: (
+        ProductRepository(db).get_many(list(range(700, 900, 7)))
+    ),
+    "ProductRepository.get_page[price]": lambda db: (
+        ProductRepository(db).get_page(
+            limit=50, sort="price", after=(500.0, 500)
+        )
+    ),
+    "ProductRepository.get_page[created_at desc]": lambda db: (
+        ProductRepository(db).get_page(
+            limit=50, sort="created_at", descending=True
+        )
+    ),
+    "ProductRepository.search": lambda db: (
+        ProductRepository(db).search("product 12", limit=20)
+    ),
+    "ProductRepository.get_by_category": lambda db: (
+        ProductRepository(db).get_by_category("category-3")
+    ),
+    "ProductRepository.export_query[updated_since]": lambda db: (
+        ProductRepository(db).fetch_all(
+            ProductRepository(db).export_query(
+                updated_since=datetime(2100, 1, 1)
+            )
+        )
+    ),
+    "ProductRepository.catalog_query[category, price]": lambda db: (
+        ProductRepository(db).fetch_all(
+            ProductRepository(db).catalog_query(
+                ProductFilterSchema(
+                    category="category-3", min_price=100, in_stock=True
+                ),
+                sort="price",
+                limit=20,
+            )
+        )
+    ),
+    "ProductRepository.count[category]": lambda db: (
+        ProductRepository(db).count(
+            ProductFilterSchema(category="category-3"), estimate=True
+        )
+    ),
+    "CartRepository.get_user_cart": lambda db: (
+        CartRepository(db).get_user_cart(5)
+    ),
+    "CartRepository.get_cart_item": lambda db: (
+        CartRepository(db).get_cart_item(5, 6)
+    ),
+    "CartRepository.clear_cart": lambda db: (
+        CartRepository(db).clear_cart(7)
+    ),
+    "IdempotencyRepository.get": lambda db: (
+        IdempotencyRepository(db).get(5, "checkout-1")
+    ),
+    "InventoryRepository.bucketed": lambda db: (
+        InventoryRepository(db).bucketed([3, 4, 5])
+    ),
+    "InventoryRepository.take": lambda db: (
+        InventoryRepository(db).take(3, 2)
+    ),
+    "InventoryRepository.held": lambda db: InventoryRepository(db).held(3),
+    "InventoryRepository.claim_expired": lambda db: (
+        InventoryRepository(db).claim_expired(datetime(2000, 1, 1))
+    ),
+    "OutboxRepository.claim": lambda db: (
+        OutboxRepository(db).claim(
+            datetime(2000, 1, 1), datetime(2000, 1, 2), 100
+        )
+    ),
+    "AnalyticsRepository.confirmed_after": lambda db: (
+        AnalyticsRepository(db).confirmed_after(500, 100)
+    ),
+    "AnalyticsRepository.claim": lambda db: (
+        AnalyticsRepository(db).claim([3, 4, 5])
+    ),
+    "AnalyticsRepository.add": lambda db: (
+        AnalyticsRepository(db).add([3, 4, 5])
+    ),
+    "AnalyticsRepository.get_daily": lambda db: (
+        AnalyticsRepository(db).get_daily(date(2024, 1, 1), date(2024, 2, 1))
+    ),
+    "AnalyticsRepository.get_by_category": lambda db: (
+        AnalyticsRepository(db).get_by_category(
+            date(2024, 1, 1), date(2024, 2, 1)
+        )
+    ),
+    "AnalyticsRepository.get_by_product": lambda db: (
+        AnalyticsRepository(db).get_by_product(
+            date(2024, 1, 1), date(2024, 2, 1), 20
+        )
+    ),
+    "OrderRepository.get_user_orders": lambda db: (
+        OrderRepository(db).get_user_orders(9)
+    ),
+    "OrderRepository.get_user_orders[after]": lambda db: (
+        OrderRepository(db).get_user_orders(
+            9, after=(datetime(2100, 1, 1), 10_000), limit=2
+        )
+    ),
+    "OrderRepository.get_user_order_summaries": lambda db: (
+        OrderRepository(db).get_user_order_summaries(9)
+    ),
+    "OrderRepository.get_by_id": lambda db: (
+        OrderRepository(db).get_by_id(10)
+    ),
+    "OrderRepository.get_snapshot": lambda db: (
+        OrderRepository(db).get_snapshot(10, 11)
+    ),
+    "UserRepository.get_by_id": lambda db: UserRepository(db).get_by_id(11),
+    "UserRepository.get_by_email": lambda db: (
+        UserRepository(db).get_by_email("user12@example.com")
+    ),
+}
+
+
+def _alembic_config(url: str) -> Config:
+    config = Config("alembic.ini")
+    config.attributes["database_url"] = url
+    return config
+
+
+@pytest.fixture(scope="module")
+def migrated_db(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    command.upgrade(_alembic_config(f"sqlite:///{path}"), "head")
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {"email": f"user{i}@example.com", "hashed_password": "x"}
+                for i in range(1, USERS + 1)
+            ],
+        )
+        conn.execute(
+            insert(Product),
+            [
+                {
+                    "name": f"Product {i}",
+                    "price": float(i),
+                    "stock": 100,
+                    "category": f"category-{i % CATEGORIES}",
+                }
+                for i in range(1, PRODUCTS + 1)
+            ],
+        )
+        conn.execute(
+            insert(CartItem),
+            [
+                {"user_id": user_id, "product_id": product_id, "quantity": 1}
+                for user_id in range(1, USERS + 1)
+                for product_id in range(user_id, user_id + 3)
+            ],
+        )
+        conn.execute(
+            insert(Order),
+            [
+                {"user_id": i % USERS + 1, "total_price": 10.0}
+                for i in range(USERS * 5)
+            ],
+        )
+        conn.execute(
+            insert(OrderItem),
+            [
+                {
+                    "order_id": order_id,
+                    "product_id": order_id % PRODUCTS + 1,
+                    "quantity": 1,
+                    "price": 10.0,
+                }
+                for order_id in range(1, USERS * 5 + 1)
+            ],
+        )
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return path
+
+
+def test_migrations_match_models(migrated_db: Path) -> None:
+    engine = create_engine(f"sqlite:///{migrated_db}")
+    with engine.connect() as conn:
+        context = MigrationContext.configure(
+            conn,
+            opts={
+                "include_name": lambda name, type_, parents: not (
+                    type_ == "table" and is_search_table(name)
+                )
+            },
+        )
+        diff = compare_metadata(context, Base.metadata)
+    engine.dispose()
+    assert diff == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", QUERIES)
+async def test_repository_query_avoids_full_scan(
+    migrated_db: Path,
+    name: str,
+) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{migrated_db}")
+    statements: list[tuple[str, Any]] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, many):
+        # executemany is only used for keyed writes, which cannot scan
+        if not statement.startswith("EXPLAIN") and not many:
+            statements.append((statement, parameters))
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        await QUERIES[name](db)
+
+    assert statements, f"{name} issued no SQL"
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}",
+                parameters,
+            )
+            for row in result:
+                detail = row[-1]
+                match = FULL_SCAN.match(detail)
+                table = match["table"] if match else None
+                assert table not in Base.metadata.tables, (
+                    f"{name} scans a whole table: {detail}\n{statement}"
+                )
+    await engine.dispose()
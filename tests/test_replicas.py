@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.replicas import ReplicaRouter
+
+
+def _engine(path: Path):
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+
+def test_replicas_round_robin(tmp_path: Path) -> None:
+    primary = _engine(tmp_path / "primary.db")
+    replicas = [_engine(tmp_path / f"replica{i}.db") for i in range(2)]
+    router = ReplicaRouter(primary, replicas)
+
+    picked = [router.get_engine() for _ in range(4)]
+    assert picked == [replicas[0], replicas[1], replicas[0], replicas[1]]
+
+
+def test_replica_ejection_and_fallback(tmp_path: Path) -> None:
+    primary = _engine(tmp_path / "primary.db")
+    replicas = [_engine(tmp_path / f"replica{i}.db") for i in range(2)]
+    router = ReplicaRouter(primary, replicas, ejection_seconds=60)
+
+    router.eject(replicas[0])
+    assert not router.is_healthy(replicas[0])
+    assert [router.get_engine() for _ in range(3)] == [replicas[1]] * 3
+
+    router.eject(replicas[1])
+    assert router.get_engine() is primary
+
+
+def test_replica_readmitted_after_ejection(tmp_path: Path) -> None:
+    primary = _engine(tmp_path / "primary.db")
+    replica = _engine(tmp_path / "replica.db")
+    router = ReplicaRouter(primary, [replica], ejection_seconds=0)
+
+    router.eject(replica)
+    assert router.get_engine() is replica
+
+
+def test_no_replicas_uses_primary(tmp_path: Path) -> None:
+    primary = _engine(tmp_path / "primary.db")
+    router = ReplicaRouter(primary, [])
+    assert router.get_engine() is primary
+
+
+@pytest.mark.asyncio
+async def test_connection_error_ejects_replica(tmp_path: Path) -> None:
+    primary = _engine(tmp_path / "primary.db")
+    # Parent directory does not exist, so connecting fails
+    replica = _engine(tmp_path / "missing" / "replica.db")
+    router = ReplicaRouter(primary, [replica], ejection_seconds=60)
+
+    with pytest.raises(Exception):
+        async with replica.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    assert not router.is_healthy(replica)
+    assert router.get_engine() is primary
+    await replica.dispose()
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import enable_sqlite_profile
+
+
+@pytest.mark.asyncio
+async def test_sqlite_profile_sets_pragmas(tmp_path: Path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'p.db'}")
+    enable_sqlite_profile(engine)
+
+    async with engine.connect() as conn:
+        pragmas = {
+            name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+            for name in (
+                "journal_mode",
+                "synchronous",
+                "cache_size",
+                "busy_timeout",
+                "temp_store",
+            )
+        }
+
+    await engine.dispose()
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["cache_size"] == -settings.sqlite_cache_size_kib
+    assert pragmas["busy_timeout"] == settings.sqlite_busy_timeout_ms
+    assert pragmas["temp_store"] == 2  # MEMORY
+
+
+@pytest.mark.asyncio
+async def test_sqlite_default_has_no_profile(tmp_path: Path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'p.db'}")
+
+    async with engine.connect() as conn:
+        mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+
+    await engine.dispose()
+    assert mode == "delete"